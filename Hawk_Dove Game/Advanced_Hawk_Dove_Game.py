@@ -2,7 +2,7 @@ import numpy as np
 import matplotlib.pyplot as plt
 
 # 定义演化博弈函数
-def hawk_dove_game_advanced(V, C, initial_hawk_fraction=0.5, num_generations=100, mutation_rate=0.01):
+def hawk_dove_game_advanced(V, C, initial_hawk_fraction=0.5, num_generations=100, mutation_rate=0.01, plot=True):
     """
     运行进阶版鹰鸽博弈模型，并展示鹰的比例如何随时间演化。
 
@@ -12,6 +12,7 @@ def hawk_dove_game_advanced(V, C, initial_hawk_fraction=0.5, num_generations=100
     initial_hawk_fraction - 初始鹰的比例
     num_generations - 演化的代数
     mutation_rate - 突变率，允许新的策略出现
+    plot - 是否绘图；为 False 时只返回鹰的比例序列
     """
     
     # 初始化鹰和鸽的比例
@@ -37,6 +38,9 @@ def hawk_dove_game_advanced(V, C, initial_hawk_fraction=0.5, num_generations=100
 
         hawk_fractions.append(hawk_fraction)
 
+    if not plot:
+        return hawk_fractions
+
     # 绘制结果
     plt.plot(hawk_fractions, label=f'Hawk Fraction (V={V}, C={C}, Mutation Rate={mutation_rate})')
     plt.xlabel('Generation')
@@ -45,6 +49,8 @@ def hawk_dove_game_advanced(V, C, initial_hawk_fraction=0.5, num_generations=100
     plt.legend()
     plt.show()
 
+    return hawk_fractions
+
 def main():
     # 获取用户输入
     V = float(input("请输入资源的价值 V: "))
@@ -1,5 +1,8 @@
+import itertools
 import numpy as np
 import matplotlib.pyplot as plt
+from Random_Buffer import global_buffer as random_buffer
+from Vectorized_Hawk_Dove_Game import GenerationRecord
 
 class Individual:
     def __init__(self, strategy):
@@ -16,50 +19,85 @@ class Individual:
             return V / 2, V / 2
         elif self.strategy == 'Mixed':
             # 混合策略，根据一定概率选择鹰或鸽策略
-            self_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return Individual(self_choice).play(opponent, V, C)
+            self_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return PURE_STRATEGIES[self_choice].play(opponent, V, C)
         elif opponent.strategy == 'Mixed':
             # 对手为混合策略
-            opponent_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return self.play(Individual(opponent_choice), V, C)
+            opponent_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return self.play(PURE_STRATEGIES[opponent_choice], V, C)
         else:
             # 防止没有返回值的情况，保证返回一个默认值
             return 0, 0
 
+# 混合策略落实为鹰或鸽后使用的纯策略个体，避免每次交互都新建对象
+PURE_STRATEGIES = {'Hawk': Individual('Hawk'), 'Dove': Individual('Dove')}
+
 class Population:
     def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction):
         strategies = (['Hawk'] * int(size * initial_hawk_fraction) +
                       ['Dove'] * int(size * initial_dove_fraction) +
                       ['Mixed'] * int(size * initial_mixed_fraction))
         self.individuals = [Individual(strategy) for strategy in strategies]
+        # 各策略的实时计数，由 set_strategy 增量更新
+        self.strategy_counts = {strategy: strategies.count(strategy) for strategy in ('Hawk', 'Dove', 'Mixed')}
 
-    def evolve(self, V, C, mutation_rate, num_generations):
-        hawk_fractions = []
-        dove_fractions = []
-        mixed_fractions = []
+    def set_strategy(self, i, strategy):
+        # 修改策略时同步更新计数，读取比例时无需遍历整个群体
+        self.strategy_counts[self.individuals[i].strategy] -= 1
+        self.strategy_counts[strategy] += 1
+        self.individuals[i].strategy = strategy
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations=None, profiler=None):
+        """
+        evolve 的生成器版本：每完成一代产出一条 GenerationRecord（该代开始时的策略计数和该代的平均收益，
+        没有资源，renewable / non_renewable 为 nan），不保存历史，内存占用与代数无关。
+        num_generations 为 None 时一直运行，由调用者决定何时停止。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        timed = profiler is not None
+        generations = itertools.count() if num_generations is None else range(num_generations)
+
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = (self.strategy_counts['Hawk'], self.strategy_counts['Dove'], self.strategy_counts['Mixed'])
+            payoff_sum = 0
+            if timed:
+                profiler.lap('fraction_counting')
 
-        for _ in range(num_generations):
             # Pairwise interactions
             for i in range(len(self.individuals)):
-                opponent = np.random.choice(self.individuals)
+                opponent = self.individuals[random_buffer.integers(len(self.individuals))]
+                if timed:
+                    profiler.lap('opponent_sampling')
                 payoff_self, payoff_opponent = self.individuals[i].play(opponent, V, C)
+                payoff_sum += payoff_self
+                if timed:
+                    profiler.lap('play_mixed' if 'Mixed' in (self.individuals[i].strategy, opponent.strategy) else 'play')
 
                 # 突变机制
-                if np.random.rand() < mutation_rate:
-                    self.individuals[i].strategy = np.random.choice(['Hawk', 'Dove', 'Mixed'])
+                if random_buffer.uniform() < mutation_rate:
+                    self.set_strategy(i, random_buffer.choice(['Hawk', 'Dove', 'Mixed']))
+                if timed:
+                    profiler.lap('mutation')
+            if timed:
+                profiler.end_generation()
 
-            # Calculate current strategy fractions
-            hawk_count = sum(1 for ind in self.individuals if ind.strategy == 'Hawk')
-            dove_count = sum(1 for ind in self.individuals if ind.strategy == 'Dove')
-            mixed_count = sum(1 for ind in self.individuals if ind.strategy == 'Mixed')
+            yield GenerationRecord(gen, *counts, np.nan, np.nan, payoff_sum / len(self.individuals))
 
-            hawk_fraction = hawk_count / len(self.individuals)
-            dove_fraction = dove_count / len(self.individuals)
-            mixed_fraction = mixed_count / len(self.individuals)
+    def evolve(self, V, C, mutation_rate, num_generations, plot=True, profiler=None):
+        hawk_fractions = []
+        dove_fractions = []
+        mixed_fractions = []
 
-            hawk_fractions.append(hawk_fraction)
-            dove_fractions.append(dove_fraction)
-            mixed_fractions.append(mixed_fraction)
+        # 记录的是每代开始时的计数；产出记录时该代已经结束，此时的计数即该代结束时的策略比例
+        for _ in self.iter_evolve(V, C, mutation_rate, num_generations, profiler):
+            hawk_fractions.append(self.strategy_counts['Hawk'] / len(self.individuals))
+            dove_fractions.append(self.strategy_counts['Dove'] / len(self.individuals))
+            mixed_fractions.append(self.strategy_counts['Mixed'] / len(self.individuals))
+
+        if not plot:
+            return hawk_fractions, dove_fractions, mixed_fractions
 
         # Plot results
         plt.plot(hawk_fractions, label='Hawk Fraction')
@@ -71,6 +109,8 @@ class Population:
         plt.legend()
         plt.show()
 
+        return hawk_fractions, dove_fractions, mixed_fractions
+
 def main():
     # 获取用户输入
     V = float(input("请输入资源的价值 V: "))
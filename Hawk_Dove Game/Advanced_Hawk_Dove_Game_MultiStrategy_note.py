@@ -1,5 +1,8 @@
+import itertools
 import numpy as np
 import matplotlib.pyplot as plt
+from Random_Buffer import global_buffer as random_buffer
+from Vectorized_Hawk_Dove_Game import GenerationRecord
 
 class Individual:
     def __init__(self, strategy):
@@ -9,12 +12,12 @@ class Individual:
         # 以下内容是与先前版本相比新增的功能
         if self.strategy == 'Mixed':
             # 如果自身策略为混合策略，随机选择鹰或鸽
-            self_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return Individual(self_choice).play(opponent, V, C)
+            self_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return PURE_STRATEGIES[self_choice].play(opponent, V, C)
         elif opponent.strategy == 'Mixed':
             # 如果对手策略为混合策略，对手随机选择鹰或鸽
-            opponent_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return self.play(Individual(opponent_choice), V, C)
+            opponent_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return self.play(PURE_STRATEGIES[opponent_choice], V, C)
         # 新增部分结束
 
         # 常规的策略交互部分（与先前版本相同）
@@ -30,6 +33,9 @@ class Individual:
             # 防止没有返回值的情况，保证返回一个默认值
             return 0, 0
 
+# 混合策略落实为鹰或鸽后使用的纯策略个体，避免每次交互都新建对象
+PURE_STRATEGIES = {'Hawk': Individual('Hawk'), 'Dove': Individual('Dove')}
+
 class Population:
     def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction):
         # 在先前版本的基础上，增加了混合策略的初始化
@@ -37,35 +43,67 @@ class Population:
                       ['Dove'] * int(size * initial_dove_fraction) +
                       ['Mixed'] * int(size * initial_mixed_fraction))  # 增加了混合策略的比例
         self.individuals = [Individual(strategy) for strategy in strategies]
+        # 各策略的实时计数，由 set_strategy 增量更新
+        self.strategy_counts = {strategy: strategies.count(strategy) for strategy in ('Hawk', 'Dove', 'Mixed')}
 
-    def evolve(self, V, C, mutation_rate, num_generations):
-        hawk_fractions = []
-        dove_fractions = []
-        mixed_fractions = []  # 新增，记录混合策略的比例变化
+    def set_strategy(self, i, strategy):
+        # 修改策略时同步更新计数，读取比例时无需遍历整个群体
+        self.strategy_counts[self.individuals[i].strategy] -= 1
+        self.strategy_counts[strategy] += 1
+        self.individuals[i].strategy = strategy
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations=None, profiler=None):
+        """
+        evolve 的生成器版本：每完成一代产出一条 GenerationRecord（该代开始时的策略计数和该代的平均收益，
+        没有资源，renewable / non_renewable 为 nan），不保存历史，内存占用与代数无关。
+        num_generations 为 None 时一直运行，由调用者决定何时停止。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        timed = profiler is not None
+        generations = itertools.count() if num_generations is None else range(num_generations)
+
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = (self.strategy_counts['Hawk'], self.strategy_counts['Dove'], self.strategy_counts['Mixed'])
+            payoff_sum = 0
+            if timed:
+                profiler.lap('fraction_counting')
 
-        for _ in range(num_generations):
             # 每一代中，个体与随机选择的对手进行交互
             for i in range(len(self.individuals)):
-                opponent = np.random.choice(self.individuals)
+                opponent = self.individuals[random_buffer.integers(len(self.individuals))]
+                if timed:
+                    profiler.lap('opponent_sampling')
                 payoff_self, payoff_opponent = self.individuals[i].play(opponent, V, C)
+                payoff_sum += payoff_self
+                if timed:
+                    profiler.lap('play_mixed' if 'Mixed' in (self.individuals[i].strategy, opponent.strategy) else 'play')
 
                 # 突变机制
-                if np.random.rand() < mutation_rate:
-                    # 在突变中，混合策略也被作为可能的选项
-                    self.individuals[i].strategy = np.random.choice(['Hawk', 'Dove', 'Mixed'])
+                # 在突变中，混合策略也被作为可能的选项
+                if random_buffer.uniform() < mutation_rate:
+                    self.set_strategy(i, random_buffer.choice(['Hawk', 'Dove', 'Mixed']))
+                if timed:
+                    profiler.lap('mutation')
+            if timed:
+                profiler.end_generation()
 
-            # 计算当前策略的比例
-            hawk_count = sum(1 for ind in self.individuals if ind.strategy == 'Hawk')
-            dove_count = sum(1 for ind in self.individuals if ind.strategy == 'Dove')
-            mixed_count = sum(1 for ind in self.individuals if ind.strategy == 'Mixed')  # 计算混合策略的数量
+            yield GenerationRecord(gen, *counts, np.nan, np.nan, payoff_sum / len(self.individuals))
 
-            hawk_fraction = hawk_count / len(self.individuals)
-            dove_fraction = dove_count / len(self.individuals)
-            mixed_fraction = mixed_count / len(self.individuals)  # 计算混合策略的比例
+    def evolve(self, V, C, mutation_rate, num_generations, plot=True, profiler=None):
+        hawk_fractions = []
+        dove_fractions = []
+        mixed_fractions = []  # 新增，记录混合策略的比例变化
 
-            hawk_fractions.append(hawk_fraction)
-            dove_fractions.append(dove_fraction)
-            mixed_fractions.append(mixed_fraction)  # 记录混合策略的比例变化
+        # 记录的是每代开始时的计数；产出记录时该代已经结束，此时的计数即该代结束时的策略比例
+        for _ in self.iter_evolve(V, C, mutation_rate, num_generations, profiler):
+            hawk_fractions.append(self.strategy_counts['Hawk'] / len(self.individuals))
+            dove_fractions.append(self.strategy_counts['Dove'] / len(self.individuals))
+            mixed_fractions.append(self.strategy_counts['Mixed'] / len(self.individuals))  # 记录混合策略的比例变化
+
+        if not plot:
+            return hawk_fractions, dove_fractions, mixed_fractions
 
         # 绘制结果，包括三种策略的比例随代数的变化
         plt.plot(hawk_fractions, label='Hawk Fraction')
@@ -77,6 +115,8 @@ class Population:
         plt.legend()
         plt.show()
 
+        return hawk_fractions, dove_fractions, mixed_fractions
+
 def main():
     # 获取用户输入
     V = float(input("请输入资源的价值 V: "))
@@ -0,0 +1,278 @@
+import os
+
+# 批量运行不弹出任何窗口，必须在导入 matplotlib 之前设置
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import argparse
+import importlib.util
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+
+from Random_Buffer import reseed
+from Result_Cache import DEFAULT_DIRECTORY, ResultCache, code_version
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_loaded_scripts = {}
+
+
+def load_script(filename):
+    """
+    按文件路径加载同目录（或 RL 子目录）下的脚本模块，文件名中可以包含连字符。
+    """
+    if filename not in _loaded_scripts:
+        path = os.path.join(BASE_DIR, filename)
+        name = os.path.splitext(os.path.basename(filename))[0].replace('-', '_')
+        spec = importlib.util.spec_from_file_location(name, path)
+        module = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(module)
+        _loaded_scripts[filename] = module
+    return _loaded_scripts[filename]
+
+
+def seed_legacy_random(seed):
+    # 原始脚本都使用全局的 np.random，需要在运行前设定其种子
+    if isinstance(seed, np.random.SeedSequence):
+        seed = seed.generate_state(4)
+    if seed is not None:
+        reseed(seed)
+
+
+def _population_args(params, with_mixed=True):
+    params = dict(params)
+    args = [params.pop('population_size'),
+            params.pop('initial_hawk_fraction'),
+            params.pop('initial_dove_fraction')]
+    if with_mixed:
+        args.append(params.pop('initial_mixed_fraction'))
+    return args, params
+
+
+def _fraction_series(hawk_fractions, dove_fractions, mixed_fractions=None, resources=None):
+    series = {'hawk_fraction': np.asarray(hawk_fractions),
+              'dove_fraction': np.asarray(dove_fractions)}
+    if mixed_fractions is not None:
+        series['mixed_fraction'] = np.asarray(mixed_fractions)
+    if resources is not None:
+        series['resources'] = np.asarray(resources)
+    return series
+
+
+def run_replicator(params, seed=None):
+    module = load_script('Hawk-Dove_Game1.py')
+    hawk_fractions, _, _ = module.hawk_dove_game(**params, plot=False)
+    return {'hawk_fraction': np.asarray(hawk_fractions)}
+
+
+def run_advanced(params, seed=None):
+    seed_legacy_random(seed)
+    module = load_script('Advanced_Hawk_Dove_Game.py')
+    return {'hawk_fraction': np.asarray(module.hawk_dove_game_advanced(**params, plot=False))}
+
+
+def run_multi_strategy(params, seed=None):
+    seed_legacy_random(seed)
+    module = load_script('Advanced_Hawk_Dove_Game_MultiStrategy.py')
+    args, params = _population_args(params)
+    return _fraction_series(*module.Population(*args).evolve(**params, plot=False))
+
+
+def run_resource(params, seed=None):
+    seed_legacy_random(seed)
+    module = load_script('Resource_Hawk_Dove_Game.py')
+    args, params = _population_args(params)
+    return _fraction_series(*module.Population(*args).evolve(**params, plot=False))
+
+
+def _run_mixed_resource(filename, params, seed):
+    seed_legacy_random(seed)
+    module = load_script(filename)
+    args, params = _population_args(params)
+    # 与 main() 一致：不可再生资源比例默认为 1 - 可再生资源比例
+    params.setdefault('non_renewable_resource_percent', 1 - params['renewable_resource_percent'])
+    return _fraction_series(*module.Population(*args).evolve(**params, plot=False))
+
+
+def run_resource_combined(params, seed=None):
+    return _run_mixed_resource('Resource_Hawk_Dove_Game_Combined.py', params, seed)
+
+
+def run_resource_custom_recovery(params, seed=None):
+    return _run_mixed_resource('Resource_Hawk_Dove_Game_CustomRecovery.py', params, seed)
+
+
+def run_vectorized(params, seed=None):
+    module = load_script('Vectorized_Hawk_Dove_Game.py')
+    args, params = _population_args(params)
+    population = module.VectorizedPopulation(*args, rng=np.random.default_rng(seed))
+    return _fraction_series(*population.evolve(**params))
+
+
+def _run_q_learning(filename, params, seed, with_mixed=True):
+    seed_legacy_random(seed)
+    module = load_script(filename)
+    args, params = _population_args(params, with_mixed)
+    return _fraction_series(*module.Population(*args).evolve(**params))
+
+
+def run_q_learning(params, seed=None):
+    return _run_q_learning(os.path.join('RL', 'Hawk_Dove_RL.py'), params, seed, with_mixed=False)
+
+
+def run_q_learning_multi_strategy(params, seed=None):
+    return _run_q_learning(os.path.join('RL', 'Hawk_Dove_MultiStrategy.py'), params, seed)
+
+
+def run_q_learning_mutation(params, seed=None):
+    return _run_q_learning(os.path.join('RL', 'HDM_Mut.py'), params, seed)
+
+
+def run_vectorized_q_learning(params, seed=None):
+    module = load_script(os.path.join('RL', 'Vectorized_Q_Learning.py'))
+    params = dict(params)
+    num_strategies = params.pop('num_strategies', 3)
+    args, params = _population_args(params, with_mixed=num_strategies > 2)
+    population = module.VectorizedQPopulation(*args, num_strategies=num_strategies, rng=np.random.default_rng(seed))
+    return _fraction_series(*population.evolve(**params))
+
+
+# 模型名称 -> 运行函数，每个运行函数接收参数字典和可选的种子，返回 {序列名: 数组}
+MODELS = {
+    'replicator': run_replicator,
+    'advanced': run_advanced,
+    'multi_strategy': run_multi_strategy,
+    'resource': run_resource,
+    'resource_combined': run_resource_combined,
+    'resource_custom_recovery': run_resource_custom_recovery,
+    'vectorized': run_vectorized,
+    'q_learning': run_q_learning,
+    'q_learning_multi_strategy': run_q_learning_multi_strategy,
+    'q_learning_mutation': run_q_learning_mutation,
+    'vectorized_q_learning': run_vectorized_q_learning,
+}
+
+
+# 各模型运行时加载的脚本，与公共模块一起决定缓存键中的代码版本
+MODEL_SCRIPTS = {
+    'replicator': 'Hawk-Dove_Game1.py',
+    'advanced': 'Advanced_Hawk_Dove_Game.py',
+    'multi_strategy': 'Advanced_Hawk_Dove_Game_MultiStrategy.py',
+    'resource': 'Resource_Hawk_Dove_Game.py',
+    'resource_combined': 'Resource_Hawk_Dove_Game_Combined.py',
+    'resource_custom_recovery': 'Resource_Hawk_Dove_Game_CustomRecovery.py',
+    'vectorized': 'Vectorized_Hawk_Dove_Game.py',
+    'q_learning': os.path.join('RL', 'Hawk_Dove_RL.py'),
+    'q_learning_multi_strategy': os.path.join('RL', 'Hawk_Dove_MultiStrategy.py'),
+    'q_learning_mutation': os.path.join('RL', 'HDM_Mut.py'),
+    'vectorized_q_learning': os.path.join('RL', 'Vectorized_Q_Learning.py'),
+}
+COMMON_SOURCES = ['Batch_Runner.py', 'Random_Buffer.py', 'Resource_Depletion.py', 'Vectorized_Hawk_Dove_Game.py']
+
+
+def run_model(model, params, seed=None, cache=None):
+    """
+    运行一个模型，返回 ({序列名: 数组}, 是否命中缓存)。
+
+    cache 为 Result_Cache.ResultCache 时先按 (模型, 参数, 种子, 代码版本) 查找，
+    未命中时运行并保存结果；seed 为 None 的运行不可重复，不使用缓存。
+    """
+    if model not in MODELS:
+        raise ValueError(f"未知模型 '{model}'，可选: {', '.join(sorted(MODELS))}")
+    if cache is None:
+        return MODELS[model](params, seed), False
+    version = code_version(COMMON_SOURCES + [MODEL_SCRIPTS[model]])
+    return cache.get_or_compute(model, params, seed, version, lambda: MODELS[model](params, seed))
+
+
+def load_scenarios(path):
+    """
+    读取场景文件（JSON 或 TOML）。
+
+    文件可以是场景列表，或包含 "scenarios" 列表的对象；每个场景形如
+    {"name": "...", "model": "multi_strategy", "params": {...}, "seed": 1}，
+    其中 name 和 seed 可省略。
+    """
+    if path.endswith('.toml'):
+        import tomllib
+        with open(path, 'rb') as f:
+            data = tomllib.load(f)
+    else:
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+
+    scenarios = data['scenarios'] if isinstance(data, dict) else data
+    for index, scenario in enumerate(scenarios):
+        scenario.setdefault('name', f"{index:04d}_{scenario['model']}")
+        scenario.setdefault('params', {})
+        scenario.setdefault('seed', None)
+    return scenarios
+
+
+def run_scenario(scenario, output_dir, cache_dir=None):
+    # 在工作进程中运行一个场景并把结果写入 <name>.npz，失败时记录错误而不中断整个批次；
+    # cache_dir 不为 None 时相同的场景直接从结果缓存中读取
+    start = time.perf_counter()
+    record = {'name': scenario['name'], 'model': scenario['model'],
+              'params': scenario['params'], 'seed': scenario['seed']}
+    try:
+        cache = ResultCache(cache_dir) if cache_dir is not None else None
+        series, hit = run_model(scenario['model'], scenario['params'], scenario['seed'], cache)
+        path = os.path.join(output_dir, f"{scenario['name']}.npz")
+        np.savez_compressed(path, **series)
+        record.update(status='ok', output=os.path.basename(path))
+        if cache is not None:
+            record['cache'] = 'hit' if hit else 'miss'
+    except Exception as exc:
+        record.update(status='error', error=f"{type(exc).__name__}: {exc}")
+    record['elapsed'] = time.perf_counter() - start
+    return record
+
+
+def run_batch(scenarios, output_dir, workers=None, cache_dir=None):
+    """
+    用进程池并行运行所有场景，结果写入 output_dir，并生成 summary.json。
+
+    参数:
+    scenarios - load_scenarios 返回的场景列表
+    output_dir - 输出目录
+    workers - 工作进程数，默认为 CPU 核数
+    cache_dir - 结果缓存目录，None 表示不使用缓存
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    records = []
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(run_scenario, scenario, output_dir, cache_dir) for scenario in scenarios]
+        for future in as_completed(futures):
+            record = future.result()
+            records.append(record)
+            cached = f", cache {record['cache']}" if 'cache' in record else ''
+            print(f"[{len(records)}/{len(scenarios)}] {record['name']}: {record['status']} "
+                  f"({record['elapsed']:.2f}s{cached})")
+
+    records.sort(key=lambda r: r['name'])
+    with open(os.path.join(output_dir, 'summary.json'), 'w', encoding='utf-8') as f:
+        json.dump(records, f, indent=2, ensure_ascii=False)
+    return records
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run Hawk-Dove scenarios headless on a process pool.')
+    parser.add_argument('scenarios', help='scenario file (.json or .toml)')
+    parser.add_argument('-o', '--output', default='results', help='output directory')
+    parser.add_argument('-j', '--workers', type=int, default=None, help='number of worker processes')
+    parser.add_argument('--cache-dir', default=None, help='result cache directory (default: .result_cache)')
+    parser.add_argument('--no-cache', action='store_true', help='always recompute, ignoring the result cache')
+    args = parser.parse_args()
+
+    cache_dir = None if args.no_cache else (args.cache_dir or DEFAULT_DIRECTORY)
+    records = run_batch(load_scenarios(args.scenarios), args.output, args.workers, cache_dir)
+    failed = [r for r in records if r['status'] != 'ok']
+    if failed:
+        raise SystemExit(f"{len(failed)} 个场景运行失败，详见 summary.json")
+
+if __name__ == "__main__":
+    main()
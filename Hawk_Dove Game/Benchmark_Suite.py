@@ -0,0 +1,260 @@
+import os
+
+# 基准测试不弹出任何窗口，必须在导入 matplotlib 之前设置
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import argparse
+import json
+import platform
+import subprocess
+import time
+import tracemalloc
+from collections import namedtuple
+
+import numpy as np
+
+from Batch_Runner import BASE_DIR, load_script
+from Random_Buffer import reseed
+
+# 初始策略组合 (鹰, 鸽, 混合)
+MIXES = {
+    'balanced': (1 / 3, 1 / 3, 1 / 3),
+    'hawk_heavy': (0.8, 0.1, 0.1),
+    'mixed_heavy': (0.1, 0.1, 0.8),
+}
+
+V, C, MUTATION_RATE = 50, 70, 0.01
+
+# 马尔可夫链基准使用 MarkovChain.main 中的转移矩阵
+MARKOV_MATRIX = [[0.6, 0.3, 0.1], [0.4, 0.4, 0.2], [0.2, 0.5, 0.3]]
+MARKOV_STATES = ['Hawk', 'Dove', 'Mixed']
+
+
+# factory(size, generations, mix) 完成初始化（不计时），返回 (run, interactions)：
+# run 为无参数的待测函数，interactions 为 run 完成的交互（或状态更新）次数。
+# quick / full 为两种规模档位下的 (群体规模列表, 代数列表)；uses_mix 为 False 时只用 balanced
+Benchmark = namedtuple('Benchmark', ['factory', 'quick', 'full', 'uses_mix'])
+
+
+def _replicator(size, generations, mix):
+    module = load_script('Hawk-Dove_Game1.py')
+    return (lambda: module.hawk_dove_game(V, C, mix[0], generations, plot=False)), generations
+
+
+def _replicator_sweep(size, generations, mix):
+    module = load_script('Replicator_Dynamics.py')
+    h0 = np.linspace(0.01, 0.99, size)
+    return (lambda: module.replicator_sweep(V, C, h0, generations)), size * generations
+
+
+def _multi_strategy(size, generations, mix):
+    module = load_script('Advanced_Hawk_Dove_Game_MultiStrategy.py')
+    population = module.Population(size, *mix)
+    return (lambda: population.evolve(V, C, MUTATION_RATE, generations, plot=False)), size * generations
+
+
+def _resource(size, generations, mix):
+    module = load_script('Resource_Hawk_Dove_Game_CustomRecovery.py')
+    population = module.Population(size, *mix)
+    return ((lambda: population.evolve(V, C, MUTATION_RATE, generations, 100 * size, 0.5, 0.5, 10 * size, plot=False)),
+            size * generations)
+
+
+def _vectorized(size, generations, mix):
+    module = load_script('Vectorized_Hawk_Dove_Game.py')
+    population = module.VectorizedPopulation(size, *mix, rng=np.random.default_rng(0))
+    return (lambda: population.evolve(V, C, MUTATION_RATE, generations)), size * generations
+
+
+def _q_learning(size, generations, mix):
+    module = load_script(os.path.join('RL', 'HDM_Mut.py'))
+    population = module.Population(size, *mix)
+    return (lambda: population.evolve(V, C, MUTATION_RATE, generations)), size * generations
+
+
+def _vectorized_q_learning(size, generations, mix):
+    module = load_script(os.path.join('RL', 'Vectorized_Q_Learning.py'))
+    population = module.VectorizedQPopulation(size, *mix, rng=np.random.default_rng(0))
+    return (lambda: population.evolve(V, C, MUTATION_RATE, generations, resample=True)), size * generations
+
+
+def _markov(size, generations, mix):
+    module = load_script(os.path.join('RL', 'MarkovChain.py'))
+    chain = module.MarkovChain(MARKOV_MATRIX, MARKOV_STATES)
+    return (lambda: chain.simulate(generations)), generations
+
+
+def _markov_codes(size, generations, mix):
+    module = load_script(os.path.join('RL', 'MarkovChain.py'))
+    chain = module.MarkovChain(MARKOV_MATRIX, MARKOV_STATES)
+    return (lambda: chain.simulate_codes(generations, np.random.default_rng(0))), generations
+
+
+def _lattice(size, generations, mix):
+    module = load_script('Spatial_Hawk_Dove_Game.py')
+    side = int(round(np.sqrt(size)))
+    population = module.LatticePopulation(side, side, *mix, rng=np.random.default_rng(0))
+    interactions = population.strategies.size * len(population.offsets) * generations
+    return (lambda: population.evolve(V, C, MUTATION_RATE, generations)), interactions
+
+
+def _network(size, generations, mix):
+    module = load_script('Network_Hawk_Dove_Game.py')
+    rng = np.random.default_rng(0)
+    adjacency = module.adjacency_from_edges(rng.integers(0, size, size=(5 * size, 2)), size)
+    population = module.NetworkPopulation(adjacency, *mix, rng=rng)
+    return (lambda: population.evolve(V, C, MUTATION_RATE, generations)), adjacency.nnz * generations
+
+
+BENCHMARKS = {
+    'replicator': Benchmark(_replicator, ([1], [1000]), ([1], [1000, 100000]), True),
+    'replicator_sweep': Benchmark(_replicator_sweep, ([1000], [100]), ([100, 10000], [100, 1000]), False),
+    'multi_strategy': Benchmark(_multi_strategy, ([1000], [10]), ([100, 1000, 10000], [10, 100]), True),
+    'resource': Benchmark(_resource, ([1000], [10]), ([100, 1000, 10000], [10, 100]), True),
+    'vectorized': Benchmark(_vectorized, ([100000], [10]), ([1000, 100000, 1000000], [10, 100]), True),
+    'q_learning': Benchmark(_q_learning, ([200], [5]), ([100, 1000], [10, 50]), True),
+    'vectorized_q_learning': Benchmark(_vectorized_q_learning, ([100000], [10]),
+                                       ([1000, 100000, 1000000], [10, 100]), True),
+    'markov': Benchmark(_markov, ([1], [10000]), ([1], [10000, 100000]), False),
+    'markov_codes': Benchmark(_markov_codes, ([1], [1000000]), ([1], [1000000, 10000000]), False),
+    'lattice': Benchmark(_lattice, ([65536], [5]), ([65536, 1048576, 16777216], [5, 20]), True),
+    'network': Benchmark(_network, ([100000], [5]), ([10000, 100000, 1000000], [5, 20]), True),
+}
+
+
+def result_key(record):
+    # 用于在两次运行之间匹配同一个测试点
+    return f"{record['benchmark']}|size={record['size']}|generations={record['generations']}|mix={record['mix']}"
+
+
+def measure(name, size, generations, mix, repeat=3):
+    """
+    对一个测试点计时 repeat 次取最快的一次，再在 tracemalloc 下单独运行一次
+    （包括初始化）记录峰值内存，避免内存追踪的开销影响计时。
+    """
+    benchmark = BENCHMARKS[name]
+    times = []
+    for _ in range(repeat):
+        reseed(0)
+        run, interactions = benchmark.factory(size, generations, MIXES[mix])
+        start = time.perf_counter()
+        run()
+        times.append(time.perf_counter() - start)
+
+    reseed(0)
+    tracemalloc.start()
+    try:
+        run, _ = benchmark.factory(size, generations, MIXES[mix])
+        run()
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    seconds = min(times)
+    return {
+        'benchmark': name,
+        'size': size,
+        'generations': generations,
+        'mix': mix,
+        'seconds': seconds,
+        'interactions': interactions,
+        'interactions_per_sec': interactions / seconds if seconds > 0 else float('inf'),
+        'peak_memory_bytes': peak,
+    }
+
+
+def _git_commit():
+    try:
+        return subprocess.run(['git', 'rev-parse', 'HEAD'], cwd=BASE_DIR, capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(names=None, profile='quick', repeat=3):
+    """
+    运行基准测试，返回可以直接写成 JSON 的结果（包括运行环境信息）。
+
+    参数:
+    names - 要运行的基准名称列表，默认为全部 BENCHMARKS
+    profile - 'quick' 或 'full'，决定群体规模、代数和策略组合的范围
+    repeat - 每个测试点的计时次数
+    """
+    results = []
+    for name in names or BENCHMARKS:
+        benchmark = BENCHMARKS[name]
+        sizes, generation_counts = getattr(benchmark, profile)
+        mixes = list(MIXES) if benchmark.uses_mix and profile == 'full' else ['balanced']
+        for size in sizes:
+            for generations in generation_counts:
+                for mix in mixes:
+                    record = measure(name, size, generations, mix, repeat)
+                    print(f"{result_key(record)}: {record['seconds']:.4f} s, "
+                          f"{record['interactions_per_sec']:.3g} interactions/s, "
+                          f"peak {record['peak_memory_bytes'] / 2**20:.1f} MiB")
+                    results.append(record)
+
+    return {
+        'metadata': {
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+            'commit': _git_commit(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'profile': profile,
+            'repeat': repeat,
+        },
+        'results': results,
+    }
+
+
+def compare(baseline, current, threshold=0.1):
+    """
+    按测试点比较两次运行的结果，返回回归列表。
+
+    吞吐量（interactions/s）下降超过 threshold，或峰值内存增加超过 threshold，都记为回归。
+    只出现在其中一次运行中的测试点会被忽略。
+    """
+    previous = {result_key(record): record for record in baseline['results']}
+    regressions = []
+    for record in current['results']:
+        key = result_key(record)
+        if key not in previous:
+            continue
+        old = previous[key]
+        speed = record['interactions_per_sec'] / old['interactions_per_sec']
+        memory = record['peak_memory_bytes'] / max(old['peak_memory_bytes'], 1)
+        print(f"{key}: throughput x{speed:.2f}, peak memory x{memory:.2f}")
+        if speed < 1 - threshold:
+            regressions.append({'key': key, 'metric': 'interactions_per_sec', 'ratio': speed})
+        if memory > 1 + threshold:
+            regressions.append({'key': key, 'metric': 'peak_memory_bytes', 'ratio': memory})
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark every Hawk-Dove engine headless and check for regressions.')
+    parser.add_argument('-b', '--benchmarks', nargs='+', choices=sorted(BENCHMARKS), default=None,
+                        help='benchmarks to run (default: all)')
+    parser.add_argument('-p', '--profile', choices=['quick', 'full'], default='quick')
+    parser.add_argument('-r', '--repeat', type=int, default=3, help='timed runs per point (best is kept)')
+    parser.add_argument('-o', '--output', default='benchmarks.json')
+    parser.add_argument('--compare', help='baseline JSON written by an earlier run')
+    parser.add_argument('--threshold', type=float, default=0.1, help='relative change counted as a regression')
+    args = parser.parse_args()
+
+    report = run_suite(args.benchmarks, args.profile, args.repeat)
+    with open(args.output, 'w', encoding='utf-8') as f:
+        json.dump(report, f, indent=2)
+
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(baseline, report, args.threshold)
+        if regressions:
+            for regression in regressions:
+                print(f"回归: {regression['key']} {regression['metric']} x{regression['ratio']:.2f}")
+            raise SystemExit(1)
+
+if __name__ == "__main__":
+    main()
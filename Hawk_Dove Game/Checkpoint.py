@@ -0,0 +1,114 @@
+import json
+import os
+
+import numpy as np
+
+from Trajectory_Store import GENERATION_COLUMNS, TrajectoryStore
+
+# run_with_checkpoints 把轨迹写入与检查点同名、带此后缀的 TrajectoryStore 目录
+TRAJECTORY_SUFFIX = '.trajectory'
+
+
+def _to_builtin(value):
+    # json 无法直接序列化的 numpy 对象（例如 MT19937 的 key 数组）
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+    if isinstance(value, np.generic):
+        return value.item()
+    raise TypeError(f"无法序列化的类型: {type(value).__name__}")
+
+
+def save_checkpoint(path, state, trajectory_length=None):
+    """
+    把完整的模拟状态写入一个 .npz 检查点文件。
+
+    先写入临时文件再用 os.replace 替换，进程在写入过程中被终止时原有的检查点保持完整。
+
+    参数:
+    path - 检查点文件路径
+    state - population.state_dict() 返回的字典；数组和标量按原类型保存，
+            字典（例如随机数生成器的状态）以 JSON 字符串保存
+    trajectory_length - 保存检查点时轨迹已写入的行数（轨迹本身保存在 TrajectoryStore 中）
+    """
+    arrays = {}
+    json_keys = []
+    for name, value in state.items():
+        if isinstance(value, dict):
+            arrays[name] = np.array(json.dumps(value, default=_to_builtin))
+            json_keys.append(name)
+        else:
+            arrays[name] = np.asarray(value)
+    arrays['__json_keys__'] = np.array(json.dumps(json_keys))
+    if trajectory_length is not None:
+        arrays['__trajectory_length__'] = np.array(trajectory_length)
+
+    temporary = path + '.tmp'
+    with open(temporary, 'wb') as f:
+        np.savez(f, **arrays)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(temporary, path)
+
+
+def load_checkpoint(path):
+    """
+    读取 save_checkpoint 写入的检查点，返回 (state, trajectory_length)。
+    state 中的零维数组还原为 Python 标量；没有记录轨迹长度时 trajectory_length 为 None。
+    """
+    with np.load(path) as data:
+        json_keys = set(json.loads(data['__json_keys__'].item()))
+        state = {}
+        for name in data.files:
+            if name.startswith('__'):
+                continue
+            value = data[name]
+            if name in json_keys:
+                state[name] = json.loads(value.item())
+            elif value.ndim == 0:
+                state[name] = value.item()
+            else:
+                state[name] = value
+        trajectory_length = data['__trajectory_length__'].item() if '__trajectory_length__' in data.files else None
+    return state, trajectory_length
+
+
+def run_with_checkpoints(population, path, num_generations, every=1000, **evolve_args):
+    """
+    用 population.iter_evolve 运行到第 num_generations 代，每 every 代自动保存一次检查点。
+
+    每代的 GenerationRecord 追加到 path + TRAJECTORY_SUFFIX 目录下的 TrajectoryStore，
+    检查点只保存群体状态和轨迹的行数，每次保存的开销与已运行的代数无关。
+    如果 path 已经存在，先用 population.load_state_dict 恢复状态，把轨迹截断到检查点记录的行数
+    （丢弃上次保存之后写入的代），再从中断的那一代继续；恢复后的结果与不中断地运行完全相同。
+
+    参数:
+    population - 提供 iter_evolve、state_dict、load_state_dict 和 generation 的群体
+    path - 检查点文件路径
+    num_generations - 总代数（包括恢复之前已经完成的代数）
+    every - 检查点间隔（代数）
+    evolve_args - 传给 iter_evolve 的其余参数（关键字形式）
+
+    返回:
+    保存全部代轨迹的 TrajectoryStore（列为 GENERATION_COLUMNS，已 flush）
+    """
+    trajectory_path = path + TRAJECTORY_SUFFIX
+    resume = os.path.exists(path)
+    if resume:
+        state, trajectory_length = load_checkpoint(path)
+        population.load_state_dict(state)
+        store = TrajectoryStore.open(trajectory_path, mode='r+')
+        store.truncate(trajectory_length)
+    else:
+        store = TrajectoryStore.create(trajectory_path, GENERATION_COLUMNS, num_generations)
+
+    remaining = num_generations - population.generation
+    for record in population.iter_evolve(num_generations=remaining, resume=resume, **evolve_args):
+        store.append(record)
+        if population.generation % every == 0:
+            # 先把轨迹落盘，检查点记录的行数不会超过磁盘上已有的行数
+            store.flush()
+            save_checkpoint(path, population.state_dict(), len(store))
+
+    store.flush()
+    save_checkpoint(path, population.state_dict(), len(store))
+    return store
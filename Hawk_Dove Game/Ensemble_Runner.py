@@ -0,0 +1,131 @@
+import os
+
+os.environ.setdefault('MPLBACKEND', 'Agg')
+
+import argparse
+import json
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+
+from Batch_Runner import run_model
+from Result_Cache import DEFAULT_DIRECTORY, ResultCache
+
+
+class EnsembleStatistics:
+    """
+    按代累积多个重复实验的统计量（Welford 在线算法），不保存每个重复的轨迹。
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.mean = {}
+        self._m2 = {}
+
+    def add(self, series):
+        # 按重复编号的顺序加入，保证结果与工作进程数无关
+        self.count += 1
+        for name, values in series.items():
+            values = np.asarray(values, dtype=float)
+            if name not in self.mean:
+                self.mean[name] = np.zeros_like(values)
+                self._m2[name] = np.zeros_like(values)
+            delta = values - self.mean[name]
+            self.mean[name] += delta / self.count
+            self._m2[name] += delta * (values - self.mean[name])
+
+    def variance(self, name):
+        # 样本方差（无偏），只有一个重复时为 0
+        if self.count < 2:
+            return np.zeros_like(self.mean[name])
+        return self._m2[name] / (self.count - 1)
+
+    def confidence_band(self, name, level=0.95):
+        """
+        返回均值的正态近似置信带 (lower, upper)。
+        """
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        half_width = z * np.sqrt(self.variance(name) / max(self.count, 1))
+        return self.mean[name] - half_width, self.mean[name] + half_width
+
+    def summary(self, level=0.95):
+        result = {}
+        for name in self.mean:
+            lower, upper = self.confidence_band(name, level)
+            result[name] = {'mean': self.mean[name], 'variance': self.variance(name),
+                            'lower': lower, 'upper': upper}
+        return result
+
+
+def run_replicate(task):
+    model, params, seed_sequence, cache_dir = task
+    cache = ResultCache(cache_dir) if cache_dir is not None else None
+    series, _ = run_model(model, params, seed_sequence, cache)
+    return series
+
+
+def iter_ensemble(model, params, replicates, seed=0, workers=None, cache_dir=None):
+    """
+    在工作进程中并行运行 replicates 个重复实验，每完成一个（按编号顺序）就产出一次
+    更新后的 EnsembleStatistics。
+
+    每个重复从根种子 seed 经 np.random.SeedSequence.spawn 得到独立的子种子，
+    因而结果只取决于 seed，与工作进程数无关。
+
+    参数:
+    model - Batch_Runner.MODELS 中的模型名称
+    params - 模型参数字典
+    replicates - 重复次数
+    seed - 根种子
+    workers - 工作进程数，默认为 CPU 核数
+    cache_dir - 结果缓存目录（子种子也是缓存键的一部分），None 表示不使用缓存
+    """
+    children = np.random.SeedSequence(seed).spawn(replicates)
+    tasks = [(model, params, child, cache_dir) for child in children]
+    stats = EnsembleStatistics()
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # executor.map 按提交顺序返回结果
+        for series in executor.map(run_replicate, tasks):
+            stats.add(series)
+            yield stats
+
+
+def run_ensemble(model, params, replicates, seed=0, workers=None, cache_dir=None):
+    stats = None
+    for stats in iter_ensemble(model, params, replicates, seed, workers, cache_dir):
+        pass
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Run a seeded Monte Carlo ensemble of one Hawk-Dove model.')
+    parser.add_argument('model', help='model name, see Batch_Runner.MODELS')
+    parser.add_argument('params', help='model parameters as a JSON object or path to a JSON file')
+    parser.add_argument('-r', '--replicates', type=int, default=10)
+    parser.add_argument('-s', '--seed', type=int, default=0)
+    parser.add_argument('-j', '--workers', type=int, default=None)
+    parser.add_argument('-l', '--level', type=float, default=0.95, help='confidence level')
+    parser.add_argument('-o', '--output', default='ensemble.npz')
+    parser.add_argument('--cache-dir', default=None, help='result cache directory (default: .result_cache)')
+    parser.add_argument('--no-cache', action='store_true', help='always recompute, ignoring the result cache')
+    args = parser.parse_args()
+
+    if os.path.exists(args.params):
+        with open(args.params, encoding='utf-8') as f:
+            params = json.load(f)
+    else:
+        params = json.loads(args.params)
+
+    cache_dir = None if args.no_cache else (args.cache_dir or DEFAULT_DIRECTORY)
+    for stats in iter_ensemble(args.model, params, args.replicates, args.seed, args.workers, cache_dir):
+        print(f"已完成 {stats.count}/{args.replicates} 个重复")
+
+    arrays = {f"{name}_{key}": value
+              for name, columns in stats.summary(args.level).items()
+              for key, value in columns.items()}
+    np.savez_compressed(args.output, replicates=stats.count, **arrays)
+
+if __name__ == "__main__":
+    main()
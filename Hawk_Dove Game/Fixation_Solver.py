@@ -0,0 +1,131 @@
+import importlib.util
+import itertools
+import os
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from Moran_Process import MoranProcess
+
+
+def _load_markov_chain():
+    # MarkovChain.py 在 RL 子目录中，按文件路径加载（与 Batch_Runner.load_script 相同），不修改 sys.path
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'RL', 'MarkovChain.py')
+    spec = importlib.util.spec_from_file_location('MarkovChain', path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+BirthDeathChain = _load_markov_chain().BirthDeathChain
+
+# solve 返回的各项（也是 solve_grid 返回的数组名称）
+RESULT_FIELDS = [
+    'hawk_fixation',          # 一只鹰入侵全鸽群体并固定的概率 rho_H
+    'dove_fixation',          # 一只鸽入侵全鹰群体并固定的概率 rho_D
+    'hawk_fixation_time',     # 以鹰固定为条件、从一只鹰开始的平均代数
+    'dove_fixation_time',     # 以鸽固定为条件、从一只鸽开始的平均代数
+    'hawk_absorption_time',   # 从一只鹰开始到固定或灭绝的平均代数
+    'hawk_abundance',         # 突变率很小时群体处于全鹰状态的时间比例 rho_H / (rho_H + rho_D)
+]
+
+
+def moran_chain(population_size, V, C, selection_intensity=0.1, fitness='exponential'):
+    """
+    与 Moran_Process.MoranProcess 相同的 Moran 过程所对应的生灭链（状态为鹰的数量 0..N）。
+    """
+    process = MoranProcess(population_size, V, C, selection_intensity, fitness)
+    return BirthDeathChain(process.up, process.down)
+
+
+def solve(population_size, V, C, selection_intensity=0.1, fitness='exponential', profiles=False):
+    """
+    精确计算一组参数下鹰和鸽的固定概率与吸收时间（时间以代计，即 Moran 步数 / N）。
+
+    参数:
+    population_size - 群体规模 N，可以达到 10^6 以上
+    V - 资源的价值
+    C - 打斗的代价
+    selection_intensity - 选择强度 w
+    fitness - 'exponential' 或 'linear'，见 MoranProcess
+    profiles - 为 True 时还返回从每个状态 i 出发的完整数组：
+               'fixation_probabilities'、'absorption_times'、'fixation_times'、'extinction_times'
+
+    返回:
+    以 RESULT_FIELDS 为键的字典
+    """
+    N = population_size
+    chain = moran_chain(N, V, C, selection_intensity, fitness)
+    log_phi = chain.log_fixation_probabilities()
+    log_extinction = chain.log_extinction_probabilities()
+    absorption, conditional_n, conditional_0 = chain.absorption_times()
+
+    # 一只鸽入侵全鹰群体 = 从 N - 1 只鹰出发被 0 吸收；比例 rho_H / (rho_H + rho_D) 也在对数空间中计算，
+    # 两个固定概率都下溢为 0 时仍然有意义
+    log_hawk, log_dove = log_phi[1], log_extinction[N - 1]
+    with np.errstate(over='ignore'):
+        hawk_abundance = 1 / (1 + np.exp(log_dove - log_hawk))
+    result = {
+        'hawk_fixation': np.exp(log_hawk),
+        'dove_fixation': np.exp(log_dove),
+        'hawk_fixation_time': conditional_n[1] / N,
+        'dove_fixation_time': conditional_0[N - 1] / N,
+        'hawk_absorption_time': absorption[1] / N,
+        'hawk_abundance': hawk_abundance,
+    }
+    if profiles:
+        result['fixation_probabilities'] = np.exp(log_phi)
+        result['absorption_times'] = absorption / N
+        result['fixation_times'] = conditional_n / N
+        result['extinction_times'] = conditional_0 / N
+    return result
+
+
+def solve_grid(V_values, C_values, population_sizes, selection_intensity=0.1, fitness='exponential'):
+    """
+    在 (V, C, N) 网格上逐点调用 solve，每个点只需 O(N) 的计算。
+
+    返回:
+    以 RESULT_FIELDS 为键的字典，每项为形状 (len(V_values), len(C_values), len(population_sizes)) 的数组
+    """
+    V_values, C_values, population_sizes = (np.atleast_1d(values) for values in (V_values, C_values, population_sizes))
+    shape = (V_values.size, C_values.size, population_sizes.size)
+    grid = {field: np.empty(shape) for field in RESULT_FIELDS}
+    for (i, V), (j, C), (k, N) in itertools.product(enumerate(V_values), enumerate(C_values),
+                                                    enumerate(population_sizes)):
+        result = solve(int(N), V, C, selection_intensity, fitness)
+        for field in RESULT_FIELDS:
+            grid[field][i, j, k] = result[field]
+    return grid
+
+
+def main():
+    # 获取用户输入
+    V = float(input("请输入资源的价值 V: "))
+    C = float(input("请输入打斗的代价 C: "))
+    population_size = int(input("请输入群体规模 N: "))
+    selection_intensity = float(input("请输入选择强度 w: "))
+
+    result = solve(population_size, V, C, selection_intensity, profiles=True)
+    print(f"鹰的固定概率 rho_H: {result['hawk_fixation']:.6g}（中性为 {1 / population_size:.6g}）")
+    print(f"鸽的固定概率 rho_D: {result['dove_fixation']:.6g}")
+    print(f"条件固定时间: 鹰 {result['hawk_fixation_time']:.6g} 代，鸽 {result['dove_fixation_time']:.6g} 代")
+    print(f"小突变率下处于全鹰状态的时间比例: {result['hawk_abundance']:.6g}")
+
+    # 绘制从每个状态出发的固定概率和条件固定时间
+    fractions = np.arange(population_size + 1) / population_size
+    fig, axs = plt.subplots(1, 2, figsize=(14, 6))
+    axs[0].plot(fractions, result['fixation_probabilities'])
+    axs[0].set_xlabel('Initial Hawk Fraction')
+    axs[0].set_ylabel('Hawk Fixation Probability')
+    axs[1].plot(fractions, result['fixation_times'], label='Conditional on Hawk Fixation')
+    axs[1].plot(fractions, result['extinction_times'], label='Conditional on Hawk Extinction')
+    axs[1].set_xlabel('Initial Hawk Fraction')
+    axs[1].set_ylabel('Expected Generations')
+    axs[1].set_yscale('log')
+    axs[1].legend()
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
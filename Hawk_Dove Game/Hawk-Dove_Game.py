@@ -8,6 +8,7 @@ C = 70  # 鹰之间打斗的代价
 # 初始条件
 initial_hawk_fraction = 0.5  # 初始鹰的比例
 num_generations = 100  # 演化的代数
+tolerance = None  # 收敛容差，设为如 1e-10 时到达不动点后提前停止
 
 # 定义适应度函数
 def fitness(hawk_fraction):
@@ -36,6 +37,12 @@ for _ in range(num_generations):
     
     hawk_fractions.append(new_hawk_fraction)
 
+    # 收敛检测：剩余代数直接用不动点填充
+    if tolerance is not None and abs(new_hawk_fraction - current_hawk_fraction) < tolerance:
+        print(f"第 {len(hawk_fractions) - 1} 代收敛，鹰的比例 = {new_hawk_fraction:.6f}")
+        hawk_fractions.extend([new_hawk_fraction] * (num_generations + 1 - len(hawk_fractions)))
+        break
+
 # 绘制结果
 plt.plot(hawk_fractions, label='Hawk Fraction')
 plt.xlabel('Generation')
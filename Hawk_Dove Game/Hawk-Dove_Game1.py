@@ -1,8 +1,9 @@
 import numpy as np
 import matplotlib.pyplot as plt
+from Trajectory_Store import TrajectoryStore, replicator_columns
 
 # 定义演化博弈函数
-def hawk_dove_game(V, C, initial_hawk_fraction=0.5, num_generations=100):
+def hawk_dove_game(V, C, initial_hawk_fraction=0.5, num_generations=100, tol=None, plot=True, path=None):
     """
     运行鹰鸽博弈模型，并展示鹰的比例如何随时间演化。
 
@@ -11,6 +12,15 @@ def hawk_dove_game(V, C, initial_hawk_fraction=0.5, num_generations=100):
     C - 打斗的代价
     initial_hawk_fraction - 初始鹰的比例
     num_generations - 演化的代数
+    tol - 收敛容差，设置后相邻两代变化小于 tol 时提前停止，剩余代数用不动点填充
+    plot - 是否绘图
+    path - 设置后轨迹逐代写入该目录下的 Trajectory_Store.TrajectoryStore（列为 replicator_columns()），
+           不在内存中保存完整轨迹
+
+    返回:
+    hawk_fractions - 长度为 num_generations + 1 的鹰比例序列（设置 path 时为存储对象）
+    equilibrium - 最终停留的鹰比例（收敛时为到达的不动点）
+    converged_at - 到达不动点的代数，未收敛（或未设置 tol）时为 -1
     """
     
     # 定义适应度函数
@@ -26,11 +36,21 @@ def hawk_dove_game(V, C, initial_hawk_fraction=0.5, num_generations=100):
         return hawk_payoff, dove_payoff
 
     # 模拟演化
-    hawk_fractions = [initial_hawk_fraction]
+    if path is None:
+        hawk_fractions = [initial_hawk_fraction]
+    else:
+        hawk_fractions = TrajectoryStore.create(path, replicator_columns(), num_generations + 1)
+        hawk_fractions.append({'generation': 0, 'hawk_fraction': initial_hawk_fraction})
+    current_hawk_fraction = initial_hawk_fraction
+    converged_at = -1
+    # 与 Replicator_Dynamics.replicator_converge 相同：从 0、1 或混合均衡 V/C 出发时本身就是不动点，
+    # 第 0 代即收敛
+    at_fixed_point = tol is not None and (initial_hawk_fraction in (0, 1) or
+                                          (C > V and abs(initial_hawk_fraction - V / C) < tol))
+    if at_fixed_point:
+        converged_at = 0
 
-    for _ in range(num_generations):
-        current_hawk_fraction = hawk_fractions[-1]
-        
+    for gen in range(1, 0 if at_fixed_point else num_generations + 1):
         hawk_fitness, dove_fitness = fitness(current_hawk_fraction)
         
         # 更新鹰的比例
@@ -38,16 +58,45 @@ def hawk_dove_game(V, C, initial_hawk_fraction=0.5, num_generations=100):
             current_hawk_fraction * hawk_fitness + (1 - current_hawk_fraction) * dove_fitness
         )
         
-        hawk_fractions.append(new_hawk_fraction)
+        if path is None:
+            hawk_fractions.append(new_hawk_fraction)
+        else:
+            hawk_fractions.append({'generation': gen, 'hawk_fraction': new_hawk_fraction})
+
+        # 收敛检测：到达不动点后不再迭代
+        converged = tol is not None and abs(new_hawk_fraction - current_hawk_fraction) < tol
+        current_hawk_fraction = new_hawk_fraction
+        if converged:
+            converged_at = gen
+            break
+
+    if converged_at >= 0:
+        # 收敛之后的剩余代数用不动点填充
+        if path is None:
+            hawk_fractions.extend([current_hawk_fraction] * (num_generations - converged_at))
+        else:
+            for start in range(converged_at + 1, num_generations + 1, hawk_fractions.chunk_size):
+                generations = np.arange(start, min(start + hawk_fractions.chunk_size, num_generations + 1))
+                hawk_fractions.extend({'generation': generations,
+                                       'hawk_fraction': np.full(generations.size, current_hawk_fraction)})
+
+    equilibrium = current_hawk_fraction
+    if path is not None:
+        hawk_fractions.flush()
+    if not plot:
+        return hawk_fractions, equilibrium, converged_at
 
     # 绘制结果
-    plt.plot(hawk_fractions, label=f'Hawk Fraction (V={V}, C={C})')
+    plt.plot(hawk_fractions if path is None else hawk_fractions['hawk_fraction'],
+             label=f'Hawk Fraction (V={V}, C={C})')
     plt.xlabel('Generation')
     plt.ylabel('Fraction of Hawks')
     plt.title('Evolution of Hawk and Dove Strategies')
     plt.legend()
     plt.show()
 
+    return hawk_fractions, equilibrium, converged_at
+
 def main():
     # 获取用户输入
     V = float(input("请输入资源的价值 V: "))
@@ -56,7 +105,20 @@ def main():
     num_generations = int(input("请输入模拟的代数: "))
 
     # 运行博弈模拟
-    hawk_dove_game(V, C, initial_hawk_fraction, num_generations)
+    _, equilibrium, converged_at = hawk_dove_game(V, C, initial_hawk_fraction, num_generations, tol=1e-10)
+
+    if converged_at < 0:
+        print(f"{num_generations} 代内未收敛，最后一代鹰的比例 = {equilibrium:.6f}")
+        return
+    print(f"第 {converged_at} 代收敛，鹰的比例 = {equilibrium:.6f}")
+    # 不动点只有 0、1 和（C > V 时的）V/C；只有实际到达的是 V/C 时才说明是混合均衡，
+    # 例如从 0 或 1 出发的轨迹停留在边界上
+    fixed_points = [0.0, 1.0] + ([V / C] if C > V else [])
+    reached = min(fixed_points, key=lambda point: abs(point - equilibrium))
+    if C > V and reached == fixed_points[-1]:
+        print(f"到达解析混合均衡 V/C = {V / C:.6f}")
+    else:
+        print("到达纯策略不动点（全鹰）" if reached == 1.0 else "到达纯策略不动点（全鸽）")
 
 if __name__ == "__main__":
     main()
@@ -1,12 +1,32 @@
 import tkinter as tk
 from tkinter import ttk
+import itertools
+import queue
+import threading
 import numpy as np
-import matplotlib.pyplot as plt
+from Random_Buffer import global_buffer as random_buffer, reseed
+from Resource_Depletion import remaining_stocks
+from Result_Cache import ResultCache, cache_key, code_version
+from Vectorized_Hawk_Dove_Game import GenerationRecord
 from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
 
 # Set a fixed random seed to ensure consistent results
 np.random.seed(42)
 
+# Cached runs are keyed on the parameters, the seed and the source of everything the simulation executes
+CACHE_MODEL = 'gui_resource'
+CACHE_SOURCES = ['HawkDove_GUI.py', 'Random_Buffer.py', 'Resource_Depletion.py']
+SERIES_NAMES = ('hawk_fraction', 'dove_fraction', 'mixed_fraction', 'resources')
+
+
+def result_key(params):
+    # Runs without a seed continue the global random stream and cannot be repeated, so they are never cached
+    if params.get('seed') is None:
+        return None
+    model_params = {name: value for name, value in params.items() if name != 'seed'}
+    return cache_key(CACHE_MODEL, model_params, params['seed'], code_version(CACHE_SOURCES))
+
 class Individual:
     def __init__(self, strategy):
         self.strategy = strategy  # 'Hawk', 'Dove' or 'Mixed'
@@ -16,11 +36,11 @@ class Individual:
             return 0, 0  # No resources, no gain
 
         if self.strategy == 'Mixed':
-            self_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return Individual(self_choice).play(opponent, V, C, available_resource)
+            self_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return PURE_STRATEGIES[self_choice].play(opponent, V, C, available_resource)
         elif opponent.strategy == 'Mixed':
-            opponent_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return self.play(Individual(opponent_choice), V, C, available_resource)
+            opponent_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return self.play(PURE_STRATEGIES[opponent_choice], V, C, available_resource)
 
         if self.strategy == 'Hawk' and opponent.strategy == 'Hawk':
             return (V - C) / 2, (V - C) / 2
@@ -33,56 +53,280 @@ class Individual:
         else:
             return 0, 0
 
+# Pure-strategy stand-ins for a resolved Mixed player, so play() allocates nothing
+PURE_STRATEGIES = {'Hawk': Individual('Hawk'), 'Dove': Individual('Dove')}
+
 class Population:
     def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction):
         strategies = (['Hawk'] * int(size * initial_hawk_fraction) +
                       ['Dove'] * int(size * initial_dove_fraction) +
                       ['Mixed'] * int(size * initial_mixed_fraction))
         self.individuals = [Individual(strategy) for strategy in strategies]
-
-    def evolve(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent, renewable_recovery_amount):
-        hawk_fractions = []
-        dove_fractions = []
-        mixed_fractions = []
+        # Per-strategy counts, updated incrementally by set_strategy
+        self.strategy_counts = {strategy: strategies.count(strategy) for strategy in ('Hawk', 'Dove', 'Mixed')}
+
+    def set_strategy(self, i, strategy):
+        # Keep the counts in sync so reading fractions is O(1)
+        self.strategy_counts[self.individuals[i].strategy] -= 1
+        self.strategy_counts[strategy] += 1
+        self.individuals[i].strategy = strategy
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent, renewable_recovery_amount, profiler=None):
+        """
+        Generator version of evolve: yields one GenerationRecord per generation (the state the
+        generation started from and its mean payoff) and keeps no history, so memory stays constant.
+        num_generations=None runs until the caller stops iterating.
+        Pass a Profiler.PhaseProfiler as profiler to record per-phase timings for every generation.
+        """
+        timed = profiler is not None
         renewable_resources = initial_resource * renewable_resource_percent
         non_renewable_resources = initial_resource * non_renewable_resource_percent
-        resources = []  # Track remaining resources each generation
+        generations = itertools.count() if num_generations is None else range(num_generations)
 
-        for gen in range(num_generations):
-            hawk_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Hawk') / len(self.individuals))
-            dove_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Dove') / len(self.individuals))
-            mixed_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Mixed') / len(self.individuals))
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = (self.strategy_counts['Hawk'], self.strategy_counts['Dove'], self.strategy_counts['Mixed'])
+            start_renewable, start_non_renewable = renewable_resources, non_renewable_resources
 
             total_resources = renewable_resources + non_renewable_resources
             if total_resources <= 0:
                 total_resources = 0
 
+            total_payoffs = []  # Total payoff of each interaction, in order
+            payoff_sum = 0
+
             # Interaction within the population
             for i in range(len(self.individuals)):
-                opponent = np.random.choice(self.individuals)
+                opponent = self.individuals[random_buffer.integers(len(self.individuals))]
+                if timed:
+                    profiler.lap('opponent_sampling')
                 payoff_self, payoff_opponent = self.individuals[i].play(opponent, V, C, total_resources)
+                if timed:
+                    profiler.lap('play_mixed' if 'Mixed' in (self.individuals[i].strategy, opponent.strategy) else 'play')
 
-                # Update resources
-                total_payoff = payoff_self + payoff_opponent
-                if total_payoff > 0:
-                    if non_renewable_resources >= total_payoff:
-                        non_renewable_resources -= total_payoff
-                    else:
-                        total_payoff -= non_renewable_resources
-                        non_renewable_resources = 0
-                        renewable_resources -= total_payoff
+                total_payoffs.append(payoff_self + payoff_opponent)
+                payoff_sum += payoff_self
+                if timed:
+                    profiler.lap('resource_bookkeeping')
 
                 # Mutation mechanism - introduce some randomness to prevent stagnation
-                if np.random.rand() < mutation_rate:
-                    self.individuals[i].strategy = np.random.choice(['Hawk', 'Dove', 'Mixed'])
+                if random_buffer.uniform() < mutation_rate:
+                    self.set_strategy(i, random_buffer.choice(['Hawk', 'Dove', 'Mixed']))
+                if timed:
+                    profiler.lap('mutation')
 
-            resources.append(total_resources)
+            # Update resources: payoffs are drawn from the non-renewable stock first, then the renewable one
+            non_renewable_resources, renewable_resources = remaining_stocks(
+                total_payoffs, non_renewable_resources, renewable_resources)
 
             # Update renewable resources
             renewable_resources = min(renewable_resources + renewable_recovery_amount, initial_resource * renewable_resource_percent)
+            if timed:
+                profiler.lap('resource_bookkeeping')
+                profiler.end_generation()
+
+            yield GenerationRecord(gen, *counts, start_renewable, start_non_renewable,
+                                   payoff_sum / len(self.individuals))
+
+    def evolve(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent, renewable_recovery_amount, profiler=None):
+        hawk_fractions = []
+        dove_fractions = []
+        mixed_fractions = []
+        resources = []  # Track remaining resources each generation
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent, renewable_recovery_amount, profiler):
+            hawk_fractions.append(record.hawk / len(self.individuals))
+            dove_fractions.append(record.dove / len(self.individuals))
+            mixed_fractions.append(record.mixed / len(self.individuals))
+            resources.append(max(record.renewable + record.non_renewable, 0))
 
         return hawk_fractions, dove_fractions, mixed_fractions, resources
 
+class SimulationWorker(threading.Thread):
+    """
+    Background thread that runs queued simulations one at a time, so the Tk
+    main loop never blocks. Messages go back through `results` as
+    (kind, job_id, payload) tuples; the GUI drains them with after() polling
+    because Tk may only be touched from its own thread.
+    """
+
+    def __init__(self, cache=None):
+        super().__init__(daemon=True)
+        self.jobs = queue.Queue()
+        self.results = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.cache = cache
+
+    def submit(self, job_id, params):
+        self.jobs.put((job_id, params))
+
+    def cancel(self):
+        # Stop the running job at the end of its current generation
+        self.cancel_event.set()
+
+    def clear_pending(self):
+        # Drop jobs that have not started yet and return their ids
+        dropped = []
+        while True:
+            try:
+                dropped.append(self.jobs.get_nowait()[0])
+            except queue.Empty:
+                return dropped
+
+    def run(self):
+        while True:
+            job_id, params = self.jobs.get()
+            self.cancel_event.clear()
+            try:
+                self.results.put(self.run_job(job_id, params))
+            except Exception as error:
+                self.results.put(('error', job_id, str(error)))
+
+    def run_job(self, job_id, params):
+        # A queued job may repeat one that finished after it was submitted
+        key = result_key(params) if self.cache is not None else None
+        if key is not None:
+            series = self.cache.get(key)
+            if series is not None:
+                return ('done', job_id, tuple(series[name] for name in SERIES_NAMES))
+
+        if params.get('seed') is not None:
+            reseed(params['seed'])
+        population = Population(params['pop_size'], params['hawk_frac'], params['dove_frac'], params['mixed_frac'])
+        size = len(population.individuals)
+        num_gen = params['num_gen']
+        hawk_fractions, dove_fractions, mixed_fractions, resources = [], [], [], []
+        self.results.put(('started', job_id, (num_gen, params['initial_resource'])))
+
+        for record in population.iter_evolve(params['V'], params['C'], params['mutation_rate'], num_gen,
+                                              params['initial_resource'], params['renewable_res_percent'],
+                                              1 - params['renewable_res_percent'],
+                                              params['renewable_recovery_amount']):
+            if self.cancel_event.is_set():
+                return ('cancelled', job_id, None)
+            hawk_fractions.append(record.hawk / size)
+            dove_fractions.append(record.dove / size)
+            mixed_fractions.append(record.mixed / size)
+            resources.append(max(record.renewable + record.non_renewable, 0))
+            self.results.put(('progress', job_id, (record.generation, num_gen,
+                                                   (hawk_fractions[-1], dove_fractions[-1], mixed_fractions[-1], resources[-1]))))
+
+        if key is not None:
+            self.cache.put(key, dict(zip(SERIES_NAMES, (hawk_fractions, dove_fractions, mixed_fractions, resources))),
+                           {'model': CACHE_MODEL, 'params': params})
+        return ('done', job_id, (hawk_fractions, dove_fractions, mixed_fractions, resources))
+
+def min_max_envelope(values, width):
+    """
+    Reduce a series to the min and max of each of `width` pixel columns, so
+    drawing cost depends on the plot width rather than the number of generations.
+    Returns (x, y); short series are returned unchanged.
+    """
+    values = np.asarray(values, dtype=float)
+    n = values.size
+    if n <= 2 * width:
+        return np.arange(n), values
+    starts = np.linspace(0, n, width + 1).astype(int)[:-1]
+    y = np.empty(2 * width)
+    y[0::2] = np.minimum.reduceat(values, starts)
+    y[1::2] = np.maximum.reduceat(values, starts)
+    return np.repeat(starts, 2), y
+
+class LivePlot:
+    """
+    One persistent figure and canvas reused by every run. Line data is replaced
+    in place; during a live run only the lines are blitted over a cached
+    background, and every series is drawn as a per-pixel min/max envelope.
+    """
+
+    SERIES = ('hawk', 'dove', 'mixed', 'resources')
+
+    def __init__(self, master):
+        self.figure = Figure(figsize=(10, 8))
+        strategy_axes, resource_axes = self.axes = self.figure.subplots(2, 1)
+
+        self.lines = {
+            'hawk': strategy_axes.plot([], [], label='Hawk Fraction')[0],
+            'dove': strategy_axes.plot([], [], label='Dove Fraction')[0],
+            'mixed': strategy_axes.plot([], [], label='Mixed Fraction')[0],
+            'resources': resource_axes.plot([], [], label='Available Resources')[0],
+        }
+        strategy_axes.set_xlabel('Generation')
+        strategy_axes.set_ylabel('Strategy Fractions')
+        strategy_axes.legend()
+        resource_axes.set_xlabel('Generation')
+        resource_axes.set_ylabel('Resources')
+        resource_axes.legend()
+        self.figure.tight_layout()
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=master)
+        self.canvas.get_tk_widget().grid(row=14, column=0, columnspan=2, padx=10, pady=10)
+        self.background = None
+        self.canvas.mpl_connect('draw_event', self.on_draw)
+
+        self.data = np.empty((len(self.SERIES), 0))
+        self.count = 0
+
+    def on_draw(self, event):
+        # A full redraw (first show, resize, finish) invalidates the cached background
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self.draw_lines()
+
+    def draw_lines(self):
+        for line in self.lines.values():
+            if line.get_animated():
+                line.axes.draw_artist(line)
+
+    def set_line_data(self):
+        width = max(int(self.axes[0].bbox.width), 1)
+        for row, name in enumerate(self.SERIES):
+            self.lines[name].set_data(*min_max_envelope(self.data[row, :self.count], width))
+
+    def start(self, num_generations, initial_resource):
+        """
+        Prepare for a live run: fixed axis limits so the background stays valid,
+        animated lines, and one full draw to capture the background.
+        """
+        self.data = np.empty((len(self.SERIES), num_generations))
+        self.count = 0
+        for axes in self.axes:
+            axes.set_xlim(0, max(num_generations - 1, 1))
+        self.axes[0].set_ylim(0, 1)
+        self.axes[1].set_ylim(0, initial_resource * 1.05 if initial_resource > 0 else 1)
+        for line in self.lines.values():
+            line.set_data([], [])
+            line.set_animated(True)
+        self.canvas.draw()
+
+    def update(self, generation, values):
+        # Record one generation; the caller redraws once per batch with blit()
+        self.data[:, generation] = values
+        self.count = max(self.count, generation + 1)
+
+    def blit(self):
+        if self.background is None:
+            return
+        self.set_line_data()
+        self.canvas.restore_region(self.background)
+        self.draw_lines()
+        self.canvas.blit(self.figure.bbox)
+
+    def show(self, hawk_fractions, dove_fractions, mixed_fractions, resources):
+        """
+        Show a finished run: full series, autoscaled axes, one regular redraw.
+        """
+        self.data = np.array([hawk_fractions, dove_fractions, mixed_fractions, resources], dtype=float)
+        self.count = self.data.shape[1]
+        for line in self.lines.values():
+            line.set_animated(False)
+        self.set_line_data()
+        for axes in self.axes:
+            axes.set_autoscale_on(True)  # start() fixed the limits for blitting
+            axes.relim()
+            axes.autoscale_view()
+        self.canvas.draw_idle()
+
 class HawkDoveApp(tk.Tk):
     def __init__(self):
         super().__init__()
@@ -93,6 +337,16 @@ class HawkDoveApp(tk.Tk):
         # Inputs
         self.create_widgets()
 
+        # Simulations run on a background worker; results are polled from the Tk thread.
+        # Finished runs are cached on disk, so repeating a seeded run does not recompute it.
+        # The Tk thread and the worker share one ResultCache; its counters are guarded by a lock
+        self.cache = ResultCache()
+        self.worker = SimulationWorker(self.cache)
+        self.worker.start()
+        self.next_job_id = 1
+        self.active_jobs = []  # Submitted jobs that have not finished, in run order
+        self.after(100, self.poll_worker)
+
     def create_widgets(self):
         # Input fields
         ttk.Label(self, text="Resource Value (V):").grid(row=0, column=0, padx=10, pady=5, sticky="W")
@@ -139,54 +393,128 @@ class HawkDoveApp(tk.Tk):
         self.renewable_recovery_input = ttk.Entry(self)
         self.renewable_recovery_input.grid(row=10, column=1, padx=10, pady=5)
 
-        # Run button
-        self.run_button = ttk.Button(self, text="Run Simulation", command=self.run_simulation)
-        self.run_button.grid(row=11, column=0, columnspan=2, pady=20)
+        # Each run is reseeded, so the same inputs give the same result; leave blank for a fresh random run
+        ttk.Label(self, text="Random Seed:").grid(row=11, column=0, padx=10, pady=5, sticky="W")
+        self.seed_input = ttk.Entry(self)
+        self.seed_input.insert(0, "42")
+        self.seed_input.grid(row=11, column=1, padx=10, pady=5)
+
+        # Run / cancel buttons; Run queues the current parameters behind any running job
+        buttons = ttk.Frame(self)
+        buttons.grid(row=12, column=0, columnspan=2, pady=20)
+        self.run_button = ttk.Button(buttons, text="Run Simulation", command=self.run_simulation)
+        self.run_button.grid(row=0, column=0, padx=5)
+        self.cancel_button = ttk.Button(buttons, text="Cancel", command=self.cancel_simulation)
+        self.cancel_button.grid(row=0, column=1, padx=5)
+        self.cancel_all_button = ttk.Button(buttons, text="Cancel All", command=self.cancel_all_simulations)
+        self.cancel_all_button.grid(row=0, column=2, padx=5)
+
+        # Progress of the running job and queue status
+        self.progress = ttk.Progressbar(self, orient="horizontal", length=300, mode="determinate")
+        self.progress.grid(row=13, column=0, padx=10, pady=5, sticky="W")
+        self.status_label = ttk.Label(self, text="Idle")
+        self.status_label.grid(row=13, column=1, padx=10, pady=5, sticky="W")
+
+        # Persistent plot, updated in place by every run
+        self.live_plot = LivePlot(self)
+
+    def read_parameters(self):
+        # Collect inputs
+        return {
+            'V': float(self.v_input.get()),
+            'C': float(self.c_input.get()),
+            'pop_size': int(self.pop_size_input.get()),
+            'hawk_frac': float(self.hawk_frac_input.get()),
+            'dove_frac': float(self.dove_frac_input.get()),
+            'mixed_frac': float(self.mixed_frac_input.get()),
+            'num_gen': int(self.num_gen_input.get()),
+            'mutation_rate': float(self.mutation_rate_input.get()),
+            'initial_resource': float(self.initial_resource_input.get()),
+            'renewable_res_percent': float(self.renewable_res_percent_input.get()),
+            'renewable_recovery_amount': float(self.renewable_recovery_input.get()),
+            'seed': int(self.seed_input.get()) if self.seed_input.get().strip() else None,
+        }
 
     def run_simulation(self):
-        # Collect inputs
-        V = float(self.v_input.get())
-        C = float(self.c_input.get())
-        pop_size = int(self.pop_size_input.get())
-        hawk_frac = float(self.hawk_frac_input.get())
-        dove_frac = float(self.dove_frac_input.get())
-        mixed_frac = float(self.mixed_frac_input.get())
-        num_gen = int(self.num_gen_input.get())
-        mutation_rate = float(self.mutation_rate_input.get())
-        initial_resource = float(self.initial_resource_input.get())
-        renewable_res_percent = float(self.renewable_res_percent_input.get())
-        renewable_recovery_amount = float(self.renewable_recovery_input.get())
-
-        # Initialize population and run simulation
-        population = Population(pop_size, hawk_frac, dove_frac, mixed_frac)
-        hawk_fractions, dove_fractions, mixed_fractions, resources = population.evolve(
-            V, C, mutation_rate, num_gen, initial_resource, renewable_res_percent, 
-            1-renewable_res_percent, renewable_recovery_amount)
-
-        # Plot results
-        self.plot_results(hawk_fractions, dove_fractions, mixed_fractions, resources)
+        try:
+            params = self.read_parameters()
+        except ValueError as error:
+            self.status_label.config(text=f"Invalid input: {error}")
+            return
+
+        # When nothing is running a cached result is shown immediately, without going through the worker
+        key = result_key(params)
+        if key is not None and not self.active_jobs:
+            series = self.cache.get(key)
+            if series is not None:
+                self.plot_results(*(series[name] for name in SERIES_NAMES))
+                self.update_status("Loaded from cache")
+                return
+
+        job_id = self.next_job_id
+        self.next_job_id += 1
+        self.active_jobs.append(job_id)
+        self.worker.submit(job_id, params)
+        self.update_status()
+
+    def cancel_simulation(self):
+        if self.active_jobs:
+            self.worker.cancel()
+
+    def cancel_all_simulations(self):
+        for job_id in self.worker.clear_pending():
+            self.active_jobs.remove(job_id)
+        self.cancel_simulation()
+        self.update_status()
+
+    def update_status(self, message=None):
+        if message is None:
+            if self.active_jobs:
+                message = f"Running job {self.active_jobs[0]}, {len(self.active_jobs) - 1} queued"
+            else:
+                message = "Idle"
+        self.status_label.config(text=message)
+
+    def poll_worker(self):
+        # Drain everything the worker posted since the last poll; only Tk-thread code touches widgets
+        new_data = False
+        while True:
+            try:
+                kind, job_id, payload = self.worker.results.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == 'started':
+                self.live_plot.start(*payload)
+                continue
+            if kind == 'progress':
+                generation, total, values = payload
+                self.live_plot.update(generation, values)
+                self.progress.config(maximum=total, value=generation + 1)
+                new_data = True
+                continue
+
+            new_data = False
+
+            if job_id in self.active_jobs:
+                self.active_jobs.remove(job_id)
+            self.progress.config(value=0)
+            if kind == 'done':
+                self.plot_results(*payload)
+                self.update_status()
+            elif kind == 'cancelled':
+                self.live_plot.show(*self.live_plot.data[:, :self.live_plot.count])
+                self.update_status(f"Job {job_id} cancelled" if not self.active_jobs else None)
+            else:
+                self.live_plot.show(*self.live_plot.data[:, :self.live_plot.count])
+                self.update_status(f"Job {job_id} failed: {payload}")
+
+        if new_data:
+            self.live_plot.blit()
+        self.after(100, self.poll_worker)
 
     def plot_results(self, hawk_fractions, dove_fractions, mixed_fractions, resources):
-        fig, axs = plt.subplots(2, 1, figsize=(10, 8))
-
-        axs[0].plot(hawk_fractions, label='Hawk Fraction')
-        axs[0].plot(dove_fractions, label='Dove Fraction')
-        axs[0].plot(mixed_fractions, label='Mixed Fraction')
-        axs[0].set_xlabel('Generation')
-        axs[0].set_ylabel('Strategy Fractions')
-        axs[0].legend()
-
-        axs[1].plot(resources, label='Available Resources')
-        axs[1].set_xlabel('Generation')
-        axs[1].set_ylabel('Resources')
-        axs[1].legend()
-
-        plt.tight_layout()
-
-        # Show plot in Tkinter window
-        canvas = FigureCanvasTkAgg(fig, master=self)
-        canvas.draw()
-        canvas.get_tk_widget().grid(row=12, column=0, columnspan=2, padx=10, pady=10)
+        self.live_plot.show(hawk_fractions, dove_fractions, mixed_fractions, resources)
 
 if __name__ == "__main__":
     app = HawkDoveApp()
@@ -0,0 +1,295 @@
+from collections import namedtuple
+from statistics import NormalDist
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from Vectorized_Hawk_Dove_Game import HAWK, DOVE, payoff_table
+
+# simulate 的结果，每个数组的长度为重复次数：
+# final_hawks - 结束时鹰的数量（0 或 N 表示已吸收，未吸收时为当时的数量）
+# absorbed - 是否在 max_jumps 次跳跃内被吸收
+# jumps - 改变状态的事件数
+# steps - Moran 过程的总步数（包括不改变状态的步），除以 N 即为代数
+MoranResult = namedtuple('MoranResult', ['final_hawks', 'absorbed', 'jumps', 'steps'])
+
+
+class MoranProcess:
+    """
+    规模为 N 的有限群体中鹰与鸽的 Moran 过程（出生-死亡），只记录鹰的数量 i。
+
+    每一步按适应度比例选出一个个体繁殖，后代替换随机选出的一个个体（可能是自己的同类，
+    此时状态不变）。个体与群体中其余 N - 1 个个体各交互一次，收益取平均：
+    f_H(i) = ((i - 1) * (V - C) / 2 + (N - i) * V) / (N - 1)
+    f_D(i) = (N - i - 1) * (V / 2) / (N - 1)
+
+    状态只在 i -> i + 1（概率 T+）或 i -> i - 1（概率 T-）时改变。
+    模拟直接在状态改变的事件之间跳跃：下一次改变的方向按 T+ / (T+ + T-) 决定，
+    其间经过的步数服从成功概率为 T+ + T- 的几何分布（Gillespie 式的等待时间），
+    因此不改变状态的步不需要逐一模拟。所有重复同时推进，已吸收的重复定期从活动数组中移出。
+    只需要固定概率和平均吸收时间时，simulate_aggregate 只记录各状态上的重复个数，开销与重复次数无关。
+
+    参数:
+    population_size - 群体规模 N
+    V - 资源的价值
+    C - 打斗的代价
+    selection_intensity - 选择强度 w
+    fitness - 'exponential' 时适应度为 exp(w * 收益)；'linear' 时为 1 - w + w * 收益（需为正）
+    rng - np.random.Generator
+    """
+
+    def __init__(self, population_size, V, C, selection_intensity=0.1, fitness='exponential', rng=None):
+        if population_size < 2:
+            raise ValueError("群体规模至少为 2")
+        self.population_size = population_size
+        self.V = V
+        self.C = C
+        self.selection_intensity = selection_intensity
+        self.fitness = fitness
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.up, self.down = self.transition_probabilities()
+
+    def payoffs(self, hawks):
+        """
+        鹰的数量为 hawks（数组）时鹰和鸽的平均收益 (f_H, f_D)。
+        """
+        N = self.population_size
+        table = payoff_table(self.V, self.C)
+        hawks = np.asarray(hawks, dtype=float)
+        hawk_payoff = ((hawks - 1) * table[HAWK, HAWK] + (N - hawks) * table[HAWK, DOVE]) / (N - 1)
+        dove_payoff = (hawks * table[DOVE, HAWK] + (N - hawks - 1) * table[DOVE, DOVE]) / (N - 1)
+        return hawk_payoff, dove_payoff
+
+    def fitnesses(self, hawks):
+        w = self.selection_intensity
+        payoffs = self.payoffs(hawks)
+        if self.fitness == 'exponential':
+            return tuple(np.exp(w * payoff) for payoff in payoffs)
+        if self.fitness == 'linear':
+            hawk_fitness, dove_fitness = (1 - w + w * payoff for payoff in payoffs)
+            if min(hawk_fitness.min(), dove_fitness.min()) <= 0:
+                raise ValueError("线性适应度出现非正值，请减小选择强度或改用 'exponential'")
+            return hawk_fitness, dove_fitness
+        raise ValueError(f"未知的适应度函数: {self.fitness}")
+
+    def transition_probabilities(self):
+        """
+        返回长度为 N + 1 的数组 (T+, T-)：鹰的数量为 i 时下一步变为 i + 1 和 i - 1 的概率。
+        吸收态 0 和 N 上两者都为 0。
+        """
+        N = self.population_size
+        hawks = np.arange(N + 1)
+        hawk_fitness, dove_fitness = self.fitnesses(hawks)
+        total = hawks * hawk_fitness + (N - hawks) * dove_fitness
+        up = hawks * hawk_fitness / total * (N - hawks) / N
+        down = (N - hawks) * dove_fitness / total * hawks / N
+        return up, down
+
+    def simulate(self, num_replicates, initial_hawks=1, max_jumps=None):
+        """
+        同时模拟 num_replicates 个相互独立的 Moran 过程直到吸收。
+
+        参数:
+        num_replicates - 重复次数
+        initial_hawks - 初始鹰的数量（整数，或每个重复一个的数组）
+        max_jumps - 每个重复最多的状态改变次数，默认不限制。V < C 时内部存在稳定的
+                    混合平衡，大群体的吸收时间随 N 指数增长，此时应设置上限
+
+        返回:
+        MoranResult
+        """
+        N = self.population_size
+        rate = self.up + self.down
+        transient = rate > 0
+        # 一个均匀随机数 u 决定跳跃方向：u < up_threshold 向上，u >= down_threshold 向下。
+        # 非吸收态两个阈值相同（恰好一个方向）；吸收态上阈值为 0、下阈值为 1，状态保持不动，
+        # 这样已吸收的重复不必每一轮都从数组中移除
+        up_threshold = np.divide(self.up, rate, out=np.zeros_like(rate), where=transient)
+        down_threshold = np.where(transient, up_threshold, 1.0)
+        # 几何分布的逆 CDF：步数 = floor(log(v) / log(1 - T+ - T-)) + 1，v 在 (0, 1] 上均匀
+        inverse_log = np.divide(1, np.log1p(-rate), out=np.zeros_like(rate), where=transient)
+
+        final_hawks = np.empty(num_replicates, dtype=np.int64)
+        final_hawks[:] = initial_hawks
+        jumps = np.zeros(num_replicates, dtype=np.int64)
+        steps = np.zeros(num_replicates, dtype=np.int64)
+
+        # 活动重复的编号、当前状态和累计量；被吸收的重复在超过一半时才统一移出
+        active = np.flatnonzero(transient[final_hawks])
+        hawks = final_hawks[active]
+        active_jumps = np.zeros(active.size, dtype=np.int64)
+        active_steps = np.zeros(active.size, dtype=np.int64)
+        num_jumps = 0
+        while active.size and (max_jumps is None or num_jumps < max_jumps):
+            # 查表用 take，比花式索引快
+            moving = transient.take(hawks)
+            waits = np.floor(np.log1p(-self.rng.random(active.size)) * inverse_log.take(hawks)) + 1
+            active_steps += (waits * moving).astype(np.int64)
+            active_jumps += moving
+            u = self.rng.random(active.size)
+            hawks += (u < up_threshold.take(hawks)).view(np.int8) - (u >= down_threshold.take(hawks)).view(np.int8)
+            num_jumps += 1
+
+            if num_jumps % 16 == 0:
+                # 每 16 轮检查一次，被吸收的超过一半时写回结果并压缩活动数组
+                moving = transient.take(hawks)
+                if 2 * np.count_nonzero(moving) <= active.size:
+                    done = ~moving
+                    final_hawks[active[done]] = hawks[done]
+                    jumps[active[done]] = active_jumps[done]
+                    steps[active[done]] = active_steps[done]
+                    active, hawks = active[moving], hawks[moving]
+                    active_jumps, active_steps = active_jumps[moving], active_steps[moving]
+
+        # 剩余的重复（包括达到 max_jumps 仍未吸收的）
+        final_hawks[active] = hawks
+        jumps[active] = active_jumps
+        steps[active] = active_steps
+        absorbed = ~transient[final_hawks]
+        return MoranResult(final_hawks, absorbed, jumps, steps)
+
+    def simulate_aggregate(self, num_replicates, initial_hawks=1, max_jumps=None):
+        """
+        与 simulate 相同的过程，但只记录处于每个状态的重复个数，而不是逐个重复的状态。
+
+        各重复相互独立且可交换，所以每一轮中处于状态 i 的 n_i 个重复里向上跳跃的个数服从
+        Binomial(n_i, T+ / (T+ + T-))，它们的等待步数之和服从负二项分布。每一轮的开销为 O(N)，
+        与重复次数无关，数十亿次重复也只需几毫秒到几秒。
+        固定与灭绝的个数与逐个模拟同分布；吸收时间只保留各状态上的累计步数
+        （跳跃的重复按比例分走），因此只能给出条件平均值，不能给出每个重复的时间。
+
+        返回字典:
+        fixed, lost, unabsorbed - 鹰固定、灭绝和达到 max_jumps 仍未吸收的重复数
+        fixation_steps, extinction_steps - 固定 / 灭绝的重复的总步数
+        """
+        N = self.population_size
+        rate = self.up + self.down
+        interior = slice(1, N)
+        p_up = self.up[interior] / rate[interior]
+
+        if np.ndim(initial_hawks):
+            counts = np.bincount(initial_hawks, minlength=N + 1).astype(np.int64)
+        else:
+            counts = np.zeros(N + 1, dtype=np.int64)
+            counts[initial_hawks] = num_replicates
+        total_steps = np.zeros(N + 1)
+        num_jumps = 0
+        while counts[interior].any() and (max_jumps is None or num_jumps < max_jumps):
+            n = counts[interior]
+            occupied = n > 0
+            # n 个几何分布之和 = 负二项分布（失败次数）+ n
+            waits = self.rng.negative_binomial(np.maximum(n, 1), rate[interior]) * occupied + n
+            steps = total_steps[interior] + waits
+            ups = self.rng.binomial(n, p_up)
+            downs = n - ups
+            share = np.divide(ups, n, out=np.zeros(n.size), where=occupied)
+
+            new_counts = np.zeros_like(counts)
+            new_steps = np.zeros_like(total_steps)
+            new_counts[[0, N]] = counts[[0, N]]
+            new_steps[[0, N]] = total_steps[[0, N]]
+            new_counts[2:] += ups
+            new_counts[:-2] += downs
+            new_steps[2:] += steps * share
+            new_steps[:-2] += steps * (1 - share)
+            counts, total_steps = new_counts, new_steps
+            num_jumps += 1
+
+        return {
+            'fixed': int(counts[N]),
+            'lost': int(counts[0]),
+            'unabsorbed': int(counts[interior].sum()),
+            'fixation_steps': float(total_steps[N]),
+            'extinction_steps': float(total_steps[0]),
+        }
+
+    def estimate_fixation(self, num_replicates, initial_hawks=1, level=0.95, max_jumps=None, method='aggregate'):
+        """
+        用 num_replicates 次模拟估计鹰的固定概率和条件吸收时间（以代为单位，即步数 / N）。
+
+        参数:
+        method - 'aggregate' 使用 simulate_aggregate（快，与重复次数无关）；
+                 'replicates' 使用逐个重复的 simulate
+
+        返回字典:
+        fixation_probability, lower, upper - 固定概率及 Wilson 置信区间（只统计已吸收的重复）
+        mean_fixation_time - 以鹰固定为条件的平均吸收代数
+        mean_extinction_time - 以鹰灭绝为条件的平均吸收代数
+        unabsorbed - 达到 max_jumps 仍未吸收的重复数
+        """
+        N = self.population_size
+        if method == 'aggregate':
+            totals = self.simulate_aggregate(num_replicates, initial_hawks, max_jumps)
+            fixed, lost = totals['fixed'], totals['lost']
+            fixation_steps, extinction_steps = totals['fixation_steps'], totals['extinction_steps']
+        elif method == 'replicates':
+            result = self.simulate(num_replicates, initial_hawks, max_jumps)
+            fixed_mask = result.absorbed & (result.final_hawks == N)
+            lost_mask = result.absorbed & (result.final_hawks == 0)
+            fixed, lost = int(fixed_mask.sum()), int(lost_mask.sum())
+            fixation_steps, extinction_steps = result.steps[fixed_mask].sum(), result.steps[lost_mask].sum()
+        else:
+            raise ValueError(f"未知的模拟方法: {method}")
+
+        n = fixed + lost
+        p = fixed / n if n else np.nan
+        # Wilson 区间在固定概率很小时比正态近似可靠
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        if n:
+            center = (p + z ** 2 / (2 * n)) / (1 + z ** 2 / n)
+            half_width = z * np.sqrt(p * (1 - p) / n + z ** 2 / (4 * n ** 2)) / (1 + z ** 2 / n)
+        else:
+            center = half_width = np.nan
+
+        return {
+            'fixation_probability': p,
+            'lower': center - half_width,
+            'upper': center + half_width,
+            'mean_fixation_time': fixation_steps / fixed / N if fixed else np.nan,
+            'mean_extinction_time': extinction_steps / lost / N if lost else np.nan,
+            'unabsorbed': num_replicates - n,
+        }
+
+    def trajectory(self, initial_hawks=1, max_jumps=100000):
+        """
+        单条轨迹的事件序列，返回 (generations, hawks)：每次状态改变发生的时刻（代）和改变后鹰的数量，
+        第一项为初始状态。
+        """
+        N = self.population_size
+        rate = self.up + self.down
+        times, counts = [0], [initial_hawks]
+        hawks = initial_hawks
+        while 0 < hawks < N and len(counts) <= max_jumps:
+            times.append(times[-1] + self.rng.geometric(rate[hawks]))
+            hawks += 1 if self.rng.random() * rate[hawks] < self.up[hawks] else -1
+            counts.append(hawks)
+        return np.array(times) / N, np.array(counts)
+
+
+def main():
+    # 获取用户输入
+    V = float(input("请输入资源的价值 V: "))
+    C = float(input("请输入打斗的代价 C: "))
+    population_size = int(input("请输入群体规模 N: "))
+    selection_intensity = float(input("请输入选择强度 w: "))
+    initial_hawks = int(input("请输入初始鹰的数量: "))
+    num_replicates = int(input("请输入重复次数: "))
+
+    process = MoranProcess(population_size, V, C, selection_intensity)
+    estimate = process.estimate_fixation(num_replicates, initial_hawks, max_jumps=100 * population_size ** 2)
+    print(f"鹰的固定概率: {estimate['fixation_probability']:.6f} "
+          f"[{estimate['lower']:.6f}, {estimate['upper']:.6f}]（中性为 {initial_hawks / population_size:.6f}）")
+    print(f"条件固定时间: {estimate['mean_fixation_time']:.2f} 代，"
+          f"条件灭绝时间: {estimate['mean_extinction_time']:.2f} 代，未吸收: {estimate['unabsorbed']}")
+
+    # 绘制几条轨迹
+    for _ in range(10):
+        generations, hawks = process.trajectory(initial_hawks)
+        plt.step(generations, hawks / population_size, where='post')
+    plt.xlabel('Generation')
+    plt.ylabel('Hawk Fraction')
+    plt.title('Moran Process Trajectories')
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,224 @@
+import itertools
+
+import numpy as np
+import matplotlib.pyplot as plt
+import networkx as nx
+import scipy.sparse as sp
+
+from Vectorized_Hawk_Dove_Game import HAWK, DOVE, MIXED, STRATEGIES, GenerationRecord
+
+
+def adjacency_from_edges(edges, num_nodes=None, directed=False):
+    """
+    由边列表构造 CSR 邻接矩阵（0/1，float32，去掉重边和自环）。
+
+    参数:
+    edges - 形状为 (E, 2) 的节点编号数组，节点编号为 0 到 num_nodes - 1
+    num_nodes - 节点数，默认为最大编号加一
+    directed - False 时每条边双向连接；True 时 (i, j) 表示 i 与 j 交互，但 j 不与 i 交互
+    """
+    edges = np.asarray(edges, dtype=np.int64).reshape(-1, 2)
+    edges = edges[edges[:, 0] != edges[:, 1]]
+    if num_nodes is None:
+        num_nodes = int(edges.max()) + 1 if edges.size else 0
+    rows, columns = edges[:, 0], edges[:, 1]
+    if not directed:
+        rows, columns = np.concatenate([rows, columns]), np.concatenate([columns, rows])
+
+    adjacency = sp.csr_matrix((np.ones(rows.size, dtype=np.float32), (rows, columns)),
+                              shape=(num_nodes, num_nodes))
+    adjacency.sum_duplicates()
+    adjacency.data[:] = 1
+    return adjacency
+
+
+def adjacency_from_networkx(graph):
+    """
+    把 networkx 图转换为 CSR 邻接矩阵，返回 (adjacency, nodes)，
+    nodes[i] 是矩阵第 i 行对应的节点。
+    """
+    nodes = list(graph)
+    adjacency = nx.to_scipy_sparse_array(graph, nodelist=nodes, weight=None, dtype=np.float32, format='csr')
+    adjacency = sp.csr_matrix(adjacency)
+    adjacency.setdiag(0)
+    adjacency.eliminate_zeros()
+    return adjacency, nodes
+
+
+class NetworkPopulation:
+    """
+    在任意交互网络上进行的鹰鸽博弈，网络以 CSR 稀疏邻接矩阵保存。
+
+    每一代：混合策略的节点以 0.5 的概率选择鹰或鸽（一代内对所有邻居使用同一行动），
+    每个节点与所有邻居各交互一次，收益由一次稀疏矩阵-向量乘法（邻居中鹰的数量）得到；
+    随后所有节点同步更新策略，然后按突变率突变。
+
+    更新规则:
+    'best' - 模仿邻居中收益最高者的策略（只有严格高于自己时才模仿，同分时取 CSR 中靠前的邻居）
+    'fermi' - 随机选择一个邻居 j，以 1 / (1 + exp((payoff_i - payoff_j) / noise)) 的概率模仿
+    """
+
+    def __init__(self, adjacency, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction,
+                 update_rule='best', noise=0.1, rng=None):
+        self.adjacency = sp.csr_matrix(adjacency, dtype=np.float32)
+        self.adjacency.sort_indices()
+        self.degrees = np.diff(self.adjacency.indptr)
+        self.update_rule = update_rule
+        self.noise = noise
+        self.rng = rng if rng is not None else np.random.default_rng()
+        fractions = np.array([initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction], dtype=float)
+        self.strategies = self.rng.choice(np.array(STRATEGIES, dtype=np.int8), size=self.adjacency.shape[0],
+                                          p=fractions / fractions.sum())
+
+    def __len__(self):
+        return self.strategies.size
+
+    def strategy_counts(self):
+        return np.bincount(self.strategies, minlength=len(STRATEGIES)).tolist()
+
+    def fractions(self):
+        return np.array(self.strategy_counts()) / self.strategies.size
+
+    def resolve_actions(self):
+        # 混合策略以 0.5 的概率选择鹰或鸽，其余节点的行动即为其策略
+        coins = self.rng.integers(0, 2, size=self.strategies.size, dtype=np.int8)
+        return np.where(self.strategies == MIXED, coins, self.strategies)
+
+    def payoffs(self, actions, V, C):
+        """
+        每个节点与全部邻居交互一次的总收益。
+        鹰遇鹰得 (V - C) / 2，遇鸽得 V；鸽遇鹰得 0，遇鸽得 V / 2。
+        """
+        hawk_neighbors = np.asarray(self.adjacency @ (actions == HAWK).astype(np.float32), dtype=float)
+        dove_neighbors = self.degrees - hawk_neighbors
+        return np.where(actions == HAWK,
+                        hawk_neighbors * ((V - C) / 2) + dove_neighbors * V,
+                        dove_neighbors * (V / 2))
+
+    def imitate_best(self, payoffs):
+        indptr, indices = self.adjacency.indptr, self.adjacency.indices
+        nodes = np.flatnonzero(self.degrees)
+        starts = indptr[nodes]
+
+        # 每个节点邻居收益的最大值（按 CSR 的行分段求最大）
+        neighbor_payoffs = payoffs[indices]
+        best = np.maximum.reduceat(neighbor_payoffs, starts)
+        # 每行中第一个达到最大值的邻居
+        hits = np.flatnonzero(neighbor_payoffs == np.repeat(best, self.degrees[nodes]))
+        winners = indices[hits[np.searchsorted(hits, starts)]]
+
+        better = best > payoffs[nodes]
+        self.strategies[nodes[better]] = self.strategies[winners[better]]
+
+    def imitate_fermi(self, payoffs):
+        indptr, indices = self.adjacency.indptr, self.adjacency.indices
+        nodes = np.flatnonzero(self.degrees)
+
+        # 每个节点在自己的邻居中均匀随机选一个作为比较对象
+        picks = indptr[nodes] + (self.rng.random(nodes.size) * self.degrees[nodes]).astype(np.int64)
+        partners = indices[picks]
+        with np.errstate(over='ignore'):
+            probability = 1 / (1 + np.exp((payoffs[nodes] - payoffs[partners]) / self.noise))
+        adopt = self.rng.random(nodes.size) < probability
+        self.strategies[nodes[adopt]] = self.strategies[partners[adopt]]
+
+    def mutate(self, mutation_rate):
+        # 突变个数服从二项分布，再随机选出节点（极少数节点可能被选中两次，只按最后一次生效）
+        count = self.rng.binomial(self.strategies.size, mutation_rate)
+        nodes = self.rng.integers(0, self.strategies.size, size=count)
+        self.strategies[nodes] = self.rng.integers(0, len(STRATEGIES), size=count, dtype=np.int8)
+
+    def play(self, V, C):
+        """
+        一代的交互和策略更新，返回每次交互的平均收益。
+        """
+        payoffs = self.payoffs(self.resolve_actions(), V, C)
+        if self.update_rule == 'best':
+            self.imitate_best(payoffs)
+        elif self.update_rule == 'fermi':
+            self.imitate_fermi(payoffs)
+        else:
+            raise ValueError(f"未知的更新规则: {self.update_rule}")
+        return float(payoffs.sum() / max(self.adjacency.nnz, 1))
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations=None, profiler=None):
+        """
+        每完成一代产出一条 GenerationRecord（该代开始时的策略计数和该代每次交互的平均收益），
+        不保存历史。num_generations 为 None 时一直运行，由调用者决定何时停止。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        timed = profiler is not None
+        generations = itertools.count() if num_generations is None else range(num_generations)
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = self.strategy_counts()
+            if timed:
+                profiler.lap('fraction_counting')
+            mean_payoff = self.play(V, C)
+            if timed:
+                profiler.lap('play')
+            self.mutate(mutation_rate)
+            if timed:
+                profiler.lap('mutation')
+                profiler.end_generation()
+            yield GenerationRecord(gen, *counts, np.nan, np.nan, mean_payoff)
+
+    def evolve(self, V, C, mutation_rate, num_generations, profiler=None):
+        """
+        运行多代演化，返回每一代结束时各策略的比例（iter_evolve 的记录是每代开始时的计数，
+        这里在产出每条记录时读取 fractions()，因此第 g 行等于第 g + 1 条记录的比例）。
+
+        参数:
+        V - 资源的价值
+        C - 打斗的代价
+        mutation_rate - 突变率
+        num_generations - 演化的代数
+        profiler - 可选的 Profiler.PhaseProfiler，按阶段记录每代的耗时
+        """
+        history = np.empty((num_generations, len(STRATEGIES)))
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, profiler):
+            history[record.generation] = self.fractions()
+
+        return history[:, HAWK], history[:, DOVE], history[:, MIXED]
+
+
+def main():
+    # 获取用户输入
+    V = float(input("请输入资源的价值 V: "))
+    C = float(input("请输入打斗的代价 C: "))
+    num_nodes = int(input("请输入节点数: "))
+    graph_type = input("请输入网络类型 (er 随机网络 / ba 无标度网络): ").strip() or 'er'
+    mean_degree = int(input("请输入平均度: "))
+    initial_hawk_fraction = float(input("请输入初始鹰的比例 (0-1): "))
+    initial_dove_fraction = float(input("请输入初始鸽的比例 (0-1): "))
+    initial_mixed_fraction = float(input("请输入初始混合策略的比例 (0-1): "))
+    num_generations = int(input("请输入模拟的代数: "))
+    mutation_rate = float(input("请输入突变率 (0-1): "))
+    update_rule = input("请输入更新规则 (best / fermi): ").strip() or 'best'
+
+    # 构造网络：随机网络直接生成边列表，无标度网络使用 networkx
+    rng = np.random.default_rng()
+    if graph_type == 'ba':
+        adjacency, _ = adjacency_from_networkx(nx.barabasi_albert_graph(num_nodes, max(mean_degree // 2, 1)))
+    else:
+        edges = rng.integers(0, num_nodes, size=(num_nodes * mean_degree // 2, 2))
+        adjacency = adjacency_from_edges(edges, num_nodes)
+
+    # 初始化群体并运行模拟
+    population = NetworkPopulation(adjacency, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction,
+                                   update_rule, rng=rng)
+    hawk_fractions, dove_fractions, mixed_fractions = population.evolve(V, C, mutation_rate, num_generations)
+
+    # 绘制结果
+    plt.plot(hawk_fractions, label='Hawk Fraction')
+    plt.plot(dove_fractions, label='Dove Fraction')
+    plt.plot(mixed_fractions, label='Mixed Fraction')
+    plt.xlabel('Generation')
+    plt.ylabel('Strategy Fractions')
+    plt.legend()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,111 @@
+import json
+import os
+from time import perf_counter
+
+
+class PhaseProfiler:
+    """
+    按代记录演化循环中各阶段（对手选择、交互、突变、比例统计、资源结算等）的耗时和调用次数。
+
+    各 evolve 方法接收可选的 profiler 参数，默认为 None，此时循环中只多出对一个局部布尔量的判断。
+    启用时，循环在每个阶段结束处调用 lap(阶段名)，把距上一次 lap（或本代开始）的时间计入该阶段；
+    因此一代内交错执行的阶段（例如逐个体循环中的对手选择和突变）也能分别累计。
+
+    用法:
+    profiler = PhaseProfiler()
+    population.evolve(..., profiler=profiler)
+    print(profiler.format_summary())
+    profiler.export_chrome_trace('trace.json')  # 可在 chrome://tracing 或 Perfetto 中打开
+    """
+
+    def __init__(self):
+        self.origin = perf_counter()
+        self.generations = []  # 每代一项：{'generation', 'start', 'duration', 'phases': {阶段: [秒, 次数]}}
+        self._current = None
+        self._generation_start = None
+        self._last = None
+
+    def begin_generation(self, generation):
+        now = perf_counter()
+        self._current = {'generation': generation, 'start': now - self.origin, 'phases': {}}
+        self._generation_start = self._last = now
+
+    def lap(self, phase, now=None):
+        # 把距上一次 lap 的时间计入 phase
+        if now is None:
+            now = perf_counter()
+        entry = self._current['phases'].get(phase)
+        if entry is None:
+            self._current['phases'][phase] = [now - self._last, 1]
+        else:
+            entry[0] += now - self._last
+            entry[1] += 1
+        self._last = now
+
+    def end_generation(self):
+        now = perf_counter()
+        if now > self._last and self._current['phases']:
+            # 最后一次 lap 之后剩余的时间（循环本身的开销等），与本代的总时长使用同一个时间点
+            self.lap('other', now)
+        self._current['duration'] = now - self._generation_start
+        self.generations.append(self._current)
+        self._current = None
+
+    def totals(self):
+        """
+        所有代合计的 {阶段: (总秒数, 调用次数)}。
+        """
+        result = {}
+        for record in self.generations:
+            for phase, (seconds, calls) in record['phases'].items():
+                total_seconds, total_calls = result.get(phase, (0.0, 0))
+                result[phase] = (total_seconds + seconds, total_calls + calls)
+        return result
+
+    def summary(self):
+        """
+        返回按总耗时降序排列的汇总行，每行包括阶段名、调用次数、总耗时、平均每次耗时和占比。
+        """
+        totals = self.totals()
+        elapsed = sum(record['duration'] for record in self.generations)
+        rows = []
+        for phase, (seconds, calls) in sorted(totals.items(), key=lambda item: -item[1][0]):
+            rows.append({'phase': phase, 'calls': calls, 'total_seconds': seconds,
+                         'mean_microseconds': seconds / calls * 1e6,
+                         'share': seconds / elapsed if elapsed > 0 else 0.0})
+        return rows
+
+    def format_summary(self):
+        lines = [f"{'phase':<24}{'calls':>12}{'total (s)':>12}{'mean (us)':>12}{'share':>8}"]
+        for row in self.summary():
+            lines.append(f"{row['phase']:<24}{row['calls']:>12}{row['total_seconds']:>12.4f}"
+                         f"{row['mean_microseconds']:>12.3f}{row['share']:>8.1%}")
+        lines.append(f"{len(self.generations)} generations")
+        return '\n'.join(lines)
+
+    def chrome_trace(self):
+        """
+        Chrome Trace Event 格式的时间线：每代一个完整事件，其下各阶段按累计耗时依次排列
+        （阶段在一代内可能交错执行，这里只保留每代的合计），args 中记录调用次数。
+        """
+        pid = os.getpid()
+        events = []
+        for record in self.generations:
+            start = record['start'] * 1e6
+            events.append({'name': f"generation {record['generation']}", 'cat': 'generation', 'ph': 'X',
+                           'ts': start, 'dur': record['duration'] * 1e6, 'pid': pid, 'tid': 0})
+            offset = start
+            for phase, (seconds, calls) in record['phases'].items():
+                events.append({'name': phase, 'cat': 'phase', 'ph': 'X', 'ts': offset, 'dur': seconds * 1e6,
+                               'pid': pid, 'tid': 0, 'args': {'calls': calls, 'generation': record['generation']}})
+                offset += seconds * 1e6
+        return {'traceEvents': events, 'displayTimeUnit': 'ms'}
+
+    def export_chrome_trace(self, path):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.chrome_trace(), f)
+
+    def export_json(self, path):
+        # 完整的逐代记录和汇总，便于之后用脚本分析
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump({'summary': self.summary(), 'generations': self.generations}, f)
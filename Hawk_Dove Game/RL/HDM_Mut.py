@@ -1,6 +1,14 @@
+import itertools
+from collections import namedtuple
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+# iter_evolve 每代产出的记录，字段与 Vectorized_Hawk_Dove_Game.GenerationRecord 相同；
+# 该模型没有资源，renewable 和 non_renewable 为 nan
+GenerationRecord = namedtuple('GenerationRecord',
+                              ['generation', 'hawk', 'dove', 'mixed', 'renewable', 'non_renewable', 'mean_payoff'])
+
 # 定义策略
 HAWK = 0
 DOVE = 1
@@ -57,11 +65,20 @@ class Population:
                       [DOVE] * int(size * initial_dove_fraction) +
                       [MIXED] * int(size * initial_mixed_fraction))
         self.individuals = [Individual(strategy, len(STRATEGIES)) for strategy in strategies]
+        # 各策略的实时计数（按策略编号索引），由 set_strategy 增量更新
+        self.strategy_counts = [strategies.count(strategy) for strategy in STRATEGIES]
+        self.generation = 0  # 已完成的代数
+
+    def set_strategy(self, i, strategy):
+        # 修改策略时同步更新计数，读取比例时无需遍历整个群体
+        self.strategy_counts[self.individuals[i].strategy] -= 1
+        self.strategy_counts[strategy] += 1
+        self.individuals[i].strategy = strategy
 
     def normalize_strategies(self):
-        hawks = sum(1 for ind in self.individuals if ind.strategy == HAWK)
-        doves = sum(1 for ind in self.individuals if ind.strategy == DOVE)
-        mixed = sum(1 for ind in self.individuals if ind.strategy == MIXED)
+        hawks = self.strategy_counts[HAWK]
+        doves = self.strategy_counts[DOVE]
+        mixed = self.strategy_counts[MIXED]
         
         total = hawks + doves + mixed
         
@@ -86,32 +103,88 @@ class Population:
 
         for i in range(size):
             self.individuals[i].strategy = strategies[i]
-
-    def evolve(self, V, C, mutation_rate, num_generations):
-        hawk_fractions = []
-        dove_fractions = []
-        mixed_fractions = []
-
-        for gen in range(num_generations):
-            hawk_fraction, dove_fraction, mixed_fraction = self.normalize_strategies()
-            hawk_fractions.append(hawk_fraction)
-            dove_fractions.append(dove_fraction)
-            mixed_fractions.append(mixed_fraction)
+        self.strategy_counts = [strategies.count(strategy) for strategy in STRATEGIES]
+
+    def state_dict(self):
+        """
+        返回完整的模拟状态：策略数组、Q 表、代数计数和全局 np.random 的状态。
+        """
+        return {
+            'strategies': np.array([individual.strategy for individual in self.individuals], dtype=np.int8),
+            'q_tables': np.array([individual.q_table for individual in self.individuals]),
+            'generation': self.generation,
+            'rng': np.random.get_state(legacy=False),
+        }
+
+    def load_state_dict(self, state):
+        self.individuals = []
+        for strategy, q_table in zip(state['strategies'], state['q_tables']):
+            individual = Individual(int(strategy), len(STRATEGIES))
+            individual.q_table = q_table.copy()
+            self.individuals.append(individual)
+        self.strategy_counts = [int(np.count_nonzero(state['strategies'] == strategy)) for strategy in STRATEGIES]
+        self.generation = state['generation']
+        np.random.set_state(state['rng'])
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations, resume=False, profiler=None):
+        """
+        每完成一代产出一条 GenerationRecord（该代开始时的策略计数以及该代的平均收益），
+        不保存历史。num_generations 为 None 时一直运行，由调用者决定何时停止。
+        resume=True 时从当前代数（例如 load_state_dict 恢复的状态）继续计数，否则从第 0 代开始。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        if not resume:
+            self.generation = 0
+        timed = profiler is not None
+        generations = itertools.count(self.generation) if num_generations is None else range(self.generation, self.generation + num_generations)
+
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = tuple(self.strategy_counts)
+            payoff_sum = 0
+            if timed:
+                profiler.lap('fraction_counting')
 
             for i in range(len(self.individuals)):
                 opponent = np.random.choice(self.individuals)
+                if timed:
+                    profiler.lap('opponent_sampling')
                 payoff_self, payoff_opponent, action_self, action_opponent = self.individuals[i].play(opponent, V, C)
+                payoff_sum += payoff_self
+                if timed:
+                    profiler.lap('play_mixed' if MIXED in (self.individuals[i].strategy, opponent.strategy) else 'play')
 
                 next_max_q_self = np.max(self.individuals[i].q_table)
                 self.individuals[i].update_q_value(action_self, payoff_self, next_max_q_self)
+                if timed:
+                    profiler.lap('q_update')
 
                 # 发生突变
                 if np.random.rand() < mutation_rate:
-                    self.individuals[i].strategy = np.random.choice(STRATEGIES)
+                    self.set_strategy(i, np.random.choice(STRATEGIES))
+                if timed:
+                    profiler.lap('mutation')
 
             # 每代结束后重新采样策略分布，确保比例和为1
             hawk_fraction, dove_fraction, mixed_fraction = self.normalize_strategies()
             self.resample_strategies(hawk_fraction, dove_fraction, mixed_fraction)
+            self.generation = gen + 1
+            if timed:
+                profiler.lap('resample')
+                profiler.end_generation()
+
+            yield GenerationRecord(gen, *counts, np.nan, np.nan, payoff_sum / len(self.individuals))
+
+    def evolve(self, V, C, mutation_rate, num_generations, profiler=None):
+        hawk_fractions = []
+        dove_fractions = []
+        mixed_fractions = []
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, profiler=profiler):
+            hawk_fractions.append(record.hawk / len(self.individuals))
+            dove_fractions.append(record.dove / len(self.individuals))
+            mixed_fractions.append(record.mixed / len(self.individuals))
 
         return hawk_fractions, dove_fractions, mixed_fractions
 
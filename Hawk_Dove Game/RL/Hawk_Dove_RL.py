@@ -1,6 +1,14 @@
+import itertools
+from collections import namedtuple
+
 import numpy as np
 import matplotlib.pyplot as plt
 
+# iter_evolve 每代产出的记录，字段与 Vectorized_Hawk_Dove_Game.GenerationRecord 相同；
+# 该模型没有资源，renewable 和 non_renewable 为 nan
+GenerationRecord = namedtuple('GenerationRecord',
+                              ['generation', 'hawk', 'dove', 'mixed', 'renewable', 'non_renewable', 'mean_payoff'])
+
 # 定义策略
 HAWK = 0
 DOVE = 1
@@ -55,24 +63,62 @@ class Population:
         strategies = ([HAWK] * int(size * initial_hawk_fraction) +
                       [DOVE] * int(size * initial_dove_fraction))
         self.individuals = [Individual(strategy, len(STRATEGIES)) for strategy in strategies]
-
-    def evolve(self, V, C, mutation_rate, num_generations):
-        hawk_fractions = []
-        dove_fractions = []
-
-        for gen in range(num_generations):
-            hawk_fractions.append(sum(1 for ind in self.individuals if ind.strategy == HAWK) / len(self.individuals))
-            dove_fractions.append(sum(1 for ind in self.individuals if ind.strategy == DOVE) / len(self.individuals))
+        # 各策略的实时计数（按策略编号索引），由 set_strategy 增量更新
+        self.strategy_counts = [strategies.count(strategy) for strategy in STRATEGIES]
+
+    def set_strategy(self, i, strategy):
+        # 修改策略时同步更新计数，读取比例时无需遍历整个群体
+        self.strategy_counts[self.individuals[i].strategy] -= 1
+        self.strategy_counts[strategy] += 1
+        self.individuals[i].strategy = strategy
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations, profiler=None):
+        """
+        每完成一代产出一条 GenerationRecord（该代开始时的策略计数以及该代的平均收益），
+        不保存历史。num_generations 为 None 时一直运行，由调用者决定何时停止。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        timed = profiler is not None  # 传入 Profiler.PhaseProfiler 时按阶段计时
+        generations = itertools.count() if num_generations is None else range(num_generations)
+
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            hawks, doves = self.strategy_counts
+            payoff_sum = 0
+            if timed:
+                profiler.lap('fraction_counting')
 
             for i in range(len(self.individuals)):
                 opponent = np.random.choice(self.individuals)
+                if timed:
+                    profiler.lap('opponent_sampling')
                 payoff_self, payoff_opponent, action_self, action_opponent = self.individuals[i].play(opponent, V, C)
+                payoff_sum += payoff_self
+                if timed:
+                    profiler.lap('play')
 
                 next_max_q_self = np.max(self.individuals[i].q_table)
                 self.individuals[i].update_q_value(action_self, payoff_self, next_max_q_self)
+                if timed:
+                    profiler.lap('q_update')
 
                 if np.random.rand() < mutation_rate:
-                    self.individuals[i].strategy = np.random.choice(STRATEGIES)
+                    self.set_strategy(i, np.random.choice(STRATEGIES))
+                if timed:
+                    profiler.lap('mutation')
+            if timed:
+                profiler.end_generation()
+
+            yield GenerationRecord(gen, hawks, doves, 0, np.nan, np.nan, payoff_sum / len(self.individuals))
+
+    def evolve(self, V, C, mutation_rate, num_generations, profiler=None):
+        hawk_fractions = []
+        dove_fractions = []
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, profiler):
+            hawk_fractions.append(record.hawk / len(self.individuals))
+            dove_fractions.append(record.dove / len(self.individuals))
 
         return hawk_fractions, dove_fractions
 
@@ -1,4 +1,30 @@
 import numpy as np
+from statistics import NormalDist
+
+def _backward_reachable(edges, sources):
+    # edges[i, j] 表示 i -> j 有边；返回能沿边（0 步或多步）走到 sources 中某个状态的布尔数组
+    reached = np.asarray(sources, dtype=bool).copy()
+    frontier = reached.copy()
+    while frontier.any():
+        frontier = edges[:, frontier].any(axis=1) & ~reached
+        reached |= frontier
+    return reached
+
+def _log_linear_recurrence(log_a, log_b):
+    """
+    x[i] = a[i] x[i - 1] + b[i]（x[-1] = 0，a、b >= 0）的解的自然对数，输入为 log a 和 log b。
+
+    一段内 x[i] = sum_{k<=i} b[k] prod_{k<j<=i} a[j] 是正数之和，用 logaddexp 的累积计算，
+    不会上溢、下溢或因相减损失精度。a[i] = 0 时从 b[i] 重新开始一段，a[i] = inf 之后为 inf。
+    """
+    log_x = np.empty(log_b.size)
+    starts = np.concatenate([[0], np.flatnonzero(np.isneginf(log_a[1:])) + 1, [log_b.size]])
+    for start, stop in zip(starts[:-1], starts[1:]):
+        log_products = np.concatenate([[0.0], np.cumsum(log_a[start + 1:stop])])
+        with np.errstate(invalid='ignore'):
+            log_x[start:stop] = log_products + np.logaddexp.accumulate(log_b[start:stop] - log_products)
+        log_x[start:stop][np.isposinf(log_products)] = np.inf
+    return log_x
 
 class MarkovChain:
     def __init__(self, transition_matrix, states):
@@ -19,37 +45,431 @@ class MarkovChain:
             history.append(self.next_state())
         return history
 
+    def cumulative_matrix(self):
+        # 每一行的累积转移概率，最后一列固定为 1，防止行和的舍入误差让随机数越界
+        cumulative = np.cumsum(np.asarray(self.transition_matrix, dtype=float), axis=1)
+        cumulative[:, -1] = 1.0
+        return cumulative
+
+    def _composition_table(self):
+        """
+        状态数 k 较小时，把“所有状态的下一步”看作映射 {0..k-1} -> {0..k-1}，
+        共 k^k 种，用编号表示。返回每个映射的取值表和映射复合的查找表（展平）。
+        """
+        num_states = len(self.states)
+        num_maps = num_states ** num_states
+        # maps[m, s]：编号为 m 的映射把状态 s 映到哪里（编号的第 s 位 k 进制数字）
+        maps = (np.arange(num_maps)[:, None] // num_states ** np.arange(num_states)) % num_states
+        weights = num_states ** np.arange(num_states)
+        # composition[f, g]：先做 g 再做 f 得到的映射编号
+        composition = (maps[:, maps] * weights).sum(axis=2)
+        return maps.astype(np.int8), weights, composition.astype(np.int32).ravel()
+
+    def simulate_codes(self, steps, rng=None, chunk_size=1 << 14):
+        """
+        向量化模拟：状态用整数编码（self.states 中的下标），返回长度为 steps + 1 的 int8 数组。
+
+        先一次性生成每一步的均匀随机数，用累积转移概率的 searchsorted（逆 CDF）
+        算出“当前为任一状态时下一步的状态”，再用指针倍增把这些单步映射做前缀合成，
+        整个过程没有逐步的 Python 循环。
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        cumulative = self.cumulative_matrix()
+        num_states = len(self.states)
+        # 状态不超过 4 个时映射可以编号，复合只需一次查表；否则直接对 k 行做指针倍增
+        use_table = num_states <= 4
+        if use_table:
+            maps, weights, composition = self._composition_table()
+            num_maps = maps.shape[0]
+
+        codes = np.empty(steps + 1, dtype=np.int8)
+        codes[0] = self.states.index(self.current_state)
+
+        for start in range(0, steps, chunk_size):
+            n = min(chunk_size, steps - start)
+            uniforms = rng.random(n)
+
+            # transitions[s, t]：第 t 步之前处于状态 s 时，第 t 步之后的状态
+            transitions = np.empty((num_states, n), dtype=np.int8)
+            for state in range(num_states):
+                transitions[state] = np.searchsorted(cumulative[state], uniforms, side='right')
+
+            # 指针倍增：完成后第 t 项为从本块开头出发走 t + 1 步的复合映射
+            offset = 1
+            if use_table:
+                prefix = weights.astype(np.int32) @ transitions.astype(np.int32)
+                while offset < n:
+                    prefix[offset:] = composition[prefix[offset:] * num_maps + prefix[:-offset]]
+                    offset *= 2
+                codes[start + 1:start + n + 1] = maps[prefix, codes[start]]
+            else:
+                while offset < n:
+                    transitions[:, offset:] = np.take_along_axis(transitions[:, offset:], transitions[:, :-offset], axis=0)
+                    offset *= 2
+                codes[start + 1:start + n + 1] = transitions[codes[start]]
+
+        self.current_state = self.states[codes[-1]]
+        return codes
+
+    def decode(self, codes):
+        # 把整数编码的状态序列转换回状态名称
+        return [self.states[code] for code in codes]
+
+    def simulate_batch(self, num_chains, steps, rng=None, initial_states=None):
+        """
+        同时推进 num_chains 条相互独立的链，状态保存在形状为 (num_chains,) 的 int8 数组中。
+
+        参数:
+        num_chains - 链的条数
+        steps - 每条链的步数
+        rng - np.random.Generator
+        initial_states - 初始状态编码数组，默认每条链随机选择初始状态
+
+        返回:
+        final_states - 每条链最后的状态编码
+        occupancy - 形状为 (num_chains, 状态数) 的数组，每条链在各状态停留的时间比例（含初始状态）
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        cumulative = self.cumulative_matrix()
+        num_states = len(self.states)
+
+        if initial_states is None:
+            states = rng.integers(0, num_states, size=num_chains, dtype=np.int8)
+        else:
+            states = np.asarray(initial_states, dtype=np.int8).copy()
+        occupancy = np.zeros((num_chains, num_states))
+        occupancy[np.arange(num_chains), states] += 1
+
+        for _ in range(steps):
+            uniforms = rng.random(num_chains)
+            # 逆 CDF：下一状态为累积概率中不超过 u 的项数
+            states = (cumulative[states] <= uniforms[:, None]).sum(axis=1, dtype=np.int8)
+            for state in range(num_states):
+                occupancy[:, state] += states == state
+
+        return states, occupancy / (steps + 1)
+
+    def estimate_distribution(self, num_chains, steps, level=0.95, rng=None):
+        """
+        用多条独立链的时间平均估计长期的状态分布，返回 (mean, lower, upper)，
+        其中 lower/upper 为各状态比例的正态近似置信区间。
+        """
+        _, occupancy = self.simulate_batch(num_chains, steps, rng)
+        mean = occupancy.mean(axis=0)
+        std_error = occupancy.std(axis=0, ddof=1) / np.sqrt(num_chains) if num_chains > 1 else np.zeros_like(mean)
+        z = NormalDist().inv_cdf(0.5 + level / 2)
+        return mean, mean - z * std_error, mean + z * std_error
+
+    def stationary_distribution(self):
+        """
+        解析计算平稳分布：求解 pi (P - I) = 0 且 sum(pi) = 1（最小二乘，适用于奇异情形）。
+        """
+        P = np.asarray(self.transition_matrix, dtype=float)
+        num_states = P.shape[0]
+        A = np.vstack([P.T - np.eye(num_states), np.ones(num_states)])
+        b = np.zeros(num_states + 1)
+        b[-1] = 1
+        return np.linalg.lstsq(A, b, rcond=None)[0]
+
+    def mixing_time(self, epsilon=0.25, max_steps=10000):
+        """
+        混合时间：从任意初始状态出发，t 步后的分布与平稳分布的全变差距离都不超过 epsilon 的最小 t。
+        max_steps 步内未达到时返回 None。
+        """
+        P = np.asarray(self.transition_matrix, dtype=float)
+        pi = self.stationary_distribution()
+        distribution = np.eye(P.shape[0])
+        for t in range(max_steps + 1):
+            if 0.5 * np.abs(distribution - pi).sum(axis=1).max() <= epsilon:
+                return t
+            distribution = distribution @ P
+        return None
+
+    def hitting_times(self, targets):
+        """
+        从每个状态出发首次到达 targets（状态名称或名称列表）的期望步数，
+        目标状态本身为 0，到达不了（或只以小于 1 的概率到达）的状态为 inf。
+        """
+        if isinstance(targets, str):
+            targets = [targets]
+        P = np.asarray(self.transition_matrix, dtype=float)
+        num_states = P.shape[0]
+        is_target = np.zeros(num_states, dtype=bool)
+        is_target[[self.states.index(t) for t in targets]] = True
+        edges = P > 0
+
+        # 能以正概率到达目标的状态（沿 P > 0 反向搜索）；其余状态永远到不了，为 inf。
+        # 能以正概率（不经过目标）走到这些状态的，到达目标的概率小于 1，期望步数也是 inf
+        reaches = _backward_reachable(edges, is_target)
+        infinite = _backward_reachable(edges & ~is_target[:, None], ~reaches)
+        finite = np.flatnonzero(~is_target & ~infinite)
+
+        # 在剩下的状态上解 h = 1 + Q h：这些状态只会转移到彼此或目标，I - Q 可逆
+        Q = P[np.ix_(finite, finite)]
+        times = np.zeros(num_states)
+        times[infinite] = np.inf
+        times[finite] = np.linalg.solve(np.eye(finite.size) - Q, np.ones(finite.size))
+        return times
+
+    def encode(self, history):
+        # 把状态名称序列转换为整数编码，已经是整数数组时原样返回
+        if isinstance(history, np.ndarray) and history.dtype.kind in 'iu':
+            return history
+        index = {state: i for i, state in enumerate(self.states)}
+        return np.fromiter((index[state] for state in history), dtype=np.int8, count=len(history))
+
+    def analyze_codes(self, codes):
+        """
+        对整数编码的状态序列做一次性分析，返回 SequenceAnalyzer.result() 的结构化结果。
+        """
+        analyzer = SequenceAnalyzer(self.states)
+        analyzer.update(codes)
+        return analyzer.result()
+
     def analyze_sequence(self, history):
-        state_counts = {state: 0 for state in self.states}
-        state_streaks = {state: [] for state in self.states}
-        current_streak = {state: 0 for state in self.states}
-        
-        for i, state in enumerate(history):
-            state_counts[state] += 1
-            for s in self.states:
-                if s == state:
-                    current_streak[s] += 1
-                else:
-                    if current_streak[s] > 0:
-                        state_streaks[s].append(current_streak[s])
-                    current_streak[s] = 0
-
-        for s in self.states:
-            if current_streak[s] > 0:
-                state_streaks[s].append(current_streak[s])
-
-        # 计算每个状态的出现频率
-        total_steps = len(history)
-        state_frequencies = {state: count / total_steps for state, count in state_counts.items()}
-        
+        result = self.analyze_codes(self.encode(history))
+
         # 输出分析结果
         print("\nStrategy Frequency:")
-        for state, freq in state_frequencies.items():
+        for state, freq in zip(self.states, result['frequencies']):
             print(f"{state}: {freq:.2f}")
 
-        print("\nStrategy Streaks (length of consecutive occurrences):")
-        for state, streaks in state_streaks.items():
-            print(f"{state}: {streaks}")
+        print("\nStrategy Streaks (number / mean length / max length):")
+        for i, state in enumerate(self.states):
+            print(f"{state}: {result['streak_counts'][i]} / {result['mean_dwell'][i]:.2f} / {result['max_dwell'][i]}")
+
+        return result
+
+
+class BirthDeathChain(MarkovChain):
+    """
+    生灭链：状态 0..n，每一步从 i 只能到 i + 1（概率 up[i]）、i - 1（概率 down[i]）或停留。
+    转移矩阵是三对角的，只保存两条对角线，所以 n 可以达到 10^6 以上；
+    击中时间等用带状矩阵求解，固定概率在对数空间中求和，不会上溢或下溢。
+
+    transition_matrix 按需生成稠密矩阵，只适用于较小的 n（用于继承的模拟和分析方法）。
+
+    参数:
+    up - 长度为 n + 1 的数组，up[n] 应为 0
+    down - 长度为 n + 1 的数组，down[0] 应为 0
+    states - 状态名称，默认为 0..n
+    """
+
+    def __init__(self, up, down, states=None):
+        self.up = np.asarray(up, dtype=float)
+        self.down = np.asarray(down, dtype=float)
+        self.states = list(range(self.up.size)) if states is None else states
+        # 不做随机抽取：状态数可能很大，而且 solve / solve_grid 每个参数点都会新建一条链，
+        # 抽取会推进全局随机数生成器；需要随机起点时直接设置 current_state
+        self.current_state = self.states[0]
+
+    @property
+    def transition_matrix(self):
+        P = np.diag(1 - self.up - self.down)
+        P[np.arange(self.up.size - 1), np.arange(1, self.up.size)] = self.up[:-1]
+        P[np.arange(1, self.up.size), np.arange(self.up.size - 1)] = self.down[1:]
+        return P
+
+    @staticmethod
+    def _solve_tridiagonal(up, down, rhs):
+        """
+        求解 (up[i] + down[i]) x[i] - up[i] x[i + 1] - down[i] x[i - 1] = rhs[i]（rhs > 0），
+        up / down 为一段连续状态上的转移概率，段两端之外的 x 视为 0（吸收）。
+
+        鹰鸽共存（C > V）时吸收时间随 n 指数增长，方程组极度病态，带减法的消元会失去全部有效数字
+        （甚至得到负的时间）。这里用不做减法的追赶法：消元后的主元 p[i] = up[i] + s[i]，
+        其中 s[i] = down[i] s[i - 1] / p[i - 1]，即 1 / s 满足线性递推；前代和回代也都是
+        系数为正的线性递推，全部在对数空间中求解，每一项都有很高的相对精度。
+        到达不了段两端的状态（主元为 0）结果为 inf。
+        """
+        with np.errstate(divide='ignore', invalid='ignore'):
+            log_up, log_down, log_rhs = np.log(up), np.log(down), np.log(rhs)
+            # q = 1 / s：q[i] = (up[i - 1] q[i - 1] + 1) / down[i]，down[i] = 0 时 s 从此为 0
+            log_q = _log_linear_recurrence(
+                np.concatenate([[0.0], np.where(down[1:] > 0, log_up[:-1] - log_down[1:], np.inf)]), -log_down)
+            log_pivot = np.logaddexp(log_up, -log_q)
+            # 前代：R[i] = rhs[i] + down[i] / p[i - 1] R[i - 1]
+            log_r = _log_linear_recurrence(
+                np.concatenate([[0.0], np.where(down[1:] > 0, log_down[1:] - log_pivot[:-1], -np.inf)]), log_rhs)
+            # 回代：x[i] = R[i] / p[i] + up[i] / p[i] x[i + 1]，倒过来也是同样的递推
+            log_x = _log_linear_recurrence(np.where(up > 0, log_up - log_pivot, -np.inf)[::-1],
+                                           (log_r - log_pivot)[::-1])[::-1]
+        with np.errstate(over='ignore'):
+            return np.exp(log_x)
+
+    def hitting_times(self, targets):
+        """
+        从每个状态出发首次到达 targets（状态名称或名称列表）的期望步数，
+        目标状态本身为 0，到达不了的状态为 inf。与 MarkovChain.hitting_times 相同，
+        但相邻目标之间的每一段只解一个三对角方程组。
+        """
+        if isinstance(targets, str) or np.ndim(targets) == 0:
+            targets = [targets]
+        num_states = self.up.size
+        target_codes = sorted(self.states.index(t) for t in targets)
+        times = np.zeros(num_states)
+        # 以目标状态分段：段内的状态只能先到达两端的目标之一
+        bounds = [-1] + target_codes + [num_states]
+        for left, right in zip(bounds[:-1], bounds[1:]):
+            segment = slice(left + 1, right)
+            if left + 1 >= right:
+                continue
+            # 段的一端是链的边界时边界状态只能向内转移（down[0] = up[n] = 0），方程组仍然成立；
+            # 到不了任何目标的状态在 _solve_tridiagonal 中已经是 inf
+            solution = self._solve_tridiagonal(self.up[segment], self.down[segment], np.ones(right - left - 1))
+            times[segment] = np.where(np.isnan(solution), np.inf, solution)
+        return times
+
+    def _log_ratio_terms(self):
+        # log_terms[k] = log prod_{j=1}^{k} down[j] / up[j]，k = 0..n-1（空积为 1）
+        n = self.up.size - 1
+        with np.errstate(divide='ignore'):
+            log_ratios = np.log(self.down[1:n]) - np.log(self.up[1:n])
+        return np.concatenate([[0.0], np.cumsum(log_ratios)])
+
+    def log_fixation_probabilities(self):
+        """
+        从每个状态出发最终被 n 吸收（而不是 0）的概率的自然对数。
+
+        phi_i = sum_{k<i} prod_{j<=k} g_j / sum_{k<n} prod_{j<=k} g_j，g_j = down[j] / up[j]。
+        连乘和求和都在对数空间中进行（logaddexp 的累积），n 很大时也不会溢出或下溢。
+        """
+        log_partial = np.logaddexp.accumulate(self._log_ratio_terms())
+        return np.concatenate([[-np.inf], log_partial - log_partial[-1]])
+
+    def log_extinction_probabilities(self):
+        """
+        从每个状态出发最终被 0 吸收的概率 1 - phi_i 的自然对数。
+        直接对 k >= i 的项求和，phi_i 接近 1 时不会因为相减而失去精度。
+        """
+        log_terms = self._log_ratio_terms()
+        log_suffix = np.logaddexp.accumulate(log_terms[::-1])[::-1]
+        return np.concatenate([log_suffix - log_suffix[0], [-np.inf]])
+
+    def fixation_probabilities(self):
+        return np.exp(self.log_fixation_probabilities())
+
+    def _conditional_times(self, log_h):
+        """
+        以被 h 对应的吸收态吸收为条件的期望步数（Doob h 变换）：条件链的转移概率为
+        up[i] h[i + 1] / h[i] 和 down[i] h[i - 1] / h[i]，比值由对数相减得到，h 很小时也不会下溢。
+        """
+        n = self.up.size - 1
+        times = np.full(n + 1, np.nan)
+        # 吸收态本身为 0；h 为 0 的那一端条件不可能发生，保持 nan
+        times[[0, n]] = np.where(np.isfinite(log_h[[0, n]]), 0.0, np.nan)
+        if n >= 2:
+            with np.errstate(invalid='ignore'):
+                up = self.up[1:n] * np.exp(log_h[2:] - log_h[1:n])
+                down = self.down[1:n] * np.exp(log_h[:n - 1] - log_h[1:n])
+            times[1:n] = self._solve_tridiagonal(up, down, np.ones(n - 1))
+        return times
+
+    def absorption_times(self):
+        """
+        从每个状态出发被 0 或 n 吸收的期望步数，以及分别以被 n 吸收、被 0 吸收为条件的期望步数
+        （不可能发生的条件为 nan）。
+
+        返回:
+        (unconditional, conditional_on_n, conditional_on_0)，长度均为 n + 1
+        """
+        n = self.up.size - 1
+        unconditional = np.zeros(n + 1)
+        if n >= 2:
+            unconditional[1:n] = self._solve_tridiagonal(self.up[1:n], self.down[1:n], np.ones(n - 1))
+        return (unconditional,
+                self._conditional_times(self.log_fixation_probabilities()),
+                self._conditional_times(self.log_extinction_probabilities()))
+
+class SequenceAnalyzer:
+    """
+    分块累积状态序列的统计量：频率、连续出现（streak）长度的直方图、平均/最长停留时间
+    以及经验转移矩阵。每次 update 只处理一块整数编码的序列，不保存完整历史；
+    跨块的 streak 和转移会被正确衔接。
+    """
+
+    def __init__(self, states):
+        self.states = states
+        num_states = len(states)
+        self.counts = np.zeros(num_states, dtype=np.int64)
+        self.transition_counts = np.zeros((num_states, num_states), dtype=np.int64)
+        # streak_histogram[s, L]：状态 s 连续出现 L 次的 streak 个数
+        self.streak_histogram = np.zeros((num_states, 1), dtype=np.int64)
+        self.last_state = None
+        self.open_run = 0  # 上一块末尾尚未结束的 streak 长度
+
+    def _add_runs(self, run_states, run_lengths):
+        longest = run_lengths.max(initial=0)
+        if longest >= self.streak_histogram.shape[1]:
+            self.streak_histogram = np.pad(self.streak_histogram,
+                                           ((0, 0), (0, longest + 1 - self.streak_histogram.shape[1])))
+        np.add.at(self.streak_histogram, (run_states, run_lengths), 1)
+
+    def update(self, codes):
+        codes = np.asarray(codes).astype(np.intp, copy=False)
+        if codes.size == 0:
+            return
+        num_states = len(self.states)
+        self.counts += np.bincount(codes, minlength=num_states)
+
+        # 转移计数：把上一块的最后一个状态接在本块前面
+        previous = codes[:-1] if self.last_state is None else np.concatenate(([self.last_state], codes[:-1]))
+        following = codes[1:] if self.last_state is None else codes
+        self.transition_counts += np.bincount(previous * num_states + following,
+                                              minlength=num_states * num_states).reshape(num_states, num_states)
+
+        # 游程编码：状态发生变化的位置即为新 streak 的开头
+        starts = np.concatenate(([0], np.flatnonzero(np.diff(codes)) + 1))
+        lengths = np.diff(np.append(starts, codes.size))
+        run_states = codes[starts]
+
+        if self.last_state is not None:
+            if run_states[0] == self.last_state:
+                lengths[0] += self.open_run
+            else:
+                self._add_runs(np.array([self.last_state]), np.array([self.open_run]))
+
+        # 最后一个 streak 可能在下一块继续，先不计入直方图
+        self._add_runs(run_states[:-1], lengths[:-1])
+        self.last_state = run_states[-1]
+        self.open_run = lengths[-1]
+
+    def result(self):
+        """
+        返回当前累积的统计结果（按 states 中的顺序排列的数组）:
+        frequencies - 各状态出现的频率
+        streak_histograms - streak_histograms[s][L] 为状态 s 连续出现 L 次的次数
+        streak_counts - 各状态的 streak 个数
+        mean_dwell / max_dwell - 各状态平均/最长的连续停留步数
+        transition_matrix - 经验转移矩阵（没有出现过的状态对应的行为 0）
+        """
+        histogram = self.streak_histogram.copy()
+        if self.last_state is not None:
+            if self.open_run >= histogram.shape[1]:
+                histogram = np.pad(histogram, ((0, 0), (0, self.open_run + 1 - histogram.shape[1])))
+            histogram[self.last_state, self.open_run] += 1
+
+        lengths = np.arange(histogram.shape[1])
+        streak_counts = histogram.sum(axis=1)
+        total_dwell = (histogram * lengths).sum(axis=1)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            mean_dwell = np.where(streak_counts > 0, total_dwell / streak_counts, 0.0)
+        max_dwell = np.array([np.flatnonzero(row).max(initial=0) for row in histogram])
+
+        row_sums = self.transition_counts.sum(axis=1, keepdims=True)
+        transition_matrix = np.divide(self.transition_counts, row_sums,
+                                      out=np.zeros(self.transition_counts.shape), where=row_sums > 0)
+
+        return {
+            'states': list(self.states),
+            'counts': self.counts.copy(),
+            'frequencies': self.counts / max(self.counts.sum(), 1),
+            'streak_histograms': [row[:longest + 1] for row, longest in zip(histogram, max_dwell)],
+            'streak_counts': streak_counts,
+            'mean_dwell': mean_dwell,
+            'max_dwell': max_dwell,
+            'transition_matrix': transition_matrix,
+        }
 
 def main():
     # 马尔可夫链转移矩阵
@@ -69,5 +489,10 @@ def main():
     # 分析策略序列
     mc.analyze_sequence(history)
 
+    # 与解析的平稳分布对比
+    print("\nStationary Distribution:")
+    for state, prob in zip(states, mc.stationary_distribution()):
+        print(f"{state}: {prob:.2f}")
+
 if __name__ == "__main__":
     main()
@@ -0,0 +1,180 @@
+import numpy as np
+import matplotlib.pyplot as plt
+
+# 定义策略
+HAWK = 0
+DOVE = 1
+MIXED = 2
+STRATEGIES = [HAWK, DOVE, MIXED]
+
+# Q-Learning参数
+ALPHA = 0.1  # 学习率
+GAMMA = 0.95  # 折扣因子
+EPSILON = 0.1  # 探索率
+
+
+def payoff_table(V, C, num_strategies):
+    """
+    行动收益表，table[a, b] 为行动 a 遇到行动 b 时的收益。
+    与 Individual.play 一致，鹰鸽之外的行动（MIXED）收益为 0。
+    """
+    table = np.zeros((num_strategies, num_strategies))
+    table[HAWK, HAWK] = (V - C) / 2
+    table[HAWK, DOVE] = V
+    table[DOVE, HAWK] = 0
+    table[DOVE, DOVE] = V / 2
+    return table
+
+
+class VectorizedQPopulation:
+    """
+    所有个体的 Q 表保存在一个 N×k 的数组中，动作选择、收益查表和 TD 更新
+    对整个群体按代批量完成。
+
+    num_strategies=2 对应 Hawk_Dove_RL.py，num_strategies=3 对应
+    Hawk_Dove_MultiStrategy.py；resample=True 时每代结束后按 HDM_Mut.py 的方式
+    重新分配策略。
+
+    与逐个体的版本不同，一代内所有个体都基于该代开始时的 Q 表和策略选择动作。
+    每个个体每代只作为主动方更新一次自己的 Q 值，各行之间不会发生写冲突。
+    """
+
+    def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction=0.0,
+                 num_strategies=3, rng=None):
+        counts = [int(size * initial_hawk_fraction), int(size * initial_dove_fraction)]
+        if num_strategies > 2:
+            counts.append(int(size * initial_mixed_fraction))
+        self.num_strategies = num_strategies
+        self.strategies = np.repeat(np.arange(num_strategies, dtype=np.int8), counts)
+        self.q_tables = np.zeros((self.strategies.size, num_strategies))
+        self.strategy_counts = np.array(counts, dtype=np.int64)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self):
+        return self.strategies.size
+
+    def choose_actions(self, strategies, q_tables):
+        """
+        为一组个体批量选择动作：混合策略按 Q 值比例选择鹰或鸽，其余个体 epsilon-greedy。
+        """
+        n = strategies.size
+        explore = self.rng.random(n) < EPSILON
+        actions = np.where(explore,
+                           self.rng.integers(0, self.num_strategies, size=n, dtype=np.int8),
+                           np.argmax(q_tables, axis=1).astype(np.int8))
+
+        if self.num_strategies > 2:
+            mixed = np.flatnonzero(strategies == MIXED)
+            hawk_q = np.maximum(q_tables[mixed, HAWK], 0)  # 确保Q值为非负数
+            dove_q = np.maximum(q_tables[mixed, DOVE], 0)
+            hawk_prob = hawk_q / (hawk_q + dove_q + 1e-6)  # 避免除以零
+            actions[mixed] = np.where(self.rng.random(mixed.size) < hawk_prob, HAWK, DOVE)
+
+        return actions
+
+    def mutate(self, mutation_rate):
+        mutants = np.flatnonzero(self.rng.random(self.strategies.size) < mutation_rate)
+        new_strategies = self.rng.integers(0, self.num_strategies, size=mutants.size, dtype=np.int8)
+        self.strategy_counts += (np.bincount(new_strategies, minlength=self.num_strategies) -
+                                 np.bincount(self.strategies[mutants], minlength=self.num_strategies))
+        self.strategies[mutants] = new_strategies
+
+    def resample_strategies(self):
+        # 与 HDM_Mut.Population.resample_strategies 相同：按当前比例依次重新分配策略
+        size = self.strategies.size
+        counts = [int(size * (count / size)) for count in self.strategy_counts]
+        strategies = np.repeat(np.arange(self.num_strategies, dtype=np.int8), counts)
+        if strategies.size < size:
+            padding = self.rng.integers(0, self.num_strategies, size=size - strategies.size, dtype=np.int8)
+            strategies = np.concatenate([strategies, padding])
+        self.strategies = strategies[:size]
+        self.strategy_counts = np.bincount(self.strategies, minlength=self.num_strategies).astype(np.int64)
+
+    def fractions(self):
+        return self.strategy_counts / self.strategies.size
+
+    def step(self, V, C, mutation_rate, resample=False, profiler=None):
+        """
+        推进一代：选择对手和动作、查表得到收益、批量 TD 更新，然后突变。
+        返回每个个体本代的收益。profiler 不为 None 时在每个阶段结束处调用 profiler.lap。
+        """
+        timed = profiler is not None
+        n = self.strategies.size
+        rows = np.arange(n)
+        opponents = self.rng.integers(0, n, size=n)
+        if timed:
+            profiler.lap('opponent_sampling')
+
+        action_self = self.choose_actions(self.strategies, self.q_tables)
+        action_opponent = self.choose_actions(self.strategies[opponents], self.q_tables[opponents])
+        rewards = payoff_table(V, C, self.num_strategies)[action_self, action_opponent]
+        if timed:
+            profiler.lap('play')
+
+        # Q(s, a) += ALPHA * (r + GAMMA * max Q - Q(s, a))，max Q 取更新前的值
+        next_max_q = self.q_tables.max(axis=1)
+        current_q = self.q_tables[rows, action_self]
+        self.q_tables[rows, action_self] = current_q + ALPHA * (rewards + GAMMA * next_max_q - current_q)
+        if timed:
+            profiler.lap('q_update')
+
+        self.mutate(mutation_rate)
+        if timed:
+            profiler.lap('mutation')
+        if resample:
+            self.resample_strategies()
+            if timed:
+                profiler.lap('resample')
+        return rewards
+
+    def evolve(self, V, C, mutation_rate, num_generations, resample=False, profiler=None):
+        """
+        运行多代演化，返回每一代开始时各策略的比例（每种策略一个数组）。
+
+        参数:
+        V - 资源价值
+        C - 打斗代价
+        mutation_rate - 突变率
+        num_generations - 模拟的代数
+        resample - 是否在每代结束后重新分配策略（HDM_Mut.py 的行为）
+        profiler - 可选的 Profiler.PhaseProfiler，按阶段记录每代的耗时
+        """
+        history = np.empty((num_generations, self.num_strategies))
+        timed = profiler is not None
+
+        for gen in range(num_generations):
+            if timed:
+                profiler.begin_generation(gen)
+            history[gen] = self.fractions()
+            if timed:
+                profiler.lap('fraction_counting')
+            self.step(V, C, mutation_rate, resample, profiler)
+            if timed:
+                profiler.end_generation()
+
+        return tuple(history[:, strategy] for strategy in range(self.num_strategies))
+
+def main():
+    V = 50  # 资源价值
+    C = 100  # 打斗代价
+    population_size = 1000000  # 群体规模
+    initial_hawk_fraction = 0.3  # 初始鹰的比例
+    initial_dove_fraction = 0.3  # 初始鸽的比例
+    initial_mixed_fraction = 0.4  # 初始混合策略的比例
+    num_generations = 100  # 模拟的代数
+    mutation_rate = 0.01  # 突变率
+
+    population = VectorizedQPopulation(population_size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction)
+    hawk_fractions, dove_fractions, mixed_fractions = population.evolve(V, C, mutation_rate, num_generations, resample=True)
+
+    # 绘制结果
+    plt.plot(hawk_fractions, label='Hawk Fraction')
+    plt.plot(dove_fractions, label='Dove Fraction')
+    plt.plot(mixed_fractions, label='Mixed Fraction')
+    plt.xlabel('Generation')
+    plt.ylabel('Strategy Fractions')
+    plt.legend()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+import numpy as np
+
+
+class RandomBuffer:
+    """
+    成块预生成均匀随机数并按需逐个取出，用于逐个体循环的脚本。
+
+    每次调用 np.random.rand() 或 np.random.choice() 都有数微秒的调度开销，
+    而从预先生成的 Python 列表中取一个数只需一次索引。
+
+    参数:
+    rng - 随机数来源，可以是 np.random.Generator；默认使用全局的 np.random，
+          这样 np.random.seed() 仍然决定整个模拟的结果
+    block_size - 每次批量生成的随机数个数
+    """
+
+    def __init__(self, rng=None, block_size=65536):
+        self.rng = rng if rng is not None else np.random
+        self.block_size = block_size
+        self._block = []
+        self._position = 0
+
+    def reset(self):
+        # 丢弃尚未使用的随机数，下一次取数时从 rng 的当前状态重新生成
+        self._block = []
+        self._position = 0
+
+    def get_state(self):
+        """
+        返回尚未取出的随机数（数组）。与 rng 的状态一起保存，即可精确恢复之后的取数序列。
+        """
+        return np.array(self._block[self._position:], dtype=float)
+
+    def set_state(self, pending):
+        self._block = np.asarray(pending, dtype=float).tolist()
+        self._position = 0
+
+    def uniform(self):
+        """返回 [0, 1) 上的一个均匀随机数。"""
+        if self._position >= len(self._block):
+            self._block = self.rng.random(self.block_size).tolist()
+            self._position = 0
+        value = self._block[self._position]
+        self._position += 1
+        return value
+
+    def integers(self, n):
+        """返回 0 到 n - 1 之间均匀分布的整数。"""
+        return min(int(self.uniform() * n), n - 1)
+
+    def choice(self, options, p=None):
+        """
+        从 options 中随机选择一个元素，p 为各元素的概率（默认等概率）。
+        """
+        if p is None:
+            return options[self.integers(len(options))]
+        u = self.uniform()
+        cumulative = 0.0
+        for option, probability in zip(options, p):
+            cumulative += probability
+            if u < cumulative:
+                return option
+        return options[-1]
+
+
+# 各脚本共享的缓冲区，从全局 np.random 取数
+global_buffer = RandomBuffer()
+
+
+def reseed(seed):
+    """
+    重新设定全局 np.random 的种子，并清空共享缓冲区中按旧状态生成的随机数。
+    """
+    np.random.seed(seed)
+    global_buffer.reset()
@@ -0,0 +1,169 @@
+import numpy as np
+
+from Trajectory_Store import record_replicator
+
+# 按块产出轨迹时每块的元素个数上限（行数 × 参数组数），参数组越多每块的代数越少
+CHUNK_ELEMENTS = 1 << 20
+
+
+def fitness(hawk_fraction, V, C):
+    """
+    计算鹰和鸽的预期收益，所有参数都可以是可广播的数组。
+
+    参数:
+    hawk_fraction - 当前鹰的比例
+    V - 资源的价值
+    C - 打斗的代价
+    """
+    dove_fraction = 1 - hawk_fraction
+
+    # 鹰的预期收益
+    hawk_payoff = (hawk_fraction * (V - C) / 2) + (dove_fraction * V)
+
+    # 鸽的预期收益
+    dove_payoff = dove_fraction * V / 2
+
+    return hawk_payoff, dove_payoff
+
+
+def parameter_grid(V_values, C_values, initial_hawk_fractions):
+    """
+    生成 (V, C, 初始鹰比例) 的全组合，返回三个展平后的一维数组。
+    """
+    V, C, h0 = np.meshgrid(V_values, C_values, initial_hawk_fractions, indexing='ij')
+    return V.ravel(), C.ravel(), h0.ravel()
+
+
+def _broadcast_params(V, C, initial_hawk_fraction):
+    # 把三个参数广播成等长的一维数组
+    return tuple(np.ravel(x) for x in np.broadcast_arrays(
+        np.asarray(V, dtype=float), np.asarray(C, dtype=float), np.asarray(initial_hawk_fraction, dtype=float)))
+
+
+def _replicator_chunks(V, C, h, num_generations, tol, chunk_size, converged_at):
+    """
+    iter_replicator 的实现，V / C / h 为等长的一维数组。
+    tol 不为 None 时把每条轨迹到达不动点的代数写入 converged_at（未收敛的保持原值）。
+    """
+    current = h.copy()
+    if tol is not None:
+        # 解析捷径：从 0、1 或混合均衡 V/C 出发的轨迹本身就是不动点
+        at_fixed_point = ((h == 0) | (h == 1) |
+                          ((C > V) & (np.abs(h - mixed_equilibrium(V, C)) < tol)))
+        converged_at[at_fixed_point] = 0
+        active = np.flatnonzero(~at_fixed_point)
+
+    total = None if num_generations is None else num_generations + 1
+    gen = 0
+    with np.errstate(divide='ignore', invalid='ignore'):
+        while total is None or gen < total:
+            rows = chunk_size if total is None else min(chunk_size, total - gen)
+            # 按代连续存放，每一步写入的是一整行
+            chunk = np.empty((rows, h.size))
+            for row in range(rows):
+                if gen > 0 and tol is None:
+                    # 不做收敛检测时整行一起更新，不需要按下标取出活跃的轨迹
+                    hawk_fitness, dove_fitness = fitness(current, V, C)
+                    current = current * hawk_fitness / (current * hawk_fitness + (1 - current) * dove_fitness)
+                elif gen > 0 and active.size:
+                    previous = current[active]
+                    hawk_fitness, dove_fitness = fitness(previous, V[active], C[active])
+                    new = previous * hawk_fitness / (previous * hawk_fitness + (1 - previous) * dove_fitness)
+                    current[active] = new
+                    # 收敛的轨迹停止迭代，之后各代保持该不动点
+                    done = np.abs(new - previous) < tol
+                    converged_at[active[done]] = gen
+                    active = active[~done]
+                chunk[row] = current
+                gen += 1
+            yield chunk
+
+
+def _chunk_rows(num_params):
+    # 每块的行数：元素个数不超过 CHUNK_ELEMENTS，至少一行
+    return max(1, CHUNK_ELEMENTS // num_params)
+
+
+def iter_replicator(V, C, initial_hawk_fraction=0.5, num_generations=None, tol=None, chunk_size=None):
+    """
+    按块产出多组参数下的鹰鸽复制子动态，每块为形状 (行数, n_params) 的数组，
+    依次为第 0, 1, 2, ... 代的鹰比例。只保存当前一块，内存占用与代数无关；
+    num_generations 为 None 时一直运行，由调用者决定何时停止。
+
+    参数:
+    V - 资源的价值（标量或数组）
+    C - 打斗的代价（标量或数组）
+    initial_hawk_fraction - 初始鹰的比例（标量或数组）
+    num_generations - 演化的代数（共产出 num_generations + 1 行）
+    tol - 收敛容差，设置后与 replicator_converge 相同，收敛的轨迹停止迭代并保持该不动点
+    chunk_size - 每块的行数，默认使每块约 CHUNK_ELEMENTS 个元素
+    """
+    V, C, h = _broadcast_params(V, C, initial_hawk_fraction)
+    return _replicator_chunks(V, C, h, num_generations, tol, chunk_size or _chunk_rows(h.size), np.full(h.size, -1))
+
+
+def replicator_sweep(V, C, initial_hawk_fraction=0.5, num_generations=100, path=None):
+    """
+    同时推进多组参数下的鹰鸽复制子动态，不绘图。
+
+    参数:
+    V - 资源的价值（标量或数组）
+    C - 打斗的代价（标量或数组）
+    initial_hawk_fraction - 初始鹰的比例（标量或数组）
+    num_generations - 演化的代数
+    path - 设置后轨迹按块写入该目录下的 Trajectory_Store.TrajectoryStore（列为 replicator_columns(n_params)，
+           每代一行），不在内存中保存完整轨迹
+
+    返回:
+    形状为 (n_params, num_generations + 1) 的数组，每一行是一条鹰比例的轨迹；设置 path 时返回存储对象
+    """
+    if path is not None:
+        V, C, h = _broadcast_params(V, C, initial_hawk_fraction)
+        return record_replicator(path, iter_replicator(V, C, h, num_generations), num_generations, h.size)
+
+    # 与 hawk_dove_game 相同的离散复制子映射，只是每一步对所有参数组同时更新；
+    # 整条轨迹作为一块产出，最后以转置视图返回
+    hawk_fractions, = iter_replicator(V, C, initial_hawk_fraction, num_generations, chunk_size=num_generations + 1)
+    return hawk_fractions.T
+
+
+def mixed_equilibrium(V, C):
+    """
+    鹰比例的解析平衡点：当 C > V 时为混合均衡 V/C，否则鹰占满整个群体 (1.0)。
+    """
+    V = np.asarray(V, dtype=float)
+    C = np.asarray(C, dtype=float)
+    mixed = C > V
+    return np.where(mixed, V / np.where(mixed, C, 1), 1.0)
+
+
+def replicator_converge(V, C, initial_hawk_fraction=0.5, num_generations=100, tol=1e-10, path=None):
+    """
+    带收敛检测的 replicator_sweep：相邻两代的变化小于 tol 的轨迹停止迭代，
+    其余代数直接用该不动点填充。
+
+    参数:
+    V - 资源的价值（标量或数组）
+    C - 打斗的代价（标量或数组）
+    initial_hawk_fraction - 初始鹰的比例（标量或数组）
+    num_generations - 演化的代数
+    tol - 收敛判定的容差
+    path - 设置后轨迹按块写入该目录下的 TrajectoryStore，见 replicator_sweep
+
+    返回:
+    hawk_fractions - 形状为 (n_params, num_generations + 1) 的轨迹（设置 path 时为存储对象）
+    equilibrium - 每条轨迹最终停留的鹰比例
+    converged_at - 每条轨迹到达不动点的代数，未收敛时为 -1
+    """
+    V, C, h = _broadcast_params(V, C, initial_hawk_fraction)
+    converged_at = np.full(h.size, -1)
+    chunks = _replicator_chunks(V, C, h, num_generations, tol,
+                                num_generations + 1 if path is None else _chunk_rows(h.size), converged_at)
+
+    if path is not None:
+        store = record_replicator(path, chunks, num_generations, h.size)
+        # 收敛的轨迹在之后各代保持不动点，最后一代即为最终停留的比例
+        return store, store['hawk_fraction'][-1].copy(), converged_at
+
+    hawk_fractions, = chunks
+    return hawk_fractions.T, hawk_fractions[-1].copy(), converged_at
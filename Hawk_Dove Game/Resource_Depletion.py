@@ -0,0 +1,20 @@
+import numpy as np
+
+
+def remaining_stocks(total_payoffs, non_renewable, renewable):
+    """
+    一代交互结束后的两种资源存量：按交互顺序先从不可再生资源、再从可再生资源中扣除
+    每次交互的总收益（只扣除正收益），与逐次循环扣除的结果相同。
+    不可再生资源降为 0 之后保持为 0，剩余的需求全部由可再生资源承担（可以变为负数）。
+
+    参数:
+    total_payoffs - 一代中每次交互双方收益之和组成的数组
+    non_renewable - 该代开始时的不可再生资源
+    renewable - 该代开始时的可再生资源
+
+    返回:
+    (non_renewable, renewable)
+    """
+    total_payoffs = np.asarray(total_payoffs, dtype=float)
+    demand = total_payoffs[total_payoffs > 0].sum()
+    return float(max(non_renewable - demand, 0)), float(renewable - max(demand - non_renewable, 0))
@@ -1,5 +1,8 @@
+import itertools
 import numpy as np
 import matplotlib.pyplot as plt
+from Random_Buffer import global_buffer as random_buffer
+from Vectorized_Hawk_Dove_Game import GenerationRecord
 
 class Individual:
     def __init__(self, strategy):
@@ -10,11 +13,11 @@ class Individual:
             return 0, 0  # 没有资源时，双方收益为0
 
         if self.strategy == 'Mixed':
-            self_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return Individual(self_choice).play(opponent, V, C, available_resource)
+            self_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return PURE_STRATEGIES[self_choice].play(opponent, V, C, available_resource)
         elif opponent.strategy == 'Mixed':
-            opponent_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return self.play(Individual(opponent_choice), V, C, available_resource)
+            opponent_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return self.play(PURE_STRATEGIES[opponent_choice], V, C, available_resource)
 
         if self.strategy == 'Hawk' and opponent.strategy == 'Hawk':
             return (V - C) / 2, (V - C) / 2
@@ -27,38 +30,65 @@ class Individual:
         else:
             return 0, 0
 
+# 混合策略落实为鹰或鸽后使用的纯策略个体，避免每次交互都新建对象
+PURE_STRATEGIES = {'Hawk': Individual('Hawk'), 'Dove': Individual('Dove')}
+
 class Population:
     def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction):
         strategies = (['Hawk'] * int(size * initial_hawk_fraction) +
                       ['Dove'] * int(size * initial_dove_fraction) +
                       ['Mixed'] * int(size * initial_mixed_fraction))
         self.individuals = [Individual(strategy) for strategy in strategies]
-
-    def evolve(self, V, C, mutation_rate, num_generations, initial_resource, resource_type):
-        hawk_fractions = []
-        dove_fractions = []
-        mixed_fractions = []
-        resources = []  # 记录每一代剩余资源
-
+        # 各策略的实时计数，由 set_strategy 增量更新
+        self.strategy_counts = {strategy: strategies.count(strategy) for strategy in ('Hawk', 'Dove', 'Mixed')}
+
+    def set_strategy(self, i, strategy):
+        # 修改策略时同步更新计数，读取比例时无需遍历整个群体
+        self.strategy_counts[self.individuals[i].strategy] -= 1
+        self.strategy_counts[strategy] += 1
+        self.individuals[i].strategy = strategy
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations, initial_resource, resource_type, profiler=None):
+        """
+        evolve 的生成器版本：每完成一代产出一条 GenerationRecord（该代开始时的策略计数、资源量
+        以及该代的平均收益），不保存历史，内存占用与代数无关。资源量按 resource_type 记在
+        renewable 或 non_renewable 中，另一项为 nan。
+        num_generations 为 None 时一直运行，由调用者决定何时停止。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
         current_resource = initial_resource
-
-        for gen in range(num_generations):
-            hawk_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Hawk') / len(self.individuals))
-            dove_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Dove') / len(self.individuals))
-            mixed_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Mixed') / len(self.individuals))
-            resources.append(current_resource)
+        timed = profiler is not None  # 传入 Profiler.PhaseProfiler 时按阶段计时
+        generations = itertools.count() if num_generations is None else range(num_generations)
+
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = (self.strategy_counts['Hawk'], self.strategy_counts['Dove'], self.strategy_counts['Mixed'])
+            start_resource = current_resource
+            payoff_sum = 0
+            if timed:
+                profiler.lap('fraction_counting')
 
             # 每一代中，个体与随机选择的对手进行交互
             for i in range(len(self.individuals)):
-                opponent = np.random.choice(self.individuals)
+                opponent = self.individuals[random_buffer.integers(len(self.individuals))]
+                if timed:
+                    profiler.lap('opponent_sampling')
                 payoff_self, payoff_opponent = self.individuals[i].play(opponent, V, C, current_resource)
+                if timed:
+                    profiler.lap('play_mixed' if 'Mixed' in (self.individuals[i].strategy, opponent.strategy) else 'play')
                 
                 # 更新资源数量
                 current_resource -= (payoff_self + payoff_opponent)
+                payoff_sum += payoff_self
+                if timed:
+                    profiler.lap('resource_bookkeeping')
                 
                 # 突变机制
-                if np.random.rand() < mutation_rate:
-                    self.individuals[i].strategy = np.random.choice(['Hawk', 'Dove', 'Mixed'])
+                if random_buffer.uniform() < mutation_rate:
+                    self.set_strategy(i, random_buffer.choice(['Hawk', 'Dove', 'Mixed']))
+                if timed:
+                    profiler.lap('mutation')
 
             # 资源更新机制
             if resource_type == 'renewable':
@@ -66,6 +96,27 @@ class Population:
             elif resource_type == 'non-renewable':
                 if current_resource < 0:
                     current_resource = 0  # 不可再生资源一旦耗尽则无法恢复
+            if timed:
+                profiler.lap('resource_bookkeeping')
+                profiler.end_generation()
+
+            stocks = (start_resource, np.nan) if resource_type == 'renewable' else (np.nan, start_resource)
+            yield GenerationRecord(gen, *counts, *stocks, payoff_sum / len(self.individuals))
+
+    def evolve(self, V, C, mutation_rate, num_generations, initial_resource, resource_type, plot=True, profiler=None):
+        hawk_fractions = []
+        dove_fractions = []
+        mixed_fractions = []
+        resources = []  # 记录每一代剩余资源
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, initial_resource, resource_type, profiler):
+            hawk_fractions.append(record.hawk / len(self.individuals))
+            dove_fractions.append(record.dove / len(self.individuals))
+            mixed_fractions.append(record.mixed / len(self.individuals))
+            resources.append(record.renewable if resource_type == 'renewable' else record.non_renewable)
+
+        if not plot:
+            return hawk_fractions, dove_fractions, mixed_fractions, resources
 
         # 绘制结果
         fig, axs = plt.subplots(2, 1, figsize=(10, 8))
@@ -84,6 +135,8 @@ class Population:
         plt.tight_layout()
         plt.show()
 
+        return hawk_fractions, dove_fractions, mixed_fractions, resources
+
 def main():
     # 获取用户输入
     V = float(input("请输入资源的价值 V: "))
@@ -1,5 +1,9 @@
+import itertools
 import numpy as np
 import matplotlib.pyplot as plt
+from Random_Buffer import global_buffer as random_buffer
+from Resource_Depletion import remaining_stocks
+from Vectorized_Hawk_Dove_Game import GenerationRecord
 
 class Individual:
     def __init__(self, strategy):
@@ -10,11 +14,11 @@ class Individual:
             return 0, 0  # 没有资源时，双方收益为0
 
         if self.strategy == 'Mixed':
-            self_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return Individual(self_choice).play(opponent, V, C, available_resource)
+            self_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return PURE_STRATEGIES[self_choice].play(opponent, V, C, available_resource)
         elif opponent.strategy == 'Mixed':
-            opponent_choice = np.random.choice(['Hawk', 'Dove'], p=[0.5, 0.5])
-            return self.play(Individual(opponent_choice), V, C, available_resource)
+            opponent_choice = random_buffer.choice(['Hawk', 'Dove'])
+            return self.play(PURE_STRATEGIES[opponent_choice], V, C, available_resource)
 
         if self.strategy == 'Hawk' and opponent.strategy == 'Hawk':
             return (V - C) / 2, (V - C) / 2
@@ -27,54 +31,96 @@ class Individual:
         else:
             return 0, 0
 
+# 混合策略落实为鹰或鸽后使用的纯策略个体，避免每次交互都新建对象
+PURE_STRATEGIES = {'Hawk': Individual('Hawk'), 'Dove': Individual('Dove')}
+
 class Population:
     def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction):
         strategies = (['Hawk'] * int(size * initial_hawk_fraction) +
                       ['Dove'] * int(size * initial_dove_fraction) +
                       ['Mixed'] * int(size * initial_mixed_fraction))
         self.individuals = [Individual(strategy) for strategy in strategies]
-
-    def evolve(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent):
-        hawk_fractions = []
-        dove_fractions = []
-        mixed_fractions = []
+        # 各策略的实时计数，由 set_strategy 增量更新
+        self.strategy_counts = {strategy: strategies.count(strategy) for strategy in ('Hawk', 'Dove', 'Mixed')}
+
+    def set_strategy(self, i, strategy):
+        # 修改策略时同步更新计数，读取比例时无需遍历整个群体
+        self.strategy_counts[self.individuals[i].strategy] -= 1
+        self.strategy_counts[strategy] += 1
+        self.individuals[i].strategy = strategy
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent, profiler=None):
+        """
+        evolve 的生成器版本：每完成一代产出一条 GenerationRecord（该代开始时的策略计数、
+        两种资源存量以及该代的平均收益），不保存历史，内存占用与代数无关。
+        num_generations 为 None 时一直运行，由调用者决定何时停止。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        timed = profiler is not None
         renewable_resources = initial_resource * renewable_resource_percent
         non_renewable_resources = initial_resource * non_renewable_resource_percent
+        generations = itertools.count() if num_generations is None else range(num_generations)
 
-        for gen in range(num_generations):
-            hawk_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Hawk') / len(self.individuals))
-            dove_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Dove') / len(self.individuals))
-            mixed_fractions.append(sum(1 for ind in self.individuals if ind.strategy == 'Mixed') / len(self.individuals))
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = (self.strategy_counts['Hawk'], self.strategy_counts['Dove'], self.strategy_counts['Mixed'])
+            start_renewable, start_non_renewable = renewable_resources, non_renewable_resources
 
             total_resources = renewable_resources + non_renewable_resources
             if total_resources <= 0:
                 total_resources = 0
 
-            resources = []  # 记录每一代剩余资源
+            total_payoffs = []  # 按顺序记录每次交互的总收益
+            payoff_sum = 0
 
             # 每一代中，个体与随机选择的对手进行交互
             for i in range(len(self.individuals)):
-                opponent = np.random.choice(self.individuals)
+                opponent = self.individuals[random_buffer.integers(len(self.individuals))]
+                if timed:
+                    profiler.lap('opponent_sampling')
                 payoff_self, payoff_opponent = self.individuals[i].play(opponent, V, C, total_resources)
+                if timed:
+                    profiler.lap('play_mixed' if 'Mixed' in (self.individuals[i].strategy, opponent.strategy) else 'play')
 
-                # 更新资源数量
-                total_payoff = payoff_self + payoff_opponent
-                if total_payoff > 0:
-                    if non_renewable_resources >= total_payoff:
-                        non_renewable_resources -= total_payoff
-                    else:
-                        total_payoff -= non_renewable_resources
-                        non_renewable_resources = 0
-                        renewable_resources -= total_payoff
-
-                resources.append(total_resources)
+                total_payoffs.append(payoff_self + payoff_opponent)
+                payoff_sum += payoff_self
+                if timed:
+                    profiler.lap('resource_bookkeeping')
 
                 # 突变机制
-                if np.random.rand() < mutation_rate:
-                    self.individuals[i].strategy = np.random.choice(['Hawk', 'Dove', 'Mixed'])
+                if random_buffer.uniform() < mutation_rate:
+                    self.set_strategy(i, random_buffer.choice(['Hawk', 'Dove', 'Mixed']))
+                if timed:
+                    profiler.lap('mutation')
+
+            # 更新资源数量：先消耗不可再生资源，再消耗可再生资源
+            non_renewable_resources, renewable_resources = remaining_stocks(
+                total_payoffs, non_renewable_resources, renewable_resources)
 
             # 更新可再生资源
             renewable_resources = min(renewable_resources + initial_resource * renewable_resource_percent * 0.1, initial_resource * renewable_resource_percent)
+            if timed:
+                profiler.lap('resource_bookkeeping')
+                profiler.end_generation()
+
+            yield GenerationRecord(gen, *counts, start_renewable, start_non_renewable,
+                                   payoff_sum / len(self.individuals))
+
+    def evolve(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent, plot=True, profiler=None):
+        hawk_fractions = []
+        dove_fractions = []
+        mixed_fractions = []
+        resource_history = []  # 记录每一代开始时的总资源
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent, non_renewable_resource_percent, profiler=profiler):
+            hawk_fractions.append(record.hawk / len(self.individuals))
+            dove_fractions.append(record.dove / len(self.individuals))
+            mixed_fractions.append(record.mixed / len(self.individuals))
+            resource_history.append(max(record.renewable + record.non_renewable, 0))
+
+        if not plot:
+            return hawk_fractions, dove_fractions, mixed_fractions, resource_history
 
         # 绘制结果
         fig, axs = plt.subplots(2, 1, figsize=(10, 8))
@@ -85,7 +131,7 @@ class Population:
         axs[0].set_ylabel('Strategy Fractions')
         axs[0].legend()
 
-        axs[1].plot(resources, label='Available Resources')
+        axs[1].plot(resource_history, label='Available Resources')
         axs[1].set_xlabel('Generation')
         axs[1].set_ylabel('Resources')
         axs[1].legend()
@@ -93,6 +139,8 @@ class Population:
         plt.tight_layout()
         plt.show()
 
+        return hawk_fractions, dove_fractions, mixed_fractions, resource_history
+
 def main():
     # 获取用户输入
     V = float(input("请输入资源的价值 V: "))
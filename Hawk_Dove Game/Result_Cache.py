@@ -0,0 +1,229 @@
+import hashlib
+import json
+import os
+import threading
+import time
+import zipfile
+
+import numpy as np
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 默认缓存目录，可以用环境变量 HAWK_DOVE_CACHE_DIR 覆盖
+DEFAULT_DIRECTORY = os.environ.get('HAWK_DOVE_CACHE_DIR', os.path.join(BASE_DIR, '.result_cache'))
+DEFAULT_MAX_BYTES = 512 * 2**20
+# 写入中断（进程被杀死等）留下的临时文件超过这个时间（秒）后由 evict / clear 删除，
+# 不会误删其他进程正在写入的文件
+STALE_TEMPORARY_SECONDS = 3600
+
+_source_hashes = {}
+
+
+def _canonical(value):
+    # 把参数转换为可以稳定序列化的 JSON 对象（numpy 标量、数组和 SeedSequence 都转换为内置类型）。
+    # 浮点数带类型标记并用 hex 精确保存，不会与字符串 '0.5' 或整数 1 混淆
+    if isinstance(value, dict):
+        return {str(k): _canonical(v) for k, v in sorted(value.items(), key=lambda item: str(item[0]))}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(v) for v in value]
+    if isinstance(value, np.ndarray):
+        return _canonical(value.tolist())
+    if isinstance(value, np.generic):
+        return _canonical(value.item())
+    if isinstance(value, np.random.SeedSequence):
+        return {'entropy': _canonical(value.entropy), 'spawn_key': _canonical(value.spawn_key)}
+    if isinstance(value, float):
+        return {'f': value.hex()}
+    return value
+
+
+def code_version(paths):
+    """
+    源文件内容的 sha256（按给定的顺序拼接），作为缓存键中的代码版本：
+    任何一个文件被修改后，旧的缓存结果都不会再被命中。
+    每个文件的哈希按 (路径, 修改时间, 大小) 缓存，重复调用不会重新读取文件。
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        path = os.path.join(BASE_DIR, path)
+        stat = os.stat(path)
+        signature = (path, stat.st_mtime_ns, stat.st_size)
+        if _source_hashes.get(path, (None,))[0] != signature:
+            with open(path, 'rb') as f:
+                _source_hashes[path] = (signature, hashlib.sha256(f.read()).hexdigest())
+        digest.update(_source_hashes[path][1].encode())
+    return digest.hexdigest()
+
+
+def cache_key(model, params, seed, version):
+    """
+    由模型名称、全部参数、种子和代码版本得到的缓存键（sha256 十六进制串）。
+    """
+    payload = json.dumps({'model': model, 'params': _canonical(params), 'seed': _canonical(seed),
+                          'code_version': version}, sort_keys=True, separators=(',', ':'))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+class ResultCache:
+    """
+    以内容哈希为键的磁盘结果缓存：每个结果是一个 <key>.npz 文件，保存 {序列名: 数组}。
+
+    文件的修改时间即最近一次使用的时间，命中时会被更新；写入后缓存目录的总大小超过
+    max_bytes 时按最近最少使用的顺序删除文件。写入先写临时文件再用 os.replace 替换，
+    多个进程共用同一目录也不会读到写了一半的文件。命中 / 未命中等计数由锁保护，
+    同一个对象可以在多个线程中使用。
+
+    参数:
+    directory - 缓存目录，默认为 DEFAULT_DIRECTORY
+    max_bytes - 缓存目录的最大总字节数
+    """
+
+    def __init__(self, directory=None, max_bytes=DEFAULT_MAX_BYTES):
+        self.directory = directory or DEFAULT_DIRECTORY
+        self.max_bytes = max_bytes
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self.reset_stats()
+
+    def reset_stats(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+            self.stores = 0
+            self.evictions = 0
+
+    def _count(self, counter):
+        with self._lock:
+            setattr(self, counter, getattr(self, counter) + 1)
+
+    def path(self, key):
+        return os.path.join(self.directory, f"{key}.npz")
+
+    def get(self, key):
+        """
+        返回缓存的 {序列名: 数组}，未命中时返回 None。
+        """
+        path = self.path(key)
+        try:
+            with np.load(path) as data:
+                series = {name: data[name] for name in data.files if not name.startswith('__')}
+            os.utime(path)
+        except OSError:
+            # 文件不存在或已被其他进程淘汰，按未命中处理
+            self._count('misses')
+            return None
+        except (EOFError, ValueError, zipfile.BadZipFile):
+            # 文件已损坏（空文件、写入被截断等）：删除后按未命中处理，之后会重新计算并保存
+            self._remove(path)
+            self._count('misses')
+            return None
+        self._count('hits')
+        return series
+
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+
+    def put(self, key, series, metadata=None):
+        """
+        保存一个结果，metadata（模型、参数等）以 JSON 形式一起保存，便于之后查看。
+        """
+        arrays = {name: np.asarray(values) for name, values in series.items()}
+        arrays['__metadata__'] = np.array(json.dumps(_canonical(metadata or {})))
+        path = self.path(key)
+        # 临时文件名包含进程号和线程号，同一个键的并发写入互不干扰
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        try:
+            with open(temporary, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(temporary, path)
+        finally:
+            # 写入失败（磁盘已满、被中断等）时不留下临时文件；替换成功后文件已不存在
+            self._remove(temporary)
+        self._count('stores')
+        self.evict()
+
+    def get_or_compute(self, model, params, seed, version, compute):
+        """
+        按 (model, params, seed, version) 查找结果，未命中时调用 compute() 计算并保存。
+        seed 为 None 的运行结果不可重复，既不查找也不保存。
+
+        返回:
+        (series, hit)
+        """
+        if seed is None:
+            return compute(), False
+        key = cache_key(model, params, seed, version)
+        series = self.get(key)
+        if series is not None:
+            return series, True
+        series = compute()
+        self.put(key, series, {'model': model, 'params': params, 'seed': seed, 'created': time.time()})
+        return series, False
+
+    def entries(self):
+        # 缓存中的文件 (最近使用时间, 字节数, 路径)，按最近使用时间从旧到新排列
+        entries = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.npz'):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                entries.append((stat.st_mtime_ns, stat.st_size, entry.path))
+        return sorted(entries)
+
+    def _remove_stale_temporaries(self):
+        # 删除超过 STALE_TEMPORARY_SECONDS 未修改的临时文件（写入中断时留下的）
+        cutoff = time.time() - STALE_TEMPORARY_SECONDS
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.tmp'):
+                try:
+                    if entry.stat().st_mtime < cutoff:
+                        os.remove(entry.path)
+                except OSError:
+                    pass
+
+    def evict(self):
+        self._remove_stale_temporaries()
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in entries:
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+                self._count('evictions')
+            except OSError:
+                pass
+            total -= size
+
+    def clear(self):
+        self._remove_stale_temporaries()
+        for _, _, path in self.entries():
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+
+    def stats(self):
+        """
+        命中 / 未命中次数（本对象的）、命中率，以及缓存目录当前的文件数和总字节数。
+        """
+        entries = self.entries()
+        with self._lock:
+            hits, misses, stores, evictions = self.hits, self.misses, self.stores, self.evictions
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'stores': stores,
+            'evictions': evictions,
+            'entries': len(entries),
+            'bytes': sum(size for _, size, _ in entries),
+            'max_bytes': self.max_bytes,
+        }
@@ -0,0 +1,345 @@
+import itertools
+import weakref
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from Resource_Depletion import remaining_stocks
+from Vectorized_Hawk_Dove_Game import HAWK, DOVE, MIXED, STRATEGIES, GenerationRecord, payoff_table
+
+# 随机数流和任务划分的基本单位（个体数）。每个块有自己的 Philox 流，
+# 块的划分与工作进程数无关，所以结果只取决于种子
+BLOCK_SIZE = 1 << 20
+
+# 工作进程中附加到共享内存的两个策略缓冲区，由 _attach 设置
+_worker_state = {}
+
+
+def block_rng(key, generation, block):
+    """
+    第 generation 代第 block 块的随机数生成器。
+
+    Philox 是基于计数器的生成器：输出只取决于 (key, counter)。把 128 位计数器的高两个字
+    设为 (block, generation)，相当于从同一个流跳跃到第 (generation * 2^64 + block) * 2^128 个位置，
+    各块互不重叠，也不需要按顺序生成前面的块。
+    """
+    return np.random.Generator(np.random.Philox(key=key, counter=[0, 0, block, generation]))
+
+
+def _attach(names, size):
+    # 工作进程的初始化函数：按名称附加到共享内存，策略数组是其上的零拷贝视图
+    segments = [shared_memory.SharedMemory(name=name) for name in names]
+    _worker_state['segments'] = segments
+    _worker_state['buffers'] = [np.ndarray(size, dtype=np.int8, buffer=segment.buf) for segment in segments]
+
+
+def _release_segments(segments):
+    # 关闭并删除共享内存段。由 close 调用，或在对象被回收 / 解释器退出时由 weakref.finalize 调用
+    for segment in segments:
+        try:
+            segment.close()
+        except BufferError:
+            # 仍有 numpy 视图引用这块内存时无法关闭；名称照样删除，内存在视图释放后回收
+            pass
+        try:
+            segment.unlink()
+        except FileNotFoundError:
+            pass
+
+
+def update_block(current, following, start, stop, rng, table, mutation_rate):
+    """
+    一个块内所有个体的一代：与整个群体中随机选出的对手交互（读取 current，即该代开始时的策略），
+    然后突变，结果写入 following 的同一位置。
+
+    返回:
+    (counts, payoff_sum, demand) - 该块新策略的计数、块内个体的收益之和、
+    以及双方收益之和中正值的总和（资源消耗）
+    """
+    size = current.size
+    n = stop - start
+    own = current[start:stop]
+    opponents = current[rng.integers(0, size, size=n, dtype=np.int64 if size > 2**31 - 1 else np.int32)]
+
+    # 混合策略以 0.5 的概率选择鹰或鸽，自己和对手各需要一个随机比特
+    coins = np.unpackbits(rng.integers(0, 256, size=(2 * n + 7) // 8, dtype=np.uint8))[:2 * n].view(np.int8)
+    action_self = np.where(own == MIXED, coins[:n], own)
+    action_opponent = np.where(opponents == MIXED, coins[n:], opponents)
+    # 收益只有四种取值，统计 (自己的行动, 对手的行动) 组合的次数即可得到收益之和与资源消耗，
+    # 不需要生成逐个体的浮点收益数组
+    pairs = np.bincount(2 * action_self + action_opponent, minlength=4)
+    total_payoff = table + table.reshape(2, 2).T.ravel()
+
+    # 突变个数服从二项分布，再随机选出个体（极少数个体可能被选中两次，只按最后一次生效）
+    block = following[start:stop]
+    block[:] = own
+    count = rng.binomial(n, mutation_rate)
+    block[rng.integers(0, n, size=count)] = rng.integers(0, len(STRATEGIES), size=count, dtype=np.int8)
+
+    return (np.bincount(block, minlength=len(STRATEGIES)), float(pairs @ table),
+            float(pairs @ np.maximum(total_payoff, 0)))
+
+
+def run_blocks(task):
+    """
+    工作进程执行的任务：按顺序处理一段连续的块，返回每个块的结果（由主进程按块的顺序汇总）。
+    """
+    key, generation, blocks, block_size, read_index, V, C, mutation_rate = task
+    current = _worker_state['buffers'][read_index]
+    following = _worker_state['buffers'][1 - read_index]
+    table = payoff_table(V, C).ravel()
+    results = []
+    for block in blocks:
+        start = block * block_size
+        stop = min(start + block_size, current.size)
+        results.append(update_block(current, following, start, stop, block_rng(key, generation, block),
+                                    table, mutation_rate))
+    return results
+
+
+class ShardedPopulation:
+    """
+    把一个很大的群体（10^8 个体）分片到多个工作进程上演化，模型与 VectorizedPopulation 相同：
+    一代内所有个体同步与随机对手交互，然后突变。
+
+    策略保存在两块 multiprocessing.shared_memory 中（int8，交替作为本代和下一代），
+    工作进程通过零拷贝视图读取整个本代数组（对手可以来自任何分片），只写自己负责的块。
+    每一代结束时主进程汇总各块的策略计数和资源消耗，这是唯一的同步点。
+
+    每个块的随机数来自以 (seed, generation, block) 定位的 Philox 流，各块结果按块的顺序汇总，
+    因此结果与工作进程数无关，workers=1 时在主进程中直接计算。
+
+    共享内存在 close（或 with 语句结束）时删除；忘记关闭时在对象被回收或解释器退出时删除。
+
+    参数:
+    size - 群体规模
+    initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction - 初始各策略比例
+    seed - 随机种子（整数），默认随机选择
+    workers - 工作进程数
+    block_size - 每个随机数流负责的个体数
+    """
+
+    def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction, seed=None,
+                 workers=None, block_size=BLOCK_SIZE):
+        if size <= 0:
+            raise ValueError(f"群体规模必须为正，得到 {size}")
+        if block_size <= 0:
+            raise ValueError(f"block_size 必须为正，得到 {block_size}")
+        self.size = size
+        self.workers = workers or 1
+        self.block_size = block_size
+        self.num_blocks = -(-size // block_size)
+        self.key = np.random.SeedSequence(seed).generate_state(2, dtype=np.uint64)
+        self.generation = 0
+
+        self._executor = None
+        self._segments = []
+        try:
+            for _ in range(2):
+                self._segments.append(shared_memory.SharedMemory(create=True, size=size))
+        except BaseException:
+            # 第二块创建失败（/dev/shm 空间不足等）时删除已经创建的那一块
+            _release_segments(self._segments)
+            raise
+        self._finalizer = weakref.finalize(self, _release_segments, self._segments)
+
+        try:
+            self._buffers = [np.ndarray(size, dtype=np.int8, buffer=segment.buf) for segment in self._segments]
+            self._read_index = 0
+
+            counts = [int(size * initial_hawk_fraction),
+                      int(size * initial_dove_fraction),
+                      int(size * initial_mixed_fraction)]
+            # 对手在整个群体中随机选择，初始策略按顺序排列即可；不足 size 的部分补为鸽
+            counts[DOVE] += size - sum(counts)
+            bounds = np.cumsum([0] + counts)
+            for strategy, start, stop in zip(STRATEGIES, bounds[:-1], bounds[1:]):
+                self.strategies[start:stop] = strategy
+            self.strategy_counts = np.array(counts, dtype=np.int64)
+        except BaseException:
+            self.close()
+            raise
+
+    @property
+    def strategies(self):
+        # 本代策略（共享内存上的零拷贝视图）
+        return self._buffers[self._read_index]
+
+    def __len__(self):
+        return self.size
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+        # 先释放 numpy 视图，共享内存才能关闭；finalizer 只会执行一次
+        self._buffers = []
+        self._finalizer()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def fractions(self):
+        return self.strategy_counts / self.size
+
+    def _tasks(self, V, C, mutation_rate):
+        # 每个工作进程一段连续的块
+        shards = np.array_split(np.arange(self.num_blocks), min(self.workers, self.num_blocks))
+        return [(self.key, self.generation, shard.tolist(), self.block_size, self._read_index, V, C, mutation_rate)
+                for shard in shards]
+
+    def step(self, V, C, mutation_rate):
+        """
+        推进一代，返回 (payoff_sum, demand)：所有个体的收益之和，以及本代交互的资源消耗。
+        """
+        tasks = self._tasks(V, C, mutation_rate)
+        if self.workers == 1:
+            _worker_state['buffers'] = self._buffers
+            try:
+                shard_results = [run_blocks(task) for task in tasks]
+            finally:
+                _worker_state.pop('buffers', None)
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, initializer=_attach,
+                                                     initargs=([segment.name for segment in self._segments],
+                                                               self.size))
+            shard_results = list(self._executor.map(run_blocks, tasks))
+
+        # 代与代之间的同步：按块的顺序汇总，浮点求和的顺序也与工作进程数无关
+        results = [result for shard in shard_results for result in shard]
+        self.strategy_counts = np.sum([counts for counts, _, _ in results], axis=0, dtype=np.int64)
+        payoff_sum = sum(payoff for _, payoff, _ in results)
+        demand = sum(block_demand for _, _, block_demand in results)
+        self._read_index = 1 - self._read_index
+        self.generation += 1
+        return payoff_sum, demand
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations=None, profiler=None):
+        """
+        每完成一代产出一条 GenerationRecord（该代开始时的策略计数和平均收益），不保存历史。
+        num_generations 为 None 时一直运行，由调用者决定何时停止。
+        """
+        timed = profiler is not None
+        generations = itertools.count() if num_generations is None else range(num_generations)
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = self.strategy_counts.tolist()
+            payoff_sum, _ = self.step(V, C, mutation_rate)
+            if timed:
+                profiler.lap('play')
+                profiler.end_generation()
+            yield GenerationRecord(gen, *counts, np.nan, np.nan, payoff_sum / self.size)
+
+    def evolve(self, V, C, mutation_rate, num_generations, profiler=None):
+        """
+        运行多代演化，返回每一代结束时各策略的比例（iter_evolve 的记录是每代开始时的计数，
+        这里在产出每条记录时读取 fractions()，因此第 g 行等于第 g + 1 条记录的比例）。
+
+        参数:
+        V - 资源的价值
+        C - 打斗的代价
+        mutation_rate - 突变率
+        num_generations - 演化的代数
+        profiler - 可选的 Profiler.PhaseProfiler，按阶段记录每代的耗时
+        """
+        history = np.empty((num_generations, len(STRATEGIES)))
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, profiler):
+            history[record.generation] = self.fractions()
+
+        return history[:, HAWK], history[:, DOVE], history[:, MIXED]
+
+    def iter_evolve_resources(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent,
+                              non_renewable_resource_percent, renewable_recovery_amount, profiler=None):
+        """
+        带可再生/不可再生资源的演化（与 VectorizedPopulation.iter_evolve_resources 的模型相同），
+        每完成一代产出一条 GenerationRecord。工作进程只需上报各块的资源消耗之和。
+        """
+        timed = profiler is not None
+        renewable_capacity = initial_resource * renewable_resource_percent
+        renewable_resources = renewable_capacity
+        non_renewable_resources = initial_resource * non_renewable_resource_percent
+        generations = itertools.count() if num_generations is None else range(num_generations)
+
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = self.strategy_counts.tolist()
+            start_renewable, start_non_renewable = renewable_resources, non_renewable_resources
+            total_resources = max(renewable_resources + non_renewable_resources, 0)
+
+            payoff_sum, demand = self.step(V, C, mutation_rate)
+            if timed:
+                profiler.lap('play')
+            # 没有资源时所有交互的收益都为 0，资源也不再被消耗
+            if total_resources > 0:
+                non_renewable_resources, renewable_resources = remaining_stocks(
+                    [demand], non_renewable_resources, renewable_resources)
+                mean_payoff = payoff_sum / self.size
+            else:
+                mean_payoff = 0.0
+
+            # 更新可再生资源
+            renewable_resources = min(renewable_resources + renewable_recovery_amount, renewable_capacity)
+            if timed:
+                profiler.lap('resource_bookkeeping')
+                profiler.end_generation()
+
+            yield GenerationRecord(gen, *counts, start_renewable, start_non_renewable, mean_payoff)
+
+    def evolve_resources(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent,
+                         non_renewable_resource_percent, renewable_recovery_amount, profiler=None):
+        """
+        带可再生/不可再生资源的演化，返回每一代开始时各策略的比例和总资源。
+        参数含义见 VectorizedPopulation.evolve_resources。
+        """
+        history = np.empty((num_generations, len(STRATEGIES)))
+        resources = np.empty(num_generations)
+
+        for record in self.iter_evolve_resources(V, C, mutation_rate, num_generations, initial_resource,
+                                                 renewable_resource_percent, non_renewable_resource_percent,
+                                                 renewable_recovery_amount, profiler):
+            history[record.generation] = (record.hawk, record.dove, record.mixed)
+            resources[record.generation] = max(record.renewable + record.non_renewable, 0)
+
+        history /= self.size
+        return history[:, HAWK], history[:, DOVE], history[:, MIXED], resources
+
+
+def main():
+    # 获取用户输入
+    V = float(input("请输入资源的价值 V: "))
+    C = float(input("请输入打斗的代价 C: "))
+    population_size = int(input("请输入群体规模: "))
+    initial_hawk_fraction = float(input("请输入初始鹰的比例 (0-1): "))
+    initial_dove_fraction = float(input("请输入初始鸽的比例 (0-1): "))
+    initial_mixed_fraction = float(input("请输入初始混合策略的比例 (0-1): "))
+    num_generations = int(input("请输入模拟的代数: "))
+    mutation_rate = float(input("请输入突变率 (0-1): "))
+    workers = int(input("请输入工作进程数: ") or 1)
+    seed = int(input("请输入随机种子: ") or 0)
+
+    # 初始化群体并运行模拟
+    with ShardedPopulation(population_size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction,
+                           seed, workers) as population:
+        hawk_fractions, dove_fractions, mixed_fractions = population.evolve(V, C, mutation_rate, num_generations)
+
+    # 绘制结果
+    plt.plot(hawk_fractions, label='Hawk Fraction')
+    plt.plot(dove_fractions, label='Dove Fraction')
+    plt.plot(mixed_fractions, label='Mixed Fraction')
+    plt.xlabel('Generation')
+    plt.ylabel('Strategy Fractions')
+    plt.title('Evolution of Hawk, Dove, and Mixed Strategies (Sharded)')
+    plt.legend()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,241 @@
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from Vectorized_Hawk_Dove_Game import HAWK, DOVE, MIXED, STRATEGIES, GenerationRecord
+
+# 邻域内各邻居相对于中心格点的偏移 (dy, dx)
+NEIGHBORHOODS = {
+    'von_neumann': [(-1, 0), (1, 0), (0, -1), (0, 1)],
+    'moore': [(-1, -1), (-1, 0), (-1, 1), (0, -1), (0, 1), (1, -1), (1, 0), (1, 1)],
+}
+
+
+def _wrap_columns(grid):
+    # 左右各补一列（周期边界），之后所有的邻居都是切片视图，不需要 np.roll 复制整个网格
+    return np.concatenate([grid[:, -1:], grid, grid[:, :1]], axis=1)
+
+
+def _neighbor(padded, dy, dx):
+    # padded 上下左右各有一格的光环，返回偏移 (dy, dx) 处邻居组成的视图
+    rows, columns = padded.shape
+    return padded[1 + dy:rows - 1 + dy, 1 + dx:columns - 1 + dx]
+
+
+def update_band(strategies, actions, V, C, offsets):
+    """
+    计算一个行带中所有格点的收益并按“模仿最优”规则更新策略。
+
+    每个格点与邻域内的每个邻居各交互一次；随后采用邻域（包括自己）中本代总收益
+    最高的格点的策略，收益相同时保留自己的策略，其次按 offsets 的顺序。
+
+    参数:
+    strategies - 行带的策略，上下各带两行光环（周期边界已经展开）
+    actions - 与 strategies 形状相同的本代行动（HAWK 或 DOVE）
+    V - 资源的价值
+    C - 打斗的代价
+    offsets - 邻域偏移列表，见 NEIGHBORHOODS
+
+    返回:
+    (new_strategies, payoff_sum) - 去掉光环后的新策略，以及行带内格点的收益之和
+    """
+    # 每个格点邻居中的鹰的数量（行带加上下各一行，供后面的模仿步骤使用）
+    hawks = _wrap_columns((actions == HAWK).view(np.int8))
+    hawk_neighbors = np.zeros((actions.shape[0] - 2, actions.shape[1]), dtype=np.int8)
+    for dy, dx in offsets:
+        hawk_neighbors += _neighbor(hawks, dy, dx)
+
+    # 总收益只取决于自己的行动和邻居中鹰的数量，共 2 * (k + 1) 种取值：
+    # 鹰遇鹰得 (V - C) / 2，遇鸽得 V；鸽遇鹰得 0，遇鸽得 V / 2
+    k = len(offsets)
+    hawk_counts = np.arange(k + 1)
+    values = np.array([hawk_counts * ((V - C) / 2) + (k - hawk_counts) * V,
+                       (k - hawk_counts) * (V / 2)])
+
+    # 行带内（去掉光环）的收益之和只需要鹰的个数和两类个体的鹰邻居总数
+    interior_hawks = hawks[2:-2, 1:-1]
+    interior_neighbors = hawk_neighbors[1:-1]
+    hawk_cells = int(np.count_nonzero(interior_hawks))
+    hawk_hawk = int((interior_neighbors * interior_hawks).sum(dtype=np.int64))
+    all_hawk = int(interior_neighbors.sum(dtype=np.int64))
+    dove_cells = interior_hawks.size - hawk_cells
+    payoff_sum = (hawk_hawk * ((V - C) / 2) + (k * hawk_cells - hawk_hawk) * V +
+                  (k * dove_cells - (all_hawk - hawk_hawk)) * (V / 2))
+
+    # 模仿最优：把收益的名次（收益相同则名次相同）、位置优先级和策略编码进一个 int16 键，
+    # 邻域内取最大的键即可，不需要逐个邻居做带掩码的复制。
+    # 优先级：自己最高，其次按 offsets 的顺序；策略占键的最低两位
+    ranks = np.unique(values, return_inverse=True)[1].reshape(values.shape)
+    codes = actions[1:-1] * (k + 1) + hawk_neighbors
+    keys = ranks.ravel().astype(np.int16).take(codes) * (4 * (k + 1)) + strategies[1:-1]
+    padded_keys = _wrap_columns(keys)
+    best_keys = _neighbor(padded_keys, 0, 0) + np.int16(4 * k)
+    for priority, (dy, dx) in zip(range(k - 1, -1, -1), offsets):
+        np.maximum(best_keys, _neighbor(padded_keys, dy, dx) + np.int16(4 * priority), out=best_keys)
+
+    return (best_keys & 3).astype(np.int8), payoff_sum
+
+
+def _update_band_task(task):
+    return update_band(*task)
+
+
+class LatticePopulation:
+    """
+    二维周期格点上的鹰鸽博弈：每个格点只与邻域（von Neumann 4 邻居或 Moore 8 邻居）内的
+    个体交互，收益与模仿都通过整网格的数组切片完成。
+
+    每一代：混合策略的格点以 0.5 的概率选择鹰或鸽（一代内对所有邻居使用同一行动），
+    所有格点同步与邻居交互并模仿邻域中收益最高的策略，然后按突变率突变。
+
+    workers > 1 时网格按行切成若干带，连同上下两行光环交给工作进程并行更新。
+    随机数只在主进程中生成，因此结果与工作进程数无关。
+    """
+
+    def __init__(self, height, width, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction,
+                 neighborhood='moore', rng=None, workers=None):
+        self.rng = rng if rng is not None else np.random.default_rng()
+        fractions = np.array([initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction], dtype=float)
+        self.strategies = self.rng.choice(np.array(STRATEGIES, dtype=np.int8), size=(height, width),
+                                          p=fractions / fractions.sum())
+        self.offsets = NEIGHBORHOODS[neighborhood]
+        self.workers = workers
+        self._executor = None
+
+    def __len__(self):
+        return self.strategies.size
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def strategy_counts(self):
+        return [int(np.count_nonzero(self.strategies == strategy)) for strategy in STRATEGIES]
+
+    def fractions(self):
+        return np.array(self.strategy_counts()) / self.strategies.size
+
+    def resolve_actions(self):
+        # 每个格点一个随机比特（打包生成再展开，比逐个生成整数快得多）
+        bits = np.unpackbits(self.rng.integers(0, 256, size=(self.strategies.size + 7) // 8, dtype=np.uint8))
+        coins = bits[:self.strategies.size].reshape(self.strategies.shape).view(np.int8)
+        return np.where(self.strategies == MIXED, coins, self.strategies)
+
+    def mutate(self, mutation_rate):
+        # 突变个数服从二项分布，再随机选出位置（极少数位置可能被选中两次，只按最后一次生效）
+        count = self.rng.binomial(self.strategies.size, mutation_rate)
+        positions = self.rng.integers(0, self.strategies.size, size=count)
+        self.strategies.ravel()[positions] = self.rng.integers(0, len(STRATEGIES), size=count, dtype=np.int8)
+
+    def play(self, V, C):
+        """
+        一代的交互和模仿，更新 self.strategies，返回每次交互的平均收益。
+        """
+        actions = self.resolve_actions()
+        height = self.strategies.shape[0]
+        bands = np.array_split(np.arange(height), min(self.workers or 1, height))
+        tasks = []
+        for rows in bands:
+            # 行带上下各两行光环：模仿需要邻居的收益，而邻居的收益又需要邻居的邻居
+            halo = np.arange(rows[0] - 2, rows[-1] + 3)
+            tasks.append((self.strategies.take(halo, axis=0, mode='wrap'),
+                          actions.take(halo, axis=0, mode='wrap'), V, C, self.offsets))
+
+        if len(tasks) == 1:
+            results = [update_band(*tasks[0])]
+        else:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self.workers)
+            results = list(self._executor.map(_update_band_task, tasks))
+
+        self.strategies = np.concatenate([band for band, _ in results])
+        payoff_sum = sum(total for _, total in results)
+        return payoff_sum / (self.strategies.size * len(self.offsets))
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations=None, profiler=None):
+        """
+        每完成一代产出一条 GenerationRecord（该代开始时的策略计数和该代每次交互的平均收益），
+        不保存历史。num_generations 为 None 时一直运行，由调用者决定何时停止。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        timed = profiler is not None
+        generations = itertools.count() if num_generations is None else range(num_generations)
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = self.strategy_counts()
+            if timed:
+                profiler.lap('fraction_counting')
+            mean_payoff = self.play(V, C)
+            if timed:
+                profiler.lap('play')
+            self.mutate(mutation_rate)
+            if timed:
+                profiler.lap('mutation')
+                profiler.end_generation()
+            yield GenerationRecord(gen, *counts, np.nan, np.nan, mean_payoff)
+
+    def evolve(self, V, C, mutation_rate, num_generations, profiler=None):
+        """
+        运行多代演化，返回每一代结束时各策略的比例（iter_evolve 的记录是每代开始时的计数，
+        这里在产出每条记录时读取 fractions()，因此第 g 行等于第 g + 1 条记录的比例）。
+
+        参数:
+        V - 资源的价值
+        C - 打斗的代价
+        mutation_rate - 突变率
+        num_generations - 演化的代数
+        profiler - 可选的 Profiler.PhaseProfiler，按阶段记录每代的耗时
+        """
+        history = np.empty((num_generations, len(STRATEGIES)))
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, profiler):
+            history[record.generation] = self.fractions()
+
+        return history[:, HAWK], history[:, DOVE], history[:, MIXED]
+
+
+def main():
+    # 获取用户输入
+    V = float(input("请输入资源的价值 V: "))
+    C = float(input("请输入打斗的代价 C: "))
+    size = int(input("请输入格点的边长: "))
+    initial_hawk_fraction = float(input("请输入初始鹰的比例 (0-1): "))
+    initial_dove_fraction = float(input("请输入初始鸽的比例 (0-1): "))
+    initial_mixed_fraction = float(input("请输入初始混合策略的比例 (0-1): "))
+    num_generations = int(input("请输入模拟的代数: "))
+    mutation_rate = float(input("请输入突变率 (0-1): "))
+    neighborhood = input("请输入邻域类型 (moore / von_neumann): ").strip() or 'moore'
+    workers = int(input("请输入工作进程数: ") or 1)
+
+    # 初始化格点并运行模拟
+    with LatticePopulation(size, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction,
+                           neighborhood, workers=workers) as population:
+        hawk_fractions, dove_fractions, mixed_fractions = population.evolve(V, C, mutation_rate, num_generations)
+
+    # 绘制结果：策略比例的变化和最终的空间分布
+    fig, axs = plt.subplots(1, 2, figsize=(14, 6))
+    axs[0].plot(hawk_fractions, label='Hawk Fraction')
+    axs[0].plot(dove_fractions, label='Dove Fraction')
+    axs[0].plot(mixed_fractions, label='Mixed Fraction')
+    axs[0].set_xlabel('Generation')
+    axs[0].set_ylabel('Strategy Fractions')
+    axs[0].legend()
+
+    axs[1].imshow(population.strategies, cmap='viridis', vmin=HAWK, vmax=MIXED, interpolation='nearest')
+    axs[1].set_title('Final Strategies (Hawk / Dove / Mixed)')
+
+    plt.tight_layout()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
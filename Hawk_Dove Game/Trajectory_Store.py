@@ -0,0 +1,212 @@
+import json
+import os
+
+import numpy as np
+
+# GenerationRecord 对应的列及其类型
+GENERATION_COLUMNS = {
+    'generation': 'i8',
+    'hawk': 'i8',
+    'dove': 'i8',
+    'mixed': 'i8',
+    'renewable': 'f8',
+    'non_renewable': 'f8',
+    'mean_payoff': 'f8',
+}
+
+
+def replicator_columns(num_params=None):
+    """
+    复制子动态轨迹的列：每代一行，代数只存一次。设置 num_params 时 hawk_fraction 的每一行
+    是各组参数的鹰比例，store['hawk_fraction'] 即为形状 (代数, num_params) 的零拷贝视图；
+    否则每行只有一个鹰比例。
+    """
+    return {'generation': 'i8', 'hawk_fraction': 'f8' if num_params is None else ('f8', num_params)}
+
+
+class TrajectoryStore:
+    """
+    存放在磁盘上的轨迹：每一列是一个预先分配好容量的 .npy 内存映射文件，
+    meta.json 记录各列的类型、宽度、容量和已写入的行数。列可以是每行一个值，
+    也可以是每行固定宽度的一组值（二维数组）。
+
+    逐行 append 的数据先写入固定大小的缓冲块，写满后整块拷贝到内存映射文件中；
+    extend 直接按块写入。读取时各列是内存映射上的零拷贝视图，
+    可以保存远超内存的长历史（例如 10^8 代）。
+
+    用 TrajectoryStore.create 新建，用 TrajectoryStore.open 打开已有的存储。
+    """
+
+    META_FILE = 'meta.json'
+
+    def __init__(self, path, columns, capacity, length, arrays, writable, chunk_size, widths=None):
+        self.path = path
+        self.columns = columns
+        self.widths = widths or {}
+        self.capacity = capacity
+        self._length = length
+        self._arrays = arrays
+        self.writable = writable
+        self.chunk_size = chunk_size
+        # 逐行写入的缓冲块在第一次 append 时才分配，只用 extend 的宽列不占这部分内存
+        self._buffer = None
+        self._buffered = 0
+
+    @classmethod
+    def create(cls, path, columns=None, capacity=1_000_000, chunk_size=65536):
+        """
+        新建存储。
+
+        参数:
+        path - 存储目录
+        columns - {列名: dtype 或 (dtype, 宽度)}，默认为 GENERATION_COLUMNS
+        capacity - 预分配的最大行数
+        chunk_size - 逐行写入时缓冲块的行数
+        """
+        columns = columns or GENERATION_COLUMNS
+        widths = {name: int(spec[1]) for name, spec in columns.items() if isinstance(spec, tuple)}
+        columns = {name: np.dtype(spec[0] if isinstance(spec, tuple) else spec).str for name, spec in columns.items()}
+        os.makedirs(path, exist_ok=True)
+        store = cls(path, columns, capacity, 0, {}, True, chunk_size, widths)
+        store._arrays = {name: np.lib.format.open_memmap(os.path.join(path, f'{name}.npy'), mode='w+',
+                                                         dtype=dtype, shape=store._row_shape(name, capacity))
+                         for name, dtype in columns.items()}
+        store._write_meta()
+        return store
+
+    @classmethod
+    def open(cls, path, mode='r', chunk_size=65536):
+        """
+        打开已有的存储。mode='r' 为只读，mode='r+' 可以继续追加。
+        """
+        with open(os.path.join(path, cls.META_FILE), encoding='utf-8') as f:
+            meta = json.load(f)
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mode) for name in meta['columns']}
+        return cls(path, meta['columns'], meta['capacity'], meta['length'], arrays, mode != 'r', chunk_size,
+                   meta.get('widths'))
+
+    def _row_shape(self, name, rows):
+        # 宽度为 w 的列是形状 (rows, w) 的数组，其余为 (rows,)
+        return (rows, self.widths[name]) if name in self.widths else (rows,)
+
+    def _write_meta(self):
+        meta = {'columns': self.columns, 'widths': self.widths, 'capacity': self.capacity, 'length': self._length}
+        temporary = os.path.join(self.path, self.META_FILE + '.tmp')
+        with open(temporary, 'w', encoding='utf-8') as f:
+            json.dump(meta, f)
+        os.replace(temporary, os.path.join(self.path, self.META_FILE))
+
+    def __len__(self):
+        return self._length + self._buffered
+
+    def __getitem__(self, name):
+        # 已落盘部分的零拷贝视图（未 flush 的缓冲行不包含在内）
+        return self._arrays[name][:self._length]
+
+    def _check_capacity(self, rows):
+        if len(self) + rows > self.capacity:
+            raise ValueError(f"轨迹存储容量不足：容量 {self.capacity} 行，需要 {len(self) + rows} 行")
+
+    def append(self, record):
+        """
+        追加一行；record 可以是字典或具有同名字段的 namedtuple（例如 GenerationRecord）。
+        """
+        if not self.writable:
+            raise ValueError("轨迹存储以只读方式打开")
+        self._check_capacity(1)
+        values = record._asdict() if hasattr(record, '_asdict') else record
+        if self._buffer is None:
+            self._buffer = {name: np.empty(self._row_shape(name, self.chunk_size), dtype=dtype)
+                            for name, dtype in self.columns.items()}
+        for name in self.columns:
+            self._buffer[name][self._buffered] = values[name]
+        self._buffered += 1
+        if self._buffered == self.chunk_size:
+            self.flush()
+
+    def extend(self, chunk):
+        """
+        按块追加：chunk 为 {列名: 等长数组}。
+        """
+        if not self.writable:
+            raise ValueError("轨迹存储以只读方式打开")
+        self.flush()
+        rows = len(next(iter(chunk.values())))
+        self._check_capacity(rows)
+        for name in self.columns:
+            self._arrays[name][self._length:self._length + rows] = chunk[name]
+        self._length += rows
+        self._write_meta()
+
+    def truncate(self, length):
+        """
+        丢弃第 length 行之后的数据（包括未 flush 的缓冲行），之后的写入从第 length 行继续。
+        """
+        if not self.writable:
+            raise ValueError("轨迹存储以只读方式打开")
+        if not 0 <= length <= self._length + self._buffered:
+            raise ValueError(f"无法截断到第 {length} 行：存储中只有 {len(self)} 行")
+        self.flush()
+        self._length = length
+        self._write_meta()
+
+    def flush(self):
+        # 把缓冲块写入内存映射文件，并更新 meta.json 中的行数
+        if not self.writable:
+            return
+        if self._buffered:
+            for name in self.columns:
+                self._arrays[name][self._length:self._length + self._buffered] = self._buffer[name][:self._buffered]
+            self._length += self._buffered
+            self._buffered = 0
+        for array in self._arrays.values():
+            array.flush()
+        self._write_meta()
+
+    def close(self):
+        self.flush()
+        self._arrays = {}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+def record_generations(path, records, capacity, columns=None):
+    """
+    把 iter_evolve 产出的 GenerationRecord 逐条写入新建的存储，返回存储对象（已 flush）。
+
+    参数:
+    path - 存储目录
+    records - GenerationRecord 的可迭代对象
+    capacity - 预分配的最大代数
+    columns - 列定义，默认为 GENERATION_COLUMNS
+    """
+    store = TrajectoryStore.create(path, columns, capacity)
+    for record in records:
+        store.append(record)
+    store.flush()
+    return store
+
+
+def record_replicator(path, chunks, num_generations, num_params=1):
+    """
+    把 Replicator_Dynamics.iter_replicator 产出的块用 extend 写入新建的存储（列为 replicator_columns），
+    返回存储对象（已 flush）。
+
+    参数:
+    path - 存储目录
+    chunks - 形状为 (行数, num_params) 的块的可迭代对象，依次为第 0, 1, ... 代
+    num_generations - 演化的代数，容量为 num_generations + 1 行
+    num_params - 参数组数
+    """
+    store = TrajectoryStore.create(path, replicator_columns(num_params), num_generations + 1)
+    generation = 0
+    for chunk in chunks:
+        rows = chunk.shape[0]
+        store.extend({'generation': np.arange(generation, generation + rows), 'hawk_fraction': chunk})
+        generation += rows
+    store.flush()
+    return store
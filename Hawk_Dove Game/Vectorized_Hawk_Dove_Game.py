@@ -0,0 +1,243 @@
+import itertools
+from collections import namedtuple
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+from Resource_Depletion import remaining_stocks
+
+# 定义策略（与 RL 脚本保持一致的整数编码）
+HAWK = 0
+DOVE = 1
+MIXED = 2
+STRATEGIES = [HAWK, DOVE, MIXED]
+STRATEGY_NAMES = ['Hawk', 'Dove', 'Mixed']
+
+# 流式演化每一代产出的记录：该代开始时的策略计数和资源存量，以及该代的平均收益
+# （没有资源的模型中 renewable / non_renewable 为 nan）
+GenerationRecord = namedtuple('GenerationRecord',
+                              ['generation', 'hawk', 'dove', 'mixed', 'renewable', 'non_renewable', 'mean_payoff'])
+
+
+def payoff_table(V, C):
+    """
+    预先计算鹰鸽博弈的收益表。
+
+    参数:
+    V - 资源的价值
+    C - 打斗的代价
+
+    返回:
+    形状为 (2, 2) 的数组，table[a, b] 为行动 a 的个体遇到行动 b 的对手时的收益
+    """
+    return np.array([[(V - C) / 2, V],
+                     [0, V / 2]], dtype=float)
+
+
+class VectorizedPopulation:
+    """
+    以 int8 数组存储策略的群体，一代中所有的对手选择、混合策略的行动
+    以及突变都通过少量批量的随机数调用完成。
+
+    与逐个体的 Population.evolve 不同，一代内的所有交互都基于该代开始时的策略
+    同步进行，突变在交互结束后统一生效。
+    """
+
+    def __init__(self, size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction, rng=None):
+        counts = [int(size * initial_hawk_fraction),
+                  int(size * initial_dove_fraction),
+                  int(size * initial_mixed_fraction)]
+        self.strategies = np.repeat(np.array(STRATEGIES, dtype=np.int8), counts)
+        # 各策略的实时计数，只在突变时按变化的个体增量更新
+        self.strategy_counts = np.array(counts, dtype=np.int64)
+        self.rng = rng if rng is not None else np.random.default_rng()
+
+    def __len__(self):
+        return self.strategies.size
+
+    def resolve_actions(self, strategies):
+        # 混合策略以 0.5 的概率选择鹰或鸽，其余个体的行动即为其策略
+        coins = self.rng.integers(0, 2, size=strategies.size, dtype=np.int8)
+        return np.where(strategies == MIXED, coins, strategies)
+
+    def play(self, V, C, profiler=None):
+        """
+        让每个个体与一个随机选择的对手进行一次交互。
+
+        参数:
+        V - 资源的价值
+        C - 打斗的代价
+        profiler - 可选的 Profiler.PhaseProfiler，在每个阶段结束处调用其 lap
+
+        返回:
+        (payoff_self, payoff_opponent) 两个长度为群体规模的收益数组
+        """
+        timed = profiler is not None
+        n = self.strategies.size
+        # 展平收益表，用 2 * a + b 直接索引，比二维花式索引更快
+        table = payoff_table(V, C).ravel()
+        opponents = self.rng.integers(0, n, size=n, dtype=np.int64 if n > 2**31 - 1 else np.int32)
+        if timed:
+            profiler.lap('opponent_sampling')
+        action_self = self.resolve_actions(self.strategies)
+        action_opponent = self.resolve_actions(self.strategies[opponents])
+        if timed:
+            profiler.lap('mixed_resolution')
+        payoffs = table[2 * action_self + action_opponent], table[2 * action_opponent + action_self]
+        if timed:
+            profiler.lap('play')
+        return payoffs
+
+    def mutate(self, mutation_rate):
+        # 突变机制：被选中的个体在三种策略中均匀随机选择新策略
+        mutants = np.flatnonzero(self.rng.random(self.strategies.size) < mutation_rate)
+        new_strategies = self.rng.integers(0, len(STRATEGIES), size=mutants.size, dtype=np.int8)
+        self.strategy_counts += (np.bincount(new_strategies, minlength=len(STRATEGIES)) -
+                                 np.bincount(self.strategies[mutants], minlength=len(STRATEGIES)))
+        self.strategies[mutants] = new_strategies
+        return mutants
+
+    def fractions(self):
+        return self.strategy_counts / self.strategies.size
+
+    def iter_evolve(self, V, C, mutation_rate, num_generations=None, profiler=None):
+        """
+        evolve 的生成器版本：每完成一代产出一条 GenerationRecord，不保存历史，
+        内存占用与代数无关。num_generations 为 None 时一直运行，由调用者决定何时停止。
+        记录中的计数是该代开始时的（第 g 条记录等于 evolve 返回的第 g - 1 行）；
+        产出记录时该代已经结束，需要该代结束时的比例可以读取 fractions()。
+        profiler 为 Profiler.PhaseProfiler 时按阶段记录每代的耗时。
+        """
+        timed = profiler is not None
+        generations = itertools.count() if num_generations is None else range(num_generations)
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = self.strategy_counts.tolist()
+            if timed:
+                profiler.lap('fraction_counting')
+            payoff_self, _ = self.play(V, C, profiler)
+            self.mutate(mutation_rate)
+            if timed:
+                profiler.lap('mutation')
+                profiler.end_generation()
+            yield GenerationRecord(gen, *counts, np.nan, np.nan, float(payoff_self.mean()))
+
+    def evolve(self, V, C, mutation_rate, num_generations, profiler=None):
+        """
+        运行多代演化，返回每一代结束时各策略的比例（iter_evolve 的记录是每代开始时的计数，
+        这里在产出每条记录时读取 fractions()，因此第 g 行等于第 g + 1 条记录的比例）。
+
+        参数:
+        V - 资源的价值
+        C - 打斗的代价
+        mutation_rate - 突变率
+        num_generations - 演化的代数
+        profiler - 可选的 Profiler.PhaseProfiler，按阶段记录每代的耗时
+        """
+        history = np.empty((num_generations, len(STRATEGIES)))
+
+        for record in self.iter_evolve(V, C, mutation_rate, num_generations, profiler):
+            history[record.generation] = self.fractions()
+
+        return history[:, HAWK], history[:, DOVE], history[:, MIXED]
+
+    def iter_evolve_resources(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent,
+                              non_renewable_resource_percent, renewable_recovery_amount, profiler=None):
+        """
+        带可再生/不可再生资源的演化（与 Resource_Hawk_Dove_Game_CustomRecovery 的模型相同），
+        每完成一代产出一条 GenerationRecord。参数含义见 evolve_resources。
+        """
+        timed = profiler is not None
+        renewable_capacity = initial_resource * renewable_resource_percent
+        renewable_resources = renewable_capacity
+        non_renewable_resources = initial_resource * non_renewable_resource_percent
+        generations = itertools.count() if num_generations is None else range(num_generations)
+
+        for gen in generations:
+            if timed:
+                profiler.begin_generation(gen)
+            counts = self.strategy_counts.tolist()
+            start_renewable, start_non_renewable = renewable_resources, non_renewable_resources
+            total_resources = max(renewable_resources + non_renewable_resources, 0)
+            if timed:
+                profiler.lap('fraction_counting')
+
+            payoff_self, payoff_opponent = self.play(V, C, profiler)
+            # 没有资源时所有交互的收益都为 0，资源也不再被消耗
+            if total_resources > 0:
+                non_renewable_resources, renewable_resources = remaining_stocks(
+                    payoff_self + payoff_opponent, non_renewable_resources, renewable_resources)
+                mean_payoff = float(payoff_self.mean())
+            else:
+                mean_payoff = 0.0
+            if timed:
+                profiler.lap('resource_bookkeeping')
+            self.mutate(mutation_rate)
+            if timed:
+                profiler.lap('mutation')
+
+            # 更新可再生资源
+            renewable_resources = min(renewable_resources + renewable_recovery_amount, renewable_capacity)
+            if timed:
+                profiler.lap('resource_bookkeeping')
+                profiler.end_generation()
+
+            yield GenerationRecord(gen, *counts, start_renewable, start_non_renewable, mean_payoff)
+
+    def evolve_resources(self, V, C, mutation_rate, num_generations, initial_resource, renewable_resource_percent,
+                         non_renewable_resource_percent, renewable_recovery_amount, profiler=None):
+        """
+        带可再生/不可再生资源的演化，返回每一代开始时各策略的比例和总资源。
+
+        参数:
+        V - 资源的价值
+        C - 打斗的代价
+        mutation_rate - 突变率
+        num_generations - 演化的代数
+        initial_resource - 初始资源量
+        renewable_resource_percent - 可再生资源比例
+        non_renewable_resource_percent - 不可再生资源比例
+        renewable_recovery_amount - 每代可再生资源的恢复量
+        profiler - 可选的 Profiler.PhaseProfiler，按阶段记录每代的耗时
+        """
+        history = np.empty((num_generations, len(STRATEGIES)))
+        resources = np.empty(num_generations)
+
+        for record in self.iter_evolve_resources(V, C, mutation_rate, num_generations, initial_resource,
+                                                 renewable_resource_percent, non_renewable_resource_percent,
+                                                 renewable_recovery_amount, profiler):
+            history[record.generation] = (record.hawk, record.dove, record.mixed)
+            resources[record.generation] = max(record.renewable + record.non_renewable, 0)
+
+        history /= self.strategies.size
+        return history[:, HAWK], history[:, DOVE], history[:, MIXED], resources
+
+
+def main():
+    # 获取用户输入
+    V = float(input("请输入资源的价值 V: "))
+    C = float(input("请输入打斗的代价 C: "))
+    population_size = int(input("请输入群体规模: "))
+    initial_hawk_fraction = float(input("请输入初始鹰的比例 (0-1): "))
+    initial_dove_fraction = float(input("请输入初始鸽的比例 (0-1): "))
+    initial_mixed_fraction = float(input("请输入初始混合策略的比例 (0-1): "))
+    num_generations = int(input("请输入模拟的代数: "))
+    mutation_rate = float(input("请输入突变率 (0-1): "))
+
+    # 初始化群体并运行模拟
+    population = VectorizedPopulation(population_size, initial_hawk_fraction, initial_dove_fraction, initial_mixed_fraction)
+    hawk_fractions, dove_fractions, mixed_fractions = population.evolve(V, C, mutation_rate, num_generations)
+
+    # 绘制结果
+    plt.plot(hawk_fractions, label='Hawk Fraction')
+    plt.plot(dove_fractions, label='Dove Fraction')
+    plt.plot(mixed_fractions, label='Mixed Fraction')
+    plt.xlabel('Generation')
+    plt.ylabel('Strategy Fractions')
+    plt.title('Evolution of Hawk, Dove, and Mixed Strategies')
+    plt.legend()
+    plt.show()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+import os
+import sys
+
+# 脚本之间按模块名相互导入；RL 子目录追加在后面，不会遮蔽本目录中的脚本
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+sys.path.append(os.path.join(BASE_DIR, 'RL'))
+
+# 测试中不弹出图形窗口
+os.environ.setdefault('MPLBACKEND', 'Agg')
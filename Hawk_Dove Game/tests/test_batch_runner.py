@@ -0,0 +1,52 @@
+import json
+
+import numpy as np
+import pytest
+
+from Batch_Runner import MODELS, load_scenarios, run_batch, run_model
+
+PARAMS = {'population_size': 60, 'initial_hawk_fraction': .3, 'initial_dove_fraction': .3,
+          'initial_mixed_fraction': .4, 'V': 50, 'C': 100, 'mutation_rate': .05, 'num_generations': 5}
+
+
+def test_load_scenarios_fills_defaults(tmp_path):
+    path = tmp_path / 'scenarios.toml'
+    path.write_text('[[scenarios]]\nmodel = "vectorized"\nseed = 3\n\n'
+                    '[[scenarios]]\nname = "named"\nmodel = "replicator"\n', encoding='utf-8')
+    toml = load_scenarios(str(path))
+    assert [s['name'] for s in toml] == ['0000_vectorized', 'named']
+    assert toml[1]['params'] == {} and toml[1]['seed'] is None
+
+    path = tmp_path / 'scenarios.json'
+    path.write_text(json.dumps([{'model': 'vectorized', 'params': PARAMS}]), encoding='utf-8')
+    assert load_scenarios(str(path))[0]['params'] == PARAMS
+
+
+def test_seeded_models_are_reproducible():
+    for model in ('multi_strategy', 'vectorized', 'q_learning_multi_strategy'):
+        first, _ = run_model(model, PARAMS, seed=4)
+        second, _ = run_model(model, PARAMS, seed=4)
+        assert first.keys() == second.keys()
+        for name in first:
+            np.testing.assert_array_equal(first[name], second[name])
+
+
+def test_run_batch_writes_results_and_records_failures(tmp_path):
+    scenarios = [
+        {'name': 'ok', 'model': 'vectorized', 'params': PARAMS, 'seed': 1},
+        {'name': 'broken', 'model': 'vectorized', 'params': {'V': 50}, 'seed': 1},
+    ]
+    records = run_batch(scenarios, str(tmp_path), workers=2)
+    assert [(r['name'], r['status']) for r in records] == [('broken', 'error'), ('ok', 'ok')]
+    assert json.loads((tmp_path / 'summary.json').read_text(encoding='utf-8')) == records
+
+    with np.load(tmp_path / 'ok.npz') as data:
+        expected, _ = run_model('vectorized', PARAMS, seed=1)
+        for name in expected:
+            np.testing.assert_array_equal(data[name], expected[name])
+
+
+def test_unknown_model_is_rejected():
+    with pytest.raises(ValueError) as error:
+        run_model('nope', {})
+    assert all(name in str(error.value) for name in MODELS)
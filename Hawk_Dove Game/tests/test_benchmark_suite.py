@@ -0,0 +1,60 @@
+import json
+import sys
+
+import pytest
+
+import Benchmark_Suite
+from Benchmark_Suite import compare, measure, result_key, run_suite
+
+
+def record(benchmark, rate, memory, size=1000, generations=10, mix='balanced'):
+    return {'benchmark': benchmark, 'size': size, 'generations': generations, 'mix': mix,
+            'interactions_per_sec': rate, 'peak_memory_bytes': memory}
+
+
+def test_compare_flags_throughput_and_memory_regressions():
+    baseline = {'results': [record('vectorized', 1000.0, 1000), record('lattice', 1000.0, 1000),
+                            record('network', 1000.0, 0), record('markov', 1000.0, 1000)]}
+    current = {'results': [
+        record('vectorized', 850.0, 1000),   # 吞吐量下降 15%
+        record('lattice', 950.0, 1150),      # 吞吐量在阈值内，内存增加 15%
+        record('network', 2000.0, 0),        # 更快，基线内存为 0 时不除以零
+        record('markov', 1000.0, 1000, generations=20),  # 基线中没有这个测试点
+    ]}
+    regressions = compare(baseline, current, threshold=0.1)
+    assert [(r['key'], r['metric']) for r in regressions] == [
+        (result_key(record('vectorized', 0, 0)), 'interactions_per_sec'),
+        (result_key(record('lattice', 0, 0)), 'peak_memory_bytes'),
+    ]
+    assert regressions[0]['ratio'] == pytest.approx(0.85)
+    assert regressions[1]['ratio'] == pytest.approx(1.15)
+
+
+def test_compare_respects_threshold():
+    baseline = {'results': [record('vectorized', 1000.0, 1000)]}
+    current = {'results': [record('vectorized', 850.0, 1150)]}
+    assert compare(baseline, current, threshold=0.2) == []
+    assert len(compare(baseline, current, threshold=0.1)) == 2
+    assert compare(baseline, baseline) == []
+
+
+def test_measure_reports_a_result_record():
+    result = measure('replicator', 1, 50, 'balanced', repeat=1)
+    assert result_key(result) == 'replicator|size=1|generations=50|mix=balanced'
+    assert result['seconds'] > 0 and result['interactions'] == 50
+    assert result['interactions_per_sec'] > 0 and result['peak_memory_bytes'] > 0
+
+
+def test_main_exits_nonzero_on_regression(tmp_path, monkeypatch):
+    report = run_suite(['replicator'], repeat=1)
+    # 基线比实际快得多：一定会被判为回归
+    for result in report['results']:
+        result['interactions_per_sec'] *= 100
+    baseline = tmp_path / 'baseline.json'
+    baseline.write_text(json.dumps(report))
+    monkeypatch.setattr(sys, 'argv', ['Benchmark_Suite.py', '-b', 'replicator', '-r', '1',
+                                      '-o', str(tmp_path / 'current.json'), '--compare', str(baseline)])
+    with pytest.raises(SystemExit) as exit_info:
+        Benchmark_Suite.main()
+    assert exit_info.value.code == 1
+    assert json.loads((tmp_path / 'current.json').read_text())['results']
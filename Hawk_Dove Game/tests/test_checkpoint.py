@@ -0,0 +1,88 @@
+import numpy as np
+import pytest
+
+import Random_Buffer
+from Checkpoint import TRAJECTORY_SUFFIX, load_checkpoint, run_with_checkpoints
+from HDM_Mut import Population as QLearningPopulation
+from Resource_Hawk_Dove_Game_CustomRecovery import Population as RecoveryPopulation
+from Trajectory_Store import GENERATION_COLUMNS
+
+RECOVERY_ARGS = dict(V=50, C=100, mutation_rate=.05, initial_resource=2000, renewable_resource_percent=.6,
+                     non_renewable_resource_percent=.4, renewable_recovery_amount=100)
+
+
+class Interrupted(Exception):
+    pass
+
+
+def interrupt_after(population, generations):
+    # 运行到指定代数时抛出异常，模拟进程在两次检查点之间被终止
+    iter_evolve = population.iter_evolve
+
+    def interrupted(**kwargs):
+        for record in iter_evolve(**kwargs):
+            yield record
+            if population.generation == generations:
+                raise Interrupted
+
+    population.iter_evolve = interrupted
+    return population
+
+
+def columns(store):
+    return {name: np.array(store[name]) for name in GENERATION_COLUMNS}
+
+
+def assert_same_run(store, expected):
+    for name, values in columns(expected).items():
+        np.testing.assert_array_equal(columns(store)[name], values)
+
+
+def test_q_learning_resume_matches_uninterrupted_run(tmp_path):
+    np.random.seed(3)
+    expected = run_with_checkpoints(QLearningPopulation(30, .3, .3, .4), str(tmp_path / 'full.npz'), 12, every=4,
+                                    V=50, C=100, mutation_rate=.05)
+
+    path = str(tmp_path / 'run.npz')
+    np.random.seed(3)
+    with pytest.raises(Interrupted):
+        run_with_checkpoints(interrupt_after(QLearningPopulation(30, .3, .3, .4), 10), path, 12, every=4,
+                             V=50, C=100, mutation_rate=.05)
+    # 中断前最后一次检查点在第 8 代，之后写入的两代在恢复时被丢弃
+    assert load_checkpoint(path)[1] == 8
+
+    np.random.seed(99)
+    store = run_with_checkpoints(QLearningPopulation(30, .9, .1, 0), path, 12, every=4,
+                                 V=50, C=100, mutation_rate=.05)
+    assert len(store) == 12
+    np.testing.assert_array_equal(store['generation'], np.arange(12))
+    assert_same_run(store, expected)
+
+
+def test_resource_resume_matches_uninterrupted_run(tmp_path):
+    np.random.seed(4)
+    Random_Buffer.reseed(4)
+    expected = run_with_checkpoints(RecoveryPopulation(40, .3, .3, .4), str(tmp_path / 'full.npz'), 9, every=3,
+                                    **RECOVERY_ARGS)
+
+    path = str(tmp_path / 'run.npz')
+    np.random.seed(4)
+    Random_Buffer.reseed(4)
+    with pytest.raises(Interrupted):
+        run_with_checkpoints(interrupt_after(RecoveryPopulation(40, .3, .3, .4), 5), path, 9, every=3,
+                             **RECOVERY_ARGS)
+
+    Random_Buffer.reseed(0)
+    store = run_with_checkpoints(RecoveryPopulation(40, .3, .3, .4), path, 9, every=3, **RECOVERY_ARGS)
+    assert_same_run(store, expected)
+
+
+def test_checkpoint_holds_only_state_and_length(tmp_path):
+    path = str(tmp_path / 'run.npz')
+    np.random.seed(0)
+    store = run_with_checkpoints(QLearningPopulation(20, .5, .5, 0), path, 6, every=2, V=50, C=100, mutation_rate=0)
+    state, trajectory_length = load_checkpoint(path)
+    assert trajectory_length == len(store) == 6 and state['generation'] == 6
+    assert store.path == path + TRAJECTORY_SUFFIX
+    with np.load(path) as data:
+        assert '__trajectory_length__' in data.files and not any('history' in name for name in data.files)
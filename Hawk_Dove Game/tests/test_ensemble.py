@@ -0,0 +1,36 @@
+import numpy as np
+import pytest
+
+from Ensemble_Runner import EnsembleStatistics, run_ensemble
+
+
+def test_statistics_match_numpy():
+    rng = np.random.default_rng(0)
+    runs = [{'hawk': rng.random(6), 'dove': rng.random(6)} for _ in range(25)]
+    stats = EnsembleStatistics()
+    for series in runs:
+        stats.add(series)
+    for name in ('hawk', 'dove'):
+        values = np.array([series[name] for series in runs])
+        np.testing.assert_allclose(stats.mean[name], values.mean(axis=0))
+        np.testing.assert_allclose(stats.variance(name), values.var(axis=0, ddof=1))
+        lower, upper = stats.confidence_band(name, .95)
+        np.testing.assert_allclose(upper - lower, 2 * 1.959964 * values.std(axis=0, ddof=1) / 5, rtol=1e-5)
+
+
+def test_single_replicate_has_zero_variance():
+    stats = EnsembleStatistics()
+    stats.add({'hawk': [0.5, 0.25]})
+    np.testing.assert_array_equal(stats.variance('hawk'), [0, 0])
+
+
+@pytest.mark.parametrize('workers', [1, 2])
+def test_ensemble_depends_only_on_seed(workers):
+    params = {'population_size': 200, 'initial_hawk_fraction': .3, 'initial_dove_fraction': .3, 'initial_mixed_fraction': .4,
+              'V': 50, 'C': 100, 'mutation_rate': .05, 'num_generations': 5}
+    first = run_ensemble('vectorized', params, 4, seed=7, workers=1)
+    second = run_ensemble('vectorized', params, 4, seed=7, workers=workers)
+    assert first.count == second.count == 4
+    for name in first.mean:
+        np.testing.assert_array_equal(first.mean[name], second.mean[name])
+        np.testing.assert_array_equal(first.variance(name), second.variance(name))
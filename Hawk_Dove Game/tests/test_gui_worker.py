@@ -0,0 +1,90 @@
+import queue
+
+import numpy as np
+import pytest
+
+from HawkDove_GUI import Population, SimulationWorker, min_max_envelope, reseed
+from Result_Cache import ResultCache
+
+PARAMS = {'V': 50.0, 'C': 100.0, 'pop_size': 80, 'hawk_frac': .3, 'dove_frac': .3, 'mixed_frac': .4, 'num_gen': 12,
+          'mutation_rate': .05, 'initial_resource': 2000.0, 'renewable_res_percent': .6,
+          'renewable_recovery_amount': 100.0, 'seed': 7}
+
+
+def direct_run(params):
+    reseed(params['seed'])
+    population = Population(params['pop_size'], params['hawk_frac'], params['dove_frac'], params['mixed_frac'])
+    return population.evolve(params['V'], params['C'], params['mutation_rate'], params['num_gen'],
+                             params['initial_resource'], params['renewable_res_percent'],
+                             1 - params['renewable_res_percent'], params['renewable_recovery_amount'])
+
+
+def drain(results):
+    messages = []
+    while True:
+        try:
+            messages.append(results.get_nowait())
+        except queue.Empty:
+            return messages
+
+
+def test_run_job_matches_direct_evolve():
+    worker = SimulationWorker()
+    kind, job_id, series = worker.run_job(3, PARAMS)
+    assert (kind, job_id) == ('done', 3)
+    np.testing.assert_array_equal(series, direct_run(PARAMS))
+
+    # 先是 started，再是每代一条 progress，内容与最终结果逐代一致
+    messages = drain(worker.results)
+    assert messages[0] == ('started', 3, (PARAMS['num_gen'], PARAMS['initial_resource']))
+    progress = messages[1:]
+    assert [payload[0] for _, _, payload in progress] == list(range(PARAMS['num_gen']))
+    np.testing.assert_array_equal([payload[2] for _, _, payload in progress], np.transpose(series))
+
+
+def test_cancel_stops_the_running_job():
+    worker = SimulationWorker()
+    worker.cancel()
+    assert worker.run_job(0, PARAMS) == ('cancelled', 0, None)
+    assert [kind for kind, _, _ in drain(worker.results)] == ['started']
+
+
+def test_clear_pending_returns_queued_ids():
+    worker = SimulationWorker()
+    for job_id in range(3):
+        worker.submit(job_id, PARAMS)
+    assert worker.clear_pending() == [0, 1, 2]
+    assert worker.clear_pending() == []
+
+
+def test_thread_runs_jobs_in_order_and_reports_errors(tmp_path):
+    worker = SimulationWorker(ResultCache(tmp_path))
+    worker.start()
+    worker.submit(0, PARAMS)
+    worker.submit(1, dict(PARAMS, pop_size='bad'))
+    # 第二次提交相同的参数由缓存直接给出结果，不再发送 started / progress
+    worker.submit(2, PARAMS)
+
+    finished = []
+    while len(finished) < 3:
+        message = worker.results.get(timeout=30)
+        if message[0] not in ('started', 'progress'):
+            finished.append(message)
+    assert [(kind, job_id) for kind, job_id, _ in finished] == [('done', 0), ('error', 1), ('done', 2)]
+    np.testing.assert_array_equal(finished[2][2], finished[0][2])
+    assert drain(worker.results) == []
+
+
+@pytest.mark.parametrize('n, width', [(10, 8), (1000, 7), (1001, 64)])
+def test_min_max_envelope_matches_per_column_extremes(n, width):
+    values = np.random.default_rng(n).standard_normal(n)
+    x, y = min_max_envelope(values, width)
+    if n <= 2 * width:
+        np.testing.assert_array_equal(x, np.arange(n))
+        np.testing.assert_array_equal(y, values)
+        return
+    # 逐列求最小和最大值：每一列覆盖 [starts[k], starts[k + 1]) 的代
+    starts = np.linspace(0, n, width + 1).astype(int)
+    expected = [f(values[starts[k]:starts[k + 1]]) for k in range(width) for f in (min, max)]
+    np.testing.assert_array_equal(y, expected)
+    np.testing.assert_array_equal(x, np.repeat(starts[:-1], 2))
@@ -0,0 +1,55 @@
+import itertools
+
+import numpy as np
+
+import Random_Buffer
+from Advanced_Hawk_Dove_Game_MultiStrategy import Population as MultiStrategyPopulation
+from Hawk_Dove_MultiStrategy import Population as QLearningPopulation
+from Resource_Hawk_Dove_Game import Population as ResourcePopulation
+from Vectorized_Hawk_Dove_Game import VectorizedPopulation
+
+
+def test_vectorized_evolve_is_one_generation_ahead_of_records():
+    # 第 g 条记录是第 g 代开始时的计数，等于 evolve 返回的第 g - 1 行
+    records = list(VectorizedPopulation(1000, .3, .3, .4, rng=np.random.default_rng(3)).iter_evolve(50, 100, .05, 10))
+    hawk, dove, mixed = VectorizedPopulation(1000, .3, .3, .4, rng=np.random.default_rng(3)).evolve(50, 100, .05, 10)
+    counts = np.array([(r.hawk, r.dove, r.mixed) for r in records]) / 1000
+    np.testing.assert_array_equal(counts[1:], np.column_stack([hawk, dove, mixed])[:-1])
+    assert [r.generation for r in records] == list(range(10))
+
+
+def test_multi_strategy_evolve_matches_records():
+    Random_Buffer.reseed(5)
+    records = list(MultiStrategyPopulation(50, .3, .3, .4).iter_evolve(50, 100, .05, 8))
+    Random_Buffer.reseed(5)
+    hawk, dove, mixed = MultiStrategyPopulation(50, .3, .3, .4).evolve(50, 100, .05, 8, plot=False)
+    assert [r.hawk / 50 for r in records[1:]] == hawk[:-1]
+    assert [r.mixed / 50 for r in records[1:]] == mixed[:-1]
+
+
+def test_resource_evolve_collects_records():
+    Random_Buffer.reseed(5)
+    records = list(ResourcePopulation(50, .3, .3, .4).iter_evolve(50, 100, .05, 8, 2000, 'renewable'))
+    Random_Buffer.reseed(5)
+    hawk, _, _, resources = ResourcePopulation(50, .3, .3, .4).evolve(50, 100, .05, 8, 2000, 'renewable', plot=False)
+    assert [r.hawk / 50 for r in records] == hawk
+    assert [r.renewable for r in records] == resources
+    assert all(np.isnan(r.non_renewable) for r in records)
+
+
+def test_q_learning_evolve_collects_records():
+    np.random.seed(5)
+    records = list(QLearningPopulation(40, .3, .3, .4).iter_evolve(50, 100, .05, 5))
+    np.random.seed(5)
+    hawk, dove, mixed = QLearningPopulation(40, .3, .3, .4).evolve(50, 100, .05, 5)
+    assert [(r.hawk / 40, r.dove / 40, r.mixed / 40) for r in records] == list(zip(hawk, dove, mixed))
+    assert [r.generation for r in records] == list(range(5))
+    assert all(np.isnan(r.renewable) and np.isfinite(r.mean_payoff) for r in records)
+
+
+def test_q_learning_runs_without_generation_limit():
+    np.random.seed(5)
+    records = list(itertools.islice(QLearningPopulation(40, .3, .3, .4).iter_evolve(50, 100, .05, None), 7))
+    np.random.seed(5)
+    assert records[:5] == list(QLearningPopulation(40, .3, .3, .4).iter_evolve(50, 100, .05, 5))[:5]
+    assert records[-1].generation == 6
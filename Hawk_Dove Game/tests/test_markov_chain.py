@@ -0,0 +1,133 @@
+import itertools
+from fractions import Fraction
+
+import numpy as np
+import pytest
+
+from Fixation_Solver import solve
+from MarkovChain import BirthDeathChain, MarkovChain, SequenceAnalyzer
+from Moran_Process import MoranProcess
+
+
+def test_hitting_times_with_absorbing_non_target():
+    # A 是吸收态，到不了 C；B 一定会到达 C，期望 2 步
+    chain = MarkovChain(np.array([[1, 0, 0], [0, .5, .5], [0, 0, 1.]]), ['A', 'B', 'C'])
+    np.testing.assert_allclose(chain.hitting_times('C'), [np.inf, 2, 0])
+
+
+def test_hitting_times_with_probability_below_one():
+    # B 有一半的概率落入 A，期望步数为 inf；D 只会走向 C
+    P = np.array([[1, 0, 0, 0], [.5, 0, .5, 0], [0, 0, 1, 0], [0, 0, .5, .5]])
+    chain = MarkovChain(P, ['A', 'B', 'C', 'D'])
+    np.testing.assert_allclose(chain.hitting_times('C'), [np.inf, np.inf, 0, 2])
+
+
+def test_hitting_times_irreducible():
+    P = np.array([[.6, .3, .1], [.4, .4, .2], [.2, .5, .3]])
+    chain = MarkovChain(P, ['Hawk', 'Dove', 'Mixed'])
+    times = chain.hitting_times('Mixed')
+    np.testing.assert_allclose(times[:2], 1 + P[:2, :2] @ times[:2])
+    assert times[2] == 0
+
+
+def test_birth_death_chain_matches_dense():
+    rng = np.random.default_rng(0)
+    up, down = rng.uniform(0.1, 0.4, 8), rng.uniform(0.1, 0.4, 8)
+    up[-1] = down[0] = 0
+    chain = BirthDeathChain(up, down)
+    dense = MarkovChain(chain.transition_matrix, chain.states)
+    for targets in ([0, 7], [3], [0]):
+        np.testing.assert_allclose(chain.hitting_times(targets), dense.hitting_times(targets))
+
+
+def exact_tridiagonal(up, down, rhs):
+    # 用有理数精确求解与 BirthDeathChain._solve_tridiagonal 相同的方程组
+    up, down, rhs = ([Fraction(float(v)) for v in values] for values in (up, down, rhs))
+    pivots, forward = [], []
+    for i in range(len(up)):
+        pivots.append(up[i] + down[i] - (down[i] * up[i - 1] / pivots[i - 1] if i else 0))
+        forward.append(rhs[i] + (down[i] * forward[i - 1] / pivots[i - 1] if i else 0))
+    x = [Fraction(0)] * (len(up) + 1)
+    for i in reversed(range(len(up))):
+        x[i] = (forward[i] + up[i] * x[i + 1]) / pivots[i]
+    return np.array([float(v) for v in x[:-1]])
+
+
+def test_absorption_times_in_coexistence_regime():
+    # C > V 时吸收时间随 N 指数增长，方程组极度病态
+    process = MoranProcess(60, 50, 100, 1.0)
+    chain = BirthDeathChain(process.up, process.down)
+    unconditional, on_fixation, on_extinction = chain.absorption_times()
+    expected = exact_tridiagonal(process.up[1:60], process.down[1:60], np.ones(59))
+    np.testing.assert_allclose(unconditional[1:60], expected, rtol=1e-10)
+    assert expected.max() > 1e100
+    assert np.all(on_fixation[1:60] > 0) and np.all(on_extinction[1:60] > 0)
+
+
+def test_birth_death_chain_leaves_global_rng_alone():
+    np.random.seed(0)
+    expected = np.random.random()
+    np.random.seed(0)
+    chain = BirthDeathChain(np.full(10**6 + 1, .1), np.full(10**6 + 1, .1))
+    solve(200, 50, 100)
+    assert chain.current_state == 0 and np.random.random() == expected
+
+
+def test_hitting_times_unreachable_segment():
+    # 状态 1、2 之间没有转移：从 2、3 出发永远到不了目标 0
+    up, down = np.array([.5, 0, .5, 0]), np.array([0, .5, 0, .5])
+    np.testing.assert_array_equal(BirthDeathChain(up, down).hitting_times([0]), [0, 2, np.inf, np.inf])
+
+
+def random_chain(num_states, rng):
+    P = rng.random((num_states, num_states)) * (rng.random((num_states, num_states)) < .7)
+    P[np.arange(num_states), rng.integers(0, num_states, num_states)] += .1
+    return MarkovChain(P / P.sum(axis=1, keepdims=True), list(range(num_states)))
+
+
+@pytest.mark.parametrize('num_states', [2, 3, 4, 5])
+def test_simulate_codes_matches_scalar_inverse_cdf(num_states):
+    # 与逐步循环使用同一串均匀随机数：第 t 步的状态为累积概率中不超过 u_t 的项数
+    chain = random_chain(num_states, np.random.default_rng(num_states))
+    chain.current_state = 1
+    codes = chain.simulate_codes(1000, np.random.default_rng(7), chunk_size=97)
+
+    cumulative = chain.cumulative_matrix()
+    expected = [1]
+    for u in np.random.default_rng(7).random(1000):
+        expected.append(int(np.searchsorted(cumulative[expected[-1]], u, side='right')))
+    np.testing.assert_array_equal(codes, expected)
+    assert chain.current_state == expected[-1]
+
+
+def brute_force_analysis(codes, num_states):
+    counts = np.bincount(codes, minlength=num_states)
+    transitions = np.zeros((num_states, num_states), dtype=np.int64)
+    for a, b in zip(codes[:-1], codes[1:]):
+        transitions[a, b] += 1
+    streaks = [[len(list(run)) for state, run in itertools.groupby(codes) if state == s] for s in range(num_states)]
+    return counts, transitions, streaks
+
+
+def test_streaming_analysis_matches_brute_force():
+    rng = np.random.default_rng(0)
+    chain = random_chain(3, rng)
+    codes = chain.simulate_codes(5000, rng)
+    counts, transitions, streaks = brute_force_analysis(codes.tolist(), 3)
+
+    analyzer = SequenceAnalyzer(chain.states)
+    # 块的边界随机落在 streak 中间或两个 streak 之间，包括长度为 0 和 1 的块
+    bounds = np.sort(np.concatenate([[0, 0, 1, 5000, 5001], rng.integers(0, 5001, 40)]))
+    for start, stop in zip(bounds[:-1], bounds[1:]):
+        analyzer.update(codes[start:stop])
+    result = analyzer.result()
+
+    np.testing.assert_array_equal(result['counts'], counts)
+    np.testing.assert_array_equal(analyzer.transition_counts, transitions)
+    np.testing.assert_allclose(result['transition_matrix'], transitions / transitions.sum(axis=1, keepdims=True))
+    for state in range(3):
+        assert result['streak_counts'][state] == len(streaks[state])
+        assert result['max_dwell'][state] == max(streaks[state])
+        assert result['mean_dwell'][state] == pytest.approx(np.mean(streaks[state]))
+        np.testing.assert_array_equal(result['streak_histograms'][state],
+                                      np.bincount(streaks[state], minlength=max(streaks[state]) + 1))
@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from Fixation_Solver import solve
+from Moran_Process import MoranProcess
+
+CASES = [
+    # (N, V, C, 选择强度, 适应度, 初始鹰数)
+    (20, 100, 50, .1, 'exponential', 1),
+    (8, 50, 100, .05, 'exponential', 1),
+    (10, 60, 100, .01, 'linear', 3),
+    (30, 100, 50, .02, 'linear', 2),
+]
+
+
+@pytest.mark.parametrize('N, V, C, w, fitness, initial_hawks', CASES)
+def test_simulated_fixation_matches_solver(N, V, C, w, fitness, initial_hawks):
+    exact = solve(N, V, C, w, fitness, profiles=True)
+    process = MoranProcess(N, V, C, w, fitness, rng=np.random.default_rng(0))
+    estimate = process.estimate_fixation(20000, initial_hawks, level=.999)
+    assert estimate['unabsorbed'] == 0
+    assert estimate['lower'] <= exact['fixation_probabilities'][initial_hawks] <= estimate['upper']
+    assert estimate['mean_fixation_time'] == pytest.approx(exact['fixation_times'][initial_hawks], rel=.05)
+    assert estimate['mean_extinction_time'] == pytest.approx(exact['extinction_times'][initial_hawks], rel=.05)
+
+
+@pytest.mark.parametrize('N, V, C, w, fitness, initial_hawks', CASES)
+def test_replicate_simulation_matches_solver(N, V, C, w, fitness, initial_hawks):
+    exact = solve(N, V, C, w, fitness, profiles=True)
+    process = MoranProcess(N, V, C, w, fitness, rng=np.random.default_rng(1))
+    estimate = process.estimate_fixation(2000, initial_hawks, level=.999, method='replicates')
+    assert estimate['lower'] <= exact['fixation_probabilities'][initial_hawks] <= estimate['upper']
+
+
+def test_solver_matches_dense_chain():
+    # 小 N 时用稠密转移矩阵直接求解吸收概率，与对数空间的解析解比较
+    N = 12
+    process = MoranProcess(N, 50, 100, .1)
+    matrix = np.diag(1 - process.up - process.down)
+    matrix[np.arange(N), np.arange(1, N + 1)] = process.up[:-1]
+    matrix[np.arange(1, N + 1), np.arange(N)] = process.down[1:]
+    interior = slice(1, N)
+    phi = np.linalg.solve(np.eye(N - 1) - matrix[interior, interior], matrix[interior, N])
+    exact = solve(N, 50, 100, .1, profiles=True)
+    np.testing.assert_allclose(exact['fixation_probabilities'][1:N], phi, rtol=1e-10)
+    assert exact['hawk_fixation'] == pytest.approx(phi[0], rel=1e-10)
+    assert exact['dove_fixation'] == pytest.approx(1 - phi[-1], rel=1e-10)
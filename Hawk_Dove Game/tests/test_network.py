@@ -0,0 +1,96 @@
+import copy
+
+import networkx as nx
+import numpy as np
+import pytest
+
+from Network_Hawk_Dove_Game import NetworkPopulation, adjacency_from_edges, adjacency_from_networkx
+from Vectorized_Hawk_Dove_Game import HAWK, MIXED
+
+
+def pair_payoff(a, b, V, C):
+    if a == HAWK:
+        return (V - C) / 2 if b == HAWK else V
+    return 0 if b == HAWK else V / 2
+
+
+def neighbor_lists(adjacency):
+    return [adjacency.indices[adjacency.indptr[i]:adjacency.indptr[i + 1]].tolist()
+            for i in range(adjacency.shape[0])]
+
+
+def brute_force_payoffs(neighbors, actions, V, C):
+    return np.array([sum(pair_payoff(actions[i], actions[j], V, C) for j in neighbors[i])
+                     for i in range(len(neighbors))], dtype=float)
+
+
+def brute_force_imitate_best(neighbors, strategies, payoffs):
+    # 同步更新：邻居中收益最高者（同分取编号最小的邻居）严格高于自己时采用其策略
+    new_strategies = strategies.copy()
+    for i, nodes in enumerate(neighbors):
+        if nodes:
+            best = max(nodes, key=lambda j: (payoffs[j], -j))
+            if payoffs[best] > payoffs[i]:
+                new_strategies[i] = strategies[best]
+    return new_strategies
+
+
+def random_population(directed, rng, update_rule='best', noise=0.1):
+    # 带孤立节点（最后两个）的随机图
+    edges = rng.integers(0, 38, size=(120, 2))
+    adjacency = adjacency_from_edges(edges, num_nodes=40, directed=directed)
+    return NetworkPopulation(adjacency, .3, .3, .4, update_rule=update_rule, noise=noise, rng=rng)
+
+
+@pytest.mark.parametrize('directed', [False, True])
+@pytest.mark.parametrize('V, C', [(50, 100), (100, 50), (2, 2)])
+def test_imitate_best_matches_brute_force(directed, V, C):
+    rng = np.random.default_rng(0)
+    for _ in range(20):
+        population = random_population(directed, rng)
+        neighbors = neighbor_lists(population.adjacency)
+        actions = population.resolve_actions()
+        payoffs = population.payoffs(actions, V, C)
+        np.testing.assert_allclose(payoffs, brute_force_payoffs(neighbors, actions, V, C))
+
+        expected = brute_force_imitate_best(neighbors, population.strategies, payoffs)
+        population.imitate_best(payoffs)
+        np.testing.assert_array_equal(population.strategies, expected)
+
+
+def test_imitate_fermi_follows_payoff_difference():
+    rng = np.random.default_rng(1)
+    population = random_population(False, rng, update_rule='fermi', noise=1e-9)
+    neighbors = neighbor_lists(population.adjacency)
+    payoffs = rng.permutation(40).astype(float)
+    strategies = population.strategies.copy()
+
+    # 用同样的随机数重现每个节点选中的邻居
+    replay = copy.deepcopy(population.rng)
+    nodes = [i for i in range(40) if neighbors[i]]
+    picks = (replay.random(len(nodes)) * np.array([len(neighbors[i]) for i in nodes])).astype(np.int64)
+    population.imitate_fermi(payoffs)
+
+    # noise 极小时收益更高的邻居一定被模仿，更低的一定不被模仿
+    expected = strategies.copy()
+    for i, pick in zip(nodes, picks):
+        partner = neighbors[i][pick]
+        if payoffs[partner] > payoffs[i]:
+            expected[i] = strategies[partner]
+    np.testing.assert_array_equal(population.strategies, expected)
+
+
+def test_isolated_nodes_keep_their_strategy():
+    adjacency = adjacency_from_edges([(0, 1), (1, 2)], num_nodes=4)
+    population = NetworkPopulation(adjacency, 0, 0, 1, rng=np.random.default_rng(2))
+    population.strategies[:] = [HAWK, HAWK, 1, MIXED]
+    population.play(50, 100)
+    assert population.strategies[3] == MIXED
+
+
+def test_adjacency_from_networkx_drops_self_loops():
+    graph = nx.cycle_graph(['a', 'b', 'c', 'd'])
+    graph.add_edge('a', 'a')
+    adjacency, nodes = adjacency_from_networkx(graph)
+    assert nodes == ['a', 'b', 'c', 'd']
+    assert adjacency.diagonal().sum() == 0 and adjacency.nnz == 8
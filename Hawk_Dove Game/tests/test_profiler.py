@@ -0,0 +1,58 @@
+import itertools
+import json
+
+import numpy as np
+import pytest
+
+import Profiler
+from Profiler import PhaseProfiler
+from Vectorized_Hawk_Dove_Game import VectorizedPopulation
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # 每次读取时钟前进 1 秒
+    ticks = itertools.count()
+    monkeypatch.setattr(Profiler, 'perf_counter', lambda: float(next(ticks)))
+
+
+def test_laps_accumulate_interleaved_phases(clock):
+    profiler = PhaseProfiler()
+    for generation in range(2):
+        profiler.begin_generation(generation)
+        for _ in range(3):
+            profiler.lap('opponent_sampling')
+            profiler.lap('mutation')
+        profiler.end_generation()
+
+    assert profiler.totals() == {'opponent_sampling': (6.0, 6), 'mutation': (6.0, 6), 'other': (2.0, 2)}
+    assert [record['duration'] for record in profiler.generations] == [7.0, 7.0]
+    rows = profiler.summary()
+    assert sum(row['share'] for row in rows) == pytest.approx(1.0)
+    assert rows[-1]['phase'] == 'other' and rows[0]['mean_microseconds'] == pytest.approx(1e6)
+
+
+def test_chrome_trace_lays_out_phases_inside_each_generation(clock, tmp_path):
+    profiler = PhaseProfiler()
+    profiler.begin_generation(0)
+    profiler.lap('play')
+    profiler.lap('mutation')
+    profiler.end_generation()
+    path = tmp_path / 'trace.json'
+    profiler.export_chrome_trace(path)
+    events = json.loads(path.read_text())['traceEvents']
+    generation, play, mutation, other = events
+    assert generation['name'] == 'generation 0' and generation['dur'] == 3e6
+    assert play['ts'] == generation['ts'] and mutation['ts'] == play['ts'] + play['dur']
+    assert other['ts'] + other['dur'] == generation['ts'] + generation['dur']
+
+
+def test_profiling_does_not_change_results():
+    plain = VectorizedPopulation(500, .3, .3, .4, rng=np.random.default_rng(1)).evolve(50, 100, .05, 6)
+    profiler = PhaseProfiler()
+    profiled = VectorizedPopulation(500, .3, .3, .4, rng=np.random.default_rng(1)).evolve(50, 100, .05, 6,
+                                                                                        profiler=profiler)
+    for a, b in zip(plain, profiled):
+        np.testing.assert_array_equal(a, b)
+    assert [record['generation'] for record in profiler.generations] == list(range(6))
+    assert {'play', 'mutation'} <= set(profiler.totals())
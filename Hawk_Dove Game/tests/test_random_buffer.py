@@ -0,0 +1,43 @@
+import numpy as np
+
+import Random_Buffer
+from Random_Buffer import RandomBuffer
+
+
+def test_uniform_draws_follow_the_rng_across_blocks():
+    buffer = RandomBuffer(np.random.default_rng(0), block_size=7)
+    expected = np.random.default_rng(0).random(7 * 3)
+    np.testing.assert_array_equal([buffer.uniform() for _ in range(21)], expected)
+
+
+def test_state_round_trip_restores_the_sequence():
+    buffer = RandomBuffer(np.random.default_rng(1), block_size=10)
+    for _ in range(4):
+        buffer.uniform()
+    pending = buffer.get_state()
+    state = buffer.rng.bit_generator.state
+    expected = [buffer.uniform() for _ in range(15)]
+
+    restored = RandomBuffer(np.random.default_rng(), block_size=10)
+    restored.rng.bit_generator.state = state
+    restored.set_state(pending)
+    assert [restored.uniform() for _ in range(15)] == expected
+
+
+def test_integers_and_choice_are_in_range_and_unbiased():
+    buffer = RandomBuffer(np.random.default_rng(2))
+    draws = np.array([buffer.integers(3) for _ in range(30000)])
+    assert set(draws) == {0, 1, 2}
+    np.testing.assert_allclose(np.bincount(draws) / draws.size, 1 / 3, atol=.01)
+
+    picks = [buffer.choice(['Hawk', 'Dove'], p=[.2, .8]) for _ in range(30000)]
+    assert abs(picks.count('Hawk') / 30000 - .2) < .01
+
+
+def test_reseed_discards_buffered_draws():
+    Random_Buffer.reseed(3)
+    first = [Random_Buffer.global_buffer.uniform() for _ in range(5)]
+    Random_Buffer.global_buffer.uniform()
+    Random_Buffer.reseed(3)
+    assert [Random_Buffer.global_buffer.uniform() for _ in range(5)] == first
+    assert first == np.random.RandomState(3).random_sample(5).tolist()
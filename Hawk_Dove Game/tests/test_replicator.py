@@ -0,0 +1,109 @@
+import numpy as np
+import pytest
+
+from Batch_Runner import load_script, run_replicator
+from Replicator_Dynamics import iter_replicator, mixed_equilibrium, parameter_grid, replicator_converge, replicator_sweep
+from Trajectory_Store import TrajectoryStore
+
+
+def test_hawk_dove_game_returns_fixed_point():
+    module = load_script('Hawk-Dove_Game1.py')
+    hawk_fractions, equilibrium, converged_at = module.hawk_dove_game(50, 100, 0.3, 200, tol=1e-10, plot=False)
+    expected, expected_equilibrium, expected_at = replicator_converge(50, 100, 0.3, 200, tol=1e-10)
+    np.testing.assert_allclose(hawk_fractions, expected[0])
+    assert equilibrium == expected_equilibrium[0] and converged_at == expected_at[0]
+    assert abs(equilibrium - 0.5) < 1e-8
+
+
+def test_hawk_dove_game_boundary_start_stays_on_boundary():
+    module = load_script('Hawk-Dove_Game1.py')
+    _, equilibrium, converged_at = module.hawk_dove_game(50, 100, 0.0, 20, tol=1e-10, plot=False)
+    assert equilibrium == 0.0 and converged_at == 0
+
+
+@pytest.mark.parametrize('V, C, h0', [(50, 100, 0.0), (50, 100, 1.0), (50, 100, 0.5), (50, 100, 0.3),
+                                      (100, 50, 0.3), (100, 50, 1.0), (50, 50, 0.2)])
+def test_hawk_dove_game_matches_replicator_converge(tmp_path, V, C, h0):
+    module = load_script('Hawk-Dove_Game1.py')
+    hawk_fractions, equilibrium, converged_at = module.hawk_dove_game(V, C, h0, 60, tol=1e-10, plot=False)
+    expected, expected_equilibrium, expected_at = replicator_converge(V, C, h0, 60, tol=1e-10)
+    np.testing.assert_allclose(hawk_fractions, expected[0], rtol=1e-12)
+    assert converged_at == expected_at[0]
+    assert equilibrium == pytest.approx(expected_equilibrium[0], rel=1e-12)
+
+    store, _, stored_at = module.hawk_dove_game(V, C, h0, 60, tol=1e-10, plot=False, path=str(tmp_path / 'run'))
+    np.testing.assert_array_equal(store['hawk_fraction'], hawk_fractions)
+    assert stored_at == converged_at
+
+
+def test_hawk_dove_game_without_tol_does_not_converge():
+    module = load_script('Hawk-Dove_Game1.py')
+    hawk_fractions, equilibrium, converged_at = module.hawk_dove_game(50, 100, 0.3, 20, plot=False)
+    assert len(hawk_fractions) == 21 and equilibrium == hawk_fractions[-1] and converged_at == -1
+
+
+def test_run_replicator_series():
+    series = run_replicator({'V': 50, 'C': 100, 'initial_hawk_fraction': 0.3, 'num_generations': 20})
+    assert series['hawk_fraction'].shape == (21,)
+
+
+def test_sweep_matches_scalar_runs():
+    # 每组参数单独跑一遍标量的 hawk_dove_game，与批量推进的结果逐条比较
+    module = load_script('Hawk-Dove_Game1.py')
+    V, C, h = parameter_grid([20, 50, 80], [40, 100], [0, 0.1, 0.5, 0.9, 1])
+    trajectories = replicator_sweep(V, C, h, 40)
+    assert trajectories.shape == (V.size, 41)
+    for row, params in zip(trajectories, zip(V, C, h)):
+        hawk_fractions, _, _ = module.hawk_dove_game(*params, 40, plot=False)
+        np.testing.assert_allclose(row, hawk_fractions, rtol=1e-12, atol=1e-15)
+
+
+def test_sweep_broadcasts_scalars_and_approaches_equilibrium():
+    # 鹰比例过高时鹰的收益为负，离散映射不再保持在 [0, 1] 内收敛，只取适应度为正的初值
+    h = np.linspace(0.05, 0.65, 7)
+    trajectories = replicator_sweep(50, 100, h, 500)
+    np.testing.assert_array_equal(trajectories, replicator_sweep(np.full(7, 50), 100, h, 500))
+    np.testing.assert_allclose(trajectories[:, -1], mixed_equilibrium(50, 100), atol=1e-8)
+    assert mixed_equilibrium(100, 50) == 1.0
+
+
+def test_iter_replicator_chunks_match_sweep():
+    V, C, h = parameter_grid([20, 50, 80], [40, 100], [0, 0.3, 1])
+    expected = replicator_sweep(V, C, h, 50)
+    chunks = list(iter_replicator(V, C, h, 50, chunk_size=7))
+    assert [chunk.shape[0] for chunk in chunks] == [7] * 7 + [2]
+    np.testing.assert_array_equal(np.concatenate(chunks).T, expected)
+
+
+def test_default_chunks_are_bounded_by_element_count(monkeypatch):
+    import Replicator_Dynamics
+    monkeypatch.setattr(Replicator_Dynamics, 'CHUNK_ELEMENTS', 100)
+    V, C, h = parameter_grid([20, 50, 80], [40, 100], [0, 0.3, 1])
+    chunks = list(iter_replicator(V, C, h, 20))
+    assert [chunk.shape for chunk in chunks] == [(5, 18)] * 4 + [(1, 18)]
+    assert next(iter_replicator(np.full(500, 50.0), 100, 0.3)).shape == (1, 500)
+
+
+def test_sweep_and_converge_write_to_store(tmp_path):
+    V, C, h = parameter_grid([20, 50, 80], [40, 100], [0, 0.3, 1])
+    expected = replicator_sweep(V, C, h, 50)
+    store = replicator_sweep(V, C, h, 50, path=tmp_path / 'sweep')
+    np.testing.assert_array_equal(store['hawk_fraction'].T, expected)
+    np.testing.assert_array_equal(store['generation'], np.arange(51))
+
+    trajectory, equilibrium, converged_at = replicator_converge(V, C, h, 50)
+    store, stored_equilibrium, stored_at = replicator_converge(V, C, h, 50, path=tmp_path / 'converge')
+    reopened = TrajectoryStore.open(tmp_path / 'converge')
+    np.testing.assert_array_equal(reopened['hawk_fraction'].T, trajectory)
+    np.testing.assert_array_equal(stored_equilibrium, equilibrium)
+    np.testing.assert_array_equal(stored_at, converged_at)
+
+
+def test_hawk_dove_game_writes_to_store(tmp_path):
+    module = load_script('Hawk-Dove_Game1.py')
+    hawk_fractions, equilibrium, converged_at = module.hawk_dove_game(50, 100, 0.3, 100, tol=1e-10, plot=False)
+    store, stored_equilibrium, stored_at = module.hawk_dove_game(50, 100, 0.3, 100, tol=1e-10, plot=False,
+                                                                 path=tmp_path / 'run')
+    np.testing.assert_array_equal(store['hawk_fraction'], hawk_fractions)
+    np.testing.assert_array_equal(store['generation'], np.arange(101))
+    assert (stored_equilibrium, stored_at) == (equilibrium, converged_at)
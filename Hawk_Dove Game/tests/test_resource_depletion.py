@@ -0,0 +1,40 @@
+import numpy as np
+import pytest
+
+from Resource_Depletion import remaining_stocks
+
+
+def scalar_depletion(total_payoffs, non_renewable, renewable):
+    # 向量化之前逐次交互扣除资源的循环
+    for total_payoff in total_payoffs:
+        if total_payoff > 0:
+            if non_renewable >= total_payoff:
+                non_renewable -= total_payoff
+            else:
+                total_payoff -= non_renewable
+                non_renewable = 0
+                renewable -= total_payoff
+    return non_renewable, renewable
+
+
+@pytest.mark.parametrize('total_payoffs, non_renewable, renewable', [
+    ([10, 20, 30], 60, 40),      # 不可再生资源恰好在最后一次交互时耗尽
+    ([10, 20, 30], 30, 40),      # 恰好在中间耗尽，之后由可再生资源承担
+    ([10, 20, 30], 0, 0),        # 两种资源一开始都为 0，可再生资源变为负数
+    ([10, 20, 30], 0, 60),       # 可再生资源恰好耗尽
+    ([-25, 50, -50, 0, 50], 60, 40),  # 负收益和零收益不扣除资源
+    ([-25, -50], 0, 10),
+    ([], 5, 5),
+])
+def test_remaining_stocks_matches_scalar_loop(total_payoffs, non_renewable, renewable):
+    assert remaining_stocks(total_payoffs, non_renewable, renewable) == \
+        scalar_depletion(total_payoffs, non_renewable, renewable)
+
+
+def test_remaining_stocks_matches_scalar_loop_on_random_payoffs():
+    rng = np.random.default_rng(0)
+    for _ in range(50):
+        total_payoffs = rng.choice([-25.0, 0.0, 50.0, 100.0], size=rng.integers(0, 200))
+        non_renewable, renewable = rng.uniform(0, 5000, 2)
+        np.testing.assert_allclose(remaining_stocks(total_payoffs, non_renewable, renewable),
+                                   scalar_depletion(total_payoffs, non_renewable, renewable), rtol=1e-12, atol=1e-9)
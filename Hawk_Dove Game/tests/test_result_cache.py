@@ -0,0 +1,93 @@
+import os
+import threading
+import time
+
+import numpy as np
+import pytest
+
+import Result_Cache
+from Batch_Runner import run_scenario
+from Result_Cache import ResultCache, cache_key
+
+
+def test_cache_key_keeps_types_distinct():
+    assert cache_key('m', {'a': 0.5}, 1, 'v') != cache_key('m', {'a': '0.5'}, 1, 'v')
+    assert cache_key('m', {'a': 1}, 1, 'v') != cache_key('m', {'a': 1.0}, 1, 'v')
+    assert cache_key('m', {'a': 1}, 1, 'v') != cache_key('m', {'a': True}, 1, 'v')
+
+
+def test_cache_key_is_stable_for_numpy_values():
+    assert cache_key('m', {'a': np.float64(0.1), 'b': np.int64(3)}, 7, 'v') == \
+        cache_key('m', {'b': 3, 'a': 0.1}, 7, 'v')
+    assert cache_key('m', {'a': 0.1}, np.random.SeedSequence(5), 'v') == \
+        cache_key('m', {'a': 0.1}, np.random.SeedSequence(5), 'v')
+    assert cache_key('m', {'a': 0.1}, 7, 'v') != cache_key('m', {'a': 0.1 + 2**-55}, 7, 'v')
+
+
+def test_round_trip(tmp_path):
+    cache = ResultCache(tmp_path)
+    series, hit = cache.get_or_compute('m', {'V': 50.0}, 1, 'v', lambda: {'x': np.arange(3)})
+    assert not hit
+    series, hit = cache.get_or_compute('m', {'V': 50.0}, 1, 'v', lambda: {'x': np.zeros(3)})
+    assert hit
+    np.testing.assert_array_equal(series['x'], np.arange(3))
+    assert cache.stats()['hits'] == 1 and cache.stats()['stores'] == 1
+
+
+def test_failed_put_leaves_no_temporary_file(tmp_path, monkeypatch):
+    cache = ResultCache(tmp_path)
+
+    def interrupted(f, **arrays):
+        # 写了一部分之后失败（例如磁盘已满）
+        f.write(b'partial')
+        raise OSError('disk full')
+
+    monkeypatch.setattr(np, 'savez_compressed', interrupted)
+    with pytest.raises(OSError):
+        cache.put('key', {'x': np.arange(3)})
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_evict_sweeps_stale_temporary_files(tmp_path):
+    stale, fresh = tmp_path / 'a.npz.1.2.tmp', tmp_path / 'b.npz.1.2.tmp'
+    stale.write_bytes(b'x')
+    fresh.write_bytes(b'x')
+    old = time.time() - Result_Cache.STALE_TEMPORARY_SECONDS - 10
+    os.utime(stale, (old, old))
+    ResultCache(tmp_path).evict()
+    assert not stale.exists() and fresh.exists()
+
+
+def test_counters_are_thread_safe(tmp_path):
+    cache = ResultCache(tmp_path)
+    threads = [threading.Thread(target=lambda: [cache.get('missing') for _ in range(500)]) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert cache.stats()['misses'] == 2000
+
+
+@pytest.mark.parametrize('truncate', [0, 10, 100])
+def test_corrupt_entry_is_removed_and_recomputed(tmp_path, truncate):
+    cache = ResultCache(tmp_path)
+    cache.put('key', {'x': np.arange(1000)})
+    path = tmp_path / 'key.npz'
+    # 0 字节的文件（EOFError）和被截断的 zip（BadZipFile）
+    path.write_bytes(path.read_bytes()[:truncate])
+    assert cache.get('key') is None
+    assert not path.exists() and cache.stats()['misses'] == 1
+
+    series, hit = cache.get_or_compute('m', {'V': 50.0}, 1, 'v', lambda: {'x': np.arange(3)})
+    (tmp_path / f"{cache_key('m', {'V': 50.0}, 1, 'v')}.npz").write_bytes(b'')
+    series, hit = cache.get_or_compute('m', {'V': 50.0}, 1, 'v', lambda: {'x': np.arange(3)})
+    assert not hit
+    np.testing.assert_array_equal(series['x'], np.arange(3))
+
+
+def test_run_scenario_reports_its_own_cache_hit(tmp_path):
+    scenario = {'name': 'run', 'model': 'replicator', 'params': {'V': 50, 'C': 100, 'num_generations': 5},
+                'seed': 1}
+    cache_dir = str(tmp_path / 'cache')
+    records = [run_scenario(scenario, str(tmp_path), cache_dir) for _ in range(2)]
+    assert [record['cache'] for record in records] == ['miss', 'hit']
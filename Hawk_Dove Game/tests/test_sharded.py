@@ -0,0 +1,57 @@
+import gc
+import os
+
+import numpy as np
+import pytest
+
+from Sharded_Hawk_Dove_Game import ShardedPopulation
+
+
+def run(workers):
+    with ShardedPopulation(20000, .3, .3, .4, seed=11, workers=workers, block_size=1024) as population:
+        records = list(population.iter_evolve(50, 100, .05, 5))
+        return records, population.strategies.copy()
+
+
+def test_result_does_not_depend_on_worker_count():
+    expected_records, expected_strategies = run(1)
+    for workers in (2, 3):
+        records, strategies = run(workers)
+        assert records == expected_records
+        np.testing.assert_array_equal(strategies, expected_strategies)
+
+
+@pytest.mark.parametrize('size', [0, -5])
+def test_rejects_non_positive_size(size):
+    with pytest.raises(ValueError):
+        ShardedPopulation(size, .5, .5, 0)
+
+
+def segment_paths(population):
+    return [os.path.join('/dev/shm', segment.name) for segment in population._segments]
+
+
+@pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='需要 /dev/shm')
+def test_segments_are_released():
+    population = ShardedPopulation(1000, .5, .5, 0, seed=1)
+    paths = segment_paths(population)
+    assert all(os.path.exists(path) for path in paths)
+    population.close()
+    population.close()
+    assert not any(os.path.exists(path) for path in paths)
+
+    # 没有调用 close 时，对象被回收后由 weakref.finalize 删除
+    population = ShardedPopulation(1000, .5, .5, 0, seed=1)
+    paths = segment_paths(population)
+    del population
+    gc.collect()
+    assert not any(os.path.exists(path) for path in paths)
+
+
+@pytest.mark.skipif(not os.path.isdir('/dev/shm'), reason='需要 /dev/shm')
+def test_failed_init_releases_segments():
+    before = set(os.listdir('/dev/shm'))
+    with pytest.raises(TypeError):
+        ShardedPopulation(1000, None, .5, 0)
+    gc.collect()
+    assert set(os.listdir('/dev/shm')) <= before
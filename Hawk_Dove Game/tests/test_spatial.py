@@ -0,0 +1,78 @@
+import numpy as np
+import pytest
+
+from Spatial_Hawk_Dove_Game import NEIGHBORHOODS, LatticePopulation, update_band
+from Vectorized_Hawk_Dove_Game import DOVE, HAWK, MIXED
+
+
+def pair_payoff(a, b, V, C):
+    if a == HAWK:
+        return (V - C) / 2 if b == HAWK else V
+    return 0 if b == HAWK else V / 2
+
+
+def brute_force_imitate_best(strategies, actions, V, C, offsets):
+    # 逐个格点：与每个邻居交互一次，再采用邻域（自己优先，其次按 offsets 的顺序）中收益最高者的策略
+    height, width = strategies.shape
+    payoffs = np.zeros((height, width))
+    for y in range(height):
+        for x in range(width):
+            for dy, dx in offsets:
+                payoffs[y, x] += pair_payoff(actions[y, x], actions[(y + dy) % height, (x + dx) % width], V, C)
+
+    new_strategies = np.empty_like(strategies)
+    for y in range(height):
+        for x in range(width):
+            best = (y, x)
+            for dy, dx in offsets:
+                neighbor = ((y + dy) % height, (x + dx) % width)
+                if payoffs[neighbor] > payoffs[best]:
+                    best = neighbor
+            new_strategies[y, x] = strategies[best]
+    return new_strategies, payoffs.sum()
+
+
+def random_grid(rng, height, width):
+    strategies = rng.integers(0, 3, size=(height, width)).astype(np.int8)
+    actions = np.where(strategies == MIXED, rng.integers(0, 2, size=(height, width)), strategies).astype(np.int8)
+    return strategies, actions
+
+
+@pytest.mark.parametrize('neighborhood', sorted(NEIGHBORHOODS))
+@pytest.mark.parametrize('V, C', [(50, 100), (100, 50), (2, 2)])
+def test_update_band_matches_brute_force(neighborhood, V, C):
+    rng = np.random.default_rng(0)
+    offsets = NEIGHBORHOODS[neighborhood]
+    for _ in range(20):
+        strategies, actions = random_grid(rng, 7, 9)
+        halo = np.arange(-2, 7 + 2)
+        new_strategies, payoff_sum = update_band(strategies.take(halo, axis=0, mode='wrap'),
+                                                 actions.take(halo, axis=0, mode='wrap'), V, C, offsets)
+        expected_strategies, expected_sum = brute_force_imitate_best(strategies, actions, V, C, offsets)
+        np.testing.assert_array_equal(new_strategies, expected_strategies)
+        assert payoff_sum == pytest.approx(expected_sum)
+
+
+def test_equal_payoffs_keep_own_strategy():
+    # 全是鸽时所有格点收益相同，每个格点保留自己的策略（混合策略也落实为鸽）
+    strategies = np.array([[DOVE, MIXED, DOVE], [MIXED, DOVE, DOVE], [DOVE, DOVE, MIXED]], dtype=np.int8)
+    actions = np.full_like(strategies, DOVE)
+    halo = np.arange(-2, 5)
+    new_strategies, _ = update_band(strategies.take(halo, axis=0, mode='wrap'), actions.take(halo, axis=0, mode='wrap'),
+                                    50, 100, NEIGHBORHOODS['moore'])
+    np.testing.assert_array_equal(new_strategies, strategies)
+
+
+@pytest.mark.parametrize('workers', [1, 3])
+def test_play_matches_brute_force_with_bands(workers):
+    with LatticePopulation(7, 9, .3, .3, .4, neighborhood='moore', rng=np.random.default_rng(4),
+                           workers=workers) as population:
+        for _ in range(3):
+            strategies = population.strategies.copy()
+            actions = population.resolve_actions()
+            population.resolve_actions = lambda: actions
+            mean_payoff = population.play(50, 100)
+            expected_strategies, expected_sum = brute_force_imitate_best(strategies, actions, 50, 100,
+                                                                         population.offsets)
+            np.testing.assert_array_equal(population.strategies, expected_strategies)
+            assert mean_payoff == pytest.approx(expected_sum / (strategies.size * len(population.offsets)))
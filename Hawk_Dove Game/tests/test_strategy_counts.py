@@ -0,0 +1,38 @@
+from collections import Counter
+
+import pytest
+
+import Random_Buffer
+from Batch_Runner import load_script
+
+RESOURCE_ARGS = (2000, .6, .4)
+# (脚本, 群体的初始比例, iter_evolve 在 V, C, mutation_rate, num_generations 之后的参数)
+SCRIPTS = [
+    ('Advanced_Hawk_Dove_Game_MultiStrategy.py', (.3, .3, .4), ()),
+    ('Advanced_Hawk_Dove_Game_MultiStrategy_note.py', (.3, .3, .4), ()),
+    ('Resource_Hawk_Dove_Game.py', (.3, .3, .4), (2000, 'renewable')),
+    ('Resource_Hawk_Dove_Game_Combined.py', (.3, .3, .4), RESOURCE_ARGS),
+    ('Resource_Hawk_Dove_Game_CustomRecovery.py', (.3, .3, .4), RESOURCE_ARGS + (100,)),
+    ('HawkDove_GUI.py', (.3, .3, .4), RESOURCE_ARGS + (100,)),
+    ('RL/Hawk_Dove_RL.py', (.5, .5), ()),
+    ('RL/Hawk_Dove_MultiStrategy.py', (.3, .3, .4), ()),
+    ('RL/HDM_Mut.py', (.3, .3, .4), ()),
+]
+
+
+def recount(population):
+    return Counter(individual.strategy for individual in population.individuals)
+
+
+@pytest.mark.parametrize('script, fractions, evolve_args', SCRIPTS)
+def test_incremental_counts_match_a_recount(script, fractions, evolve_args):
+    Random_Buffer.reseed(0)
+    population = load_script(script).Population(60, *fractions)
+    for record in population.iter_evolve(50, 100, .3, 6, *evolve_args):
+        # 记录中的计数是该代开始时的计数，这里检查每代结束时实时维护的计数
+        counts = recount(population)
+        live = population.strategy_counts
+        keys = live.keys() if isinstance(live, dict) else range(len(live))
+        assert {key: live[key] for key in keys} == {key: counts[key] for key in keys}
+        assert sum(live.values() if isinstance(live, dict) else live) == len(population.individuals)
+    assert record.hawk + record.dove + record.mixed == len(population.individuals)
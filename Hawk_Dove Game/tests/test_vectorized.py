@@ -0,0 +1,54 @@
+import copy
+
+import numpy as np
+import pytest
+
+from Advanced_Hawk_Dove_Game_MultiStrategy import Individual
+from Vectorized_Hawk_Dove_Game import DOVE, HAWK, MIXED, STRATEGY_NAMES, VectorizedPopulation, payoff_table
+
+
+@pytest.mark.parametrize('V, C', [(50, 100), (100, 50), (30, 30)])
+def test_payoff_table_matches_scalar_play(V, C):
+    table = payoff_table(V, C)
+    for a in (HAWK, DOVE):
+        for b in (HAWK, DOVE):
+            payoff_self, payoff_opponent = Individual(STRATEGY_NAMES[a]).play(Individual(STRATEGY_NAMES[b]), V, C)
+            assert (table[a, b], table[b, a]) == (payoff_self, payoff_opponent)
+
+
+def test_play_matches_per_individual_loop():
+    population = VectorizedPopulation(301, .3, .3, .4, rng=np.random.default_rng(0))
+    n = len(population)
+    for _ in range(5):
+        # 用同样的随机数重现对手和混合策略的行动，再逐个体用标量的 Individual.play 计算收益
+        replay = copy.deepcopy(population.rng)
+        opponents = replay.integers(0, n, size=n, dtype=np.int32)
+        coins_self = replay.integers(0, 2, size=n, dtype=np.int8)
+        coins_opponent = replay.integers(0, 2, size=n, dtype=np.int8)
+        payoff_self, payoff_opponent = population.play(50, 100)
+
+        for i, j in enumerate(opponents):
+            a = coins_self[i] if population.strategies[i] == MIXED else population.strategies[i]
+            b = coins_opponent[i] if population.strategies[j] == MIXED else population.strategies[j]
+            expected = Individual(STRATEGY_NAMES[a]).play(Individual(STRATEGY_NAMES[b]), 50, 100)
+            assert (payoff_self[i], payoff_opponent[i]) == expected
+        population.mutate(.1)
+
+
+def test_mutation_keeps_counts_in_sync():
+    population = VectorizedPopulation(1000, .5, .5, 0, rng=np.random.default_rng(1))
+    assert population.mutate(0).size == 0
+    np.testing.assert_array_equal(population.strategy_counts, [500, 500, 0])
+    for _ in range(10):
+        population.mutate(.2)
+        np.testing.assert_array_equal(population.strategy_counts, np.bincount(population.strategies, minlength=3))
+    # 突变后三种策略都会出现
+    assert population.strategy_counts[MIXED] > 0
+
+
+def test_mean_payoff_matches_expected_value():
+    # 全鹰鸽各半、不突变时平均收益的期望为收益表四项的平均
+    population = VectorizedPopulation(200000, .5, .5, 0, rng=np.random.default_rng(2))
+    record = next(population.iter_evolve(50, 100, 0, 1))
+    assert record.mean_payoff == pytest.approx(payoff_table(50, 100).mean(), abs=.3)
+    assert (record.hawk, record.dove, record.mixed) == (100000, 100000, 0)
@@ -0,0 +1,73 @@
+import numpy as np
+import pytest
+
+from Hawk_Dove_MultiStrategy import Individual
+from Vectorized_Q_Learning import STRATEGIES, VectorizedQPopulation, payoff_table
+
+
+class FixedAction(Individual):
+    # 总是选择给定行动的个体，用来逐项检查收益表
+    def __init__(self, action):
+        super().__init__(action, len(STRATEGIES))
+        self.action = action
+
+    def choose_action(self):
+        return self.action
+
+
+def record_actions(population):
+    # 记录每次 choose_actions 的结果：第一次是主动方，第二次是对手
+    recorded = []
+    choose_actions = population.choose_actions
+
+    def recording(strategies, q_tables):
+        actions = choose_actions(strategies, q_tables)
+        recorded.append(actions.copy())
+        return actions
+
+    population.choose_actions = recording
+    return recorded
+
+
+@pytest.mark.parametrize('V, C', [(50, 100), (100, 50), (30, 30)])
+def test_payoff_table_matches_scalar_play(V, C):
+    table = payoff_table(V, C, len(STRATEGIES))
+    for a in STRATEGIES:
+        for b in STRATEGIES:
+            payoff_self, payoff_opponent, _, _ = FixedAction(a).play(FixedAction(b), V, C)
+            assert (table[a, b], table[b, a]) == (payoff_self, payoff_opponent)
+
+
+@pytest.mark.parametrize('num_strategies', [2, 3])
+def test_step_matches_scalar_q_update(num_strategies):
+    population = VectorizedQPopulation(200, .3, .3, .4, num_strategies=num_strategies, rng=np.random.default_rng(1))
+    recorded = record_actions(population)
+    individuals = [Individual(int(strategy), num_strategies) for strategy in population.strategies]
+
+    for _ in range(20):
+        rewards = population.step(50, 100, mutation_rate=0)
+        action_self, action_opponent = recorded[-2:]
+        np.testing.assert_array_equal(rewards, payoff_table(50, 100, num_strategies)[action_self, action_opponent])
+        # 逐个体版本的 TD 更新：max Q 取更新前的值
+        for individual, action, reward in zip(individuals, action_self, rewards):
+            individual.update_q_value(action, reward, np.max(individual.q_table))
+        np.testing.assert_allclose(population.q_tables, [individual.q_table for individual in individuals],
+                                   rtol=1e-12, atol=1e-12)
+
+
+def test_mixed_individuals_only_play_hawk_or_dove():
+    population = VectorizedQPopulation(500, 0, 0, 1, rng=np.random.default_rng(2))
+    population.q_tables[:, 0] = 1.0
+    actions = population.choose_actions(population.strategies, population.q_tables)
+    assert set(np.unique(actions)) <= {0, 1}
+    # Q(鹰) 远大于 Q(鸽) 时几乎总是选择鹰
+    assert np.mean(actions == 0) > 0.99
+
+
+def test_counts_follow_mutation_and_resample():
+    population = VectorizedQPopulation(1001, .3, .3, .4, rng=np.random.default_rng(3))
+    size = len(population)
+    for _ in range(10):
+        population.step(50, 100, mutation_rate=.2, resample=True)
+        np.testing.assert_array_equal(population.strategy_counts, np.bincount(population.strategies, minlength=3))
+        assert len(population) == size